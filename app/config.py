@@ -6,5 +6,107 @@ MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "rootpassword")  # default password
 MYSQL_HOST = os.getenv("MYSQL_HOST", "mysql")  # <-- Use container name for Docker
 MYSQL_DB = os.getenv("MYSQL_DB", "sentiment_db")
 
-# SQLAlchemy database URL
-DATABASE_URL = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DB}"
+# SQLAlchemy database URL (DATABASE_URL overrides the MySQL settings, e.g. sqlite:///./sentiment.db)
+DATABASE_URL = os.getenv("DATABASE_URL", f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DB}")
+
+# Async driver URL for the same database (used by app.services.async_db_service)
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL",
+    DATABASE_URL.replace("mysql+pymysql://", "mysql+aiomysql://").replace("sqlite://", "sqlite+aiosqlite://", 1)
+)
+
+# Connection pool settings (shared by the sync and async engines)
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"  # log every SQL statement
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds; keep below MySQL wait_timeout
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Micro-batching of model inference (concurrent requests share one forward pass)
+BATCHING_ENABLED = os.getenv("BATCHING_ENABLED", "true").lower() == "true"
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "32"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
+
+# Bulk prediction
+PREDICT_CHUNK_SIZE = int(os.getenv("PREDICT_CHUNK_SIZE", "256"))
+BATCH_PREDICT_MAX_TEXTS = int(os.getenv("BATCH_PREDICT_MAX_TEXTS", "10000"))
+
+# Streaming prediction (rows per forward pass / response chunk)
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "256"))
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", str(1024 * 1024)))
+
+# Model artifacts and inference backend
+# "keras": pickled Keras model (needs TensorFlow); "numpy": exported weights served by app.services.numpy_lstm
+MODELS_DIR = os.getenv("MODELS_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml_models", "ml_models"))
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "keras").lower()
+NUMPY_MODEL_DIR = os.getenv("NUMPY_MODEL_DIR", os.path.join(MODELS_DIR, "numpy_model"))
+# Length-aware inference (numpy backend): run the LSTM only over real tokens, starting from the
+# precomputed state after the padding; batches are grouped into buckets by token count
+LENGTH_AWARE_INFERENCE = os.getenv("LENGTH_AWARE_INFERENCE", "true").lower() == "true"
+LENGTH_BUCKETS = [int(bound) for bound in os.getenv("LENGTH_BUCKETS", "8,16,32,64,128").split(",") if bound]
+# Exported tokenizer vocabulary (app.services.fast_tokenizer); used instead of tokenizer.pkl when present
+TOKENIZER_VOCAB_PATH = os.getenv("TOKENIZER_VOCAB_PATH", os.path.join(MODELS_DIR, "tokenizer_vocab.json"))
+# Exported TF-IDF + LogisticRegression baseline (app.services.linear_model); optional
+LINEAR_MODEL_PATH = os.getenv("LINEAR_MODEL_PATH", os.path.join(MODELS_DIR, "linear_model.json"))
+# Weighted lexicon (app.services.lexicon, JSON export or term<TAB>weight TSV) scoring predictions in
+# fallback mode, when no model is loaded; the built-in lexicon is used when the file is missing
+LEXICON_PATH = os.getenv("LEXICON_PATH", os.path.join(MODELS_DIR, "lexicon.json"))
+# Default model per prediction: "lstm", "linear", or "cascade" (linear first, LSTM only when
+# the linear probability is within CASCADE_BAND of 0.5)
+PREDICT_MODEL = os.getenv("PREDICT_MODEL", "lstm").lower()
+CASCADE_BAND = float(os.getenv("CASCADE_BAND", "0.2"))
+# Versioned model artifacts (app.services.model_registry); its ACTIVE version wins over the paths above
+MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", os.path.join(MODELS_DIR, "registry"))
+# Required as X-Admin-Token on /api/models admin endpoints; they are disabled while it is empty
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+# When the model is loaded: "background" (lifespan starts it; /api/health/ready reports when warm),
+# "eager" (startup waits for it) or "lazy" (first prediction loads it)
+MODEL_LOAD_MODE = os.getenv("MODEL_LOAD_MODE", "background").lower()
+
+# Prediction cache (keyed by normalized text + model version)
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+CACHE_MAX_SIZE = int(os.getenv("CACHE_MAX_SIZE", "10000"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "3600"))
+CACHE_SHARED_PATH = os.getenv("CACHE_SHARED_PATH", "")  # SQLite file shared by workers; empty disables the shared tier
+
+# Pagination of feedback listings
+FEEDBACK_PAGE_SIZE = int(os.getenv("FEEDBACK_PAGE_SIZE", "100"))
+FEEDBACK_MAX_PAGE_SIZE = int(os.getenv("FEEDBACK_MAX_PAGE_SIZE", "1000"))
+
+# Full-text search (ranked results are paged by offset; deep pages cost more, so the offset is capped)
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "20"))
+SEARCH_MAX_OFFSET = int(os.getenv("SEARCH_MAX_OFFSET", "10000"))
+
+# Score percentiles of /api/stats/scores without a time range (a window query over every row of a
+# sentiment) are reused for this many seconds; 0 recomputes them on every request
+STATS_PERCENTILE_TTL_SECONDS = float(os.getenv("STATS_PERCENTILE_TTL_SECONDS", "60"))
+
+# Streaming export (rows fetched per server-side cursor batch)
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+
+# Persistence of single predictions
+# "sync": commit before responding; "write_behind": queue rows and insert them in background batches
+PERSISTENCE_MODE = os.getenv("PERSISTENCE_MODE", "sync").lower()
+WRITE_BEHIND_QUEUE_SIZE = int(os.getenv("WRITE_BEHIND_QUEUE_SIZE", "10000"))
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "500"))
+WRITE_BEHIND_FLUSH_INTERVAL_MS = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL_MS", "200"))
+
+# Deduplicated storage: one row per normalized text, repeats bump its occurrences / last_seen_at
+DEDUP_MODE = os.getenv("DEDUP_MODE", "false").lower() == "true"
+
+# Retention of feedbacks (app.services.retention): purge rows older than RETENTION_MAX_AGE_DAYS and/or
+# beyond the newest RETENTION_MAX_ROWS (0 disables each limit) every RETENTION_INTERVAL_SECONDS,
+# RETENTION_BATCH_SIZE rows per transaction with RETENTION_BATCH_PAUSE_MS between batches
+RETENTION_MAX_AGE_DAYS = float(os.getenv("RETENTION_MAX_AGE_DAYS", "0"))
+RETENTION_MAX_ROWS = int(os.getenv("RETENTION_MAX_ROWS", "0"))
+RETENTION_INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
+RETENTION_BATCH_PAUSE_MS = float(os.getenv("RETENTION_BATCH_PAUSE_MS", "50"))
+RETENTION_ARCHIVE_DIR = os.getenv("RETENTION_ARCHIVE_DIR", "")  # gzipped NDJSON of purged rows; empty disables archiving
+
+# Inference worker processes (NumPy backend only; weights are memory-mapped and shared)
+# 0 disables the pool, "auto" uses one worker per available CPU
+INFERENCE_WORKERS = os.getenv("INFERENCE_WORKERS", "0")
+INFERENCE_PIN_CPUS = os.getenv("INFERENCE_PIN_CPUS", "true").lower() == "true"
+INFERENCE_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "30"))
@@ -0,0 +1,114 @@
+"""
+HTTP-level instrumentation: request counts, latency and in-flight requests per
+route (middleware), and response serialization time (default response class,
+and FastJSONResponse for large lists of trusted database rows).
+
+Routes are labelled by their template (e.g. `/api/feedbacks/{feedback_id}`),
+never the raw path, so label cardinality stays bounded.
+"""
+import re
+import time
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+
+from app.services import metrics
+
+# orjson is optional (fastest for large responses); pydantic_core's encoder is used without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+REQUESTS = metrics.counter("http_requests", "HTTP requests by method, route and status", labels=("method", "route", "status"))
+REQUEST_LATENCY = metrics.histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response body", labels=("method", "route")
+)
+IN_FLIGHT = metrics.gauge("http_requests_in_flight", "HTTP requests currently being handled")
+SERIALIZE = metrics.stage("serialize")
+
+_PARAM = re.compile(r"{([^}:]+)(?::[^}]*)?}")
+
+
+def route_template(scope) -> str:
+    """
+    Full template of the matched route, e.g. `/api/feedbacks/{feedback_id}`.
+
+    Routes of an included router only know their own path (`/{feedback_id}`),
+    so the router prefix is recovered from the request path: filling the
+    template with the matched path params gives the tail of the path, and
+    whatever precedes it is the prefix.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    params = scope.get("path_params", {})
+    concrete = _PARAM.sub(lambda match: str(params.get(match.group(1), match.group(0))), template)
+    path = scope.get("path", "")
+    if path.endswith(concrete):
+        return path[:len(path) - len(concrete)] + template
+    return template
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no per-request task or body buffering, unlike BaseHTTPMiddleware)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.dec()
+            # The router stores the matched route in the (shared) scope
+            route = route_template(scope)
+            REQUESTS.labels(scope["method"], route, status_code).inc()
+            REQUEST_LATENCY.labels(scope["method"], route).observe(elapsed)
+
+
+class InstrumentedJSONResponse(JSONResponse):
+    """JSONResponse that records the time spent encoding the body."""
+
+    def render(self, content) -> bytes:
+        started = time.perf_counter()
+        body = super().render(content)
+        SERIALIZE.observe(time.perf_counter() - started)
+        return body
+
+
+def dumps(content) -> bytes:
+    """Compact UTF-8 JSON of plain data; datetimes as ISO 8601, byte-identical to the response_model output."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return pydantic_core.to_json(content)
+
+
+class FastJSONResponse(InstrumentedJSONResponse):
+    """
+    Response for large lists of rows read from our own database: returning it from
+    an endpoint skips the per-row response_model validation, and the body is
+    encoded with `dumps` (plain dicts, datetimes and primitives only).
+    """
+
+    def render(self, content) -> bytes:
+        started = time.perf_counter()
+        body = dumps(content)
+        SERIALIZE.observe(time.perf_counter() - started)
+        return body
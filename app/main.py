@@ -1,11 +1,37 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
-from app.routes import sentiment, feedback, stats
+from app.config import MODEL_LOAD_MODE
+from app.instrumentation import MetricsMiddleware, InstrumentedJSONResponse
+from app.routes import sentiment, feedback, stats, metrics, health, models
+from app.services import ml_service, metrics as service_metrics
+from app.services.db_service import init_db
+from app.services.retention import retention_enabled, retention_job
+from app.services.write_behind import write_behind
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema setup and model loading happen here, not at import time
+    await asyncio.to_thread(init_db)
+    if MODEL_LOAD_MODE == "eager":
+        await asyncio.to_thread(ml_service.load_model)
+    elif MODEL_LOAD_MODE == "background":
+        ml_service.start_background_load()
+    if retention_enabled():
+        retention_job.start()
+    yield
+    # Graceful shutdown: stop purging, flush write-behind rows, finish queued inference and stop workers
+    retention_job.stop()
+    write_behind.stop()
+    ml_service.shutdown()
 
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=InstrumentedJSONResponse,
     title="Sentiment Analysis API",
     version="1.0.0",
     description="""
@@ -24,6 +50,10 @@ app = FastAPI(
     * `/api/predict` - Analyze text sentiment
     * `/api/feedbacks/` - Manage feedback entries (CRUD operations)
     * `/api/stats/` - Get feedback statistics
+    * `/api/metrics/` - Get service metrics (inference batching histograms)
+    * `/metrics` - The same metrics in the Prometheus text format
+    * `/api/health/live`, `/api/health/ready` - Liveness and readiness probes
+    * `/api/models/` - List model versions and hot-swap the serving model
     
     ### Documentation
     
@@ -48,6 +78,9 @@ app = FastAPI(
 app.include_router(sentiment.router, prefix="/api")
 app.include_router(feedback.router, prefix="/api/feedbacks")
 app.include_router(stats.router, prefix="/api/stats")
+app.include_router(metrics.router, prefix="/api/metrics")
+app.include_router(health.router, prefix="/api/health")
+app.include_router(models.router, prefix="/api/models")
 
 # Mount static files directory for CSS, JS, and other assets
 frontend_path = Path(__file__).parent.parent / "frontend"
@@ -65,6 +98,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request counts, latency and in-flight requests per route (outermost middleware)
+app.add_middleware(MetricsMiddleware)
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(service_metrics.render_prometheus(), media_type=service_metrics.PROMETHEUS_CONTENT_TYPE)
+
 @app.get("/", include_in_schema=False)
 def serve_frontend():
     """Serve the frontend HTML file"""
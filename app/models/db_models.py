@@ -1,14 +1,74 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, SmallInteger, String, Float, DateTime, Index
+from sqlalchemy.dialects import mysql
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime
+from app.text_utils import content_hash
 
 Base = declarative_base()
 
+def _content_hash_default(context):
+    return content_hash(context.get_current_parameters()["text"] or "")
+
+class SentimentType(TypeDecorator):
+    """'Positive' / 'Negative' stored as a one-byte code (TINYINT on MySQL) instead of VARCHAR(10)."""
+    impl = SmallInteger
+    cache_ok = True
+
+    CODES = {"Negative": 0, "Positive": 1}
+    LABELS = {code: label for label, code in CODES.items()}
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(mysql.TINYINT())
+        return dialect.type_descriptor(SmallInteger())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return self.CODES[value]
+        except KeyError:
+            raise ValueError(f"Unknown sentiment: {value!r}") from None
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else self.LABELS[value]
+
 class Feedback(Base):
     __tablename__ = "feedbacks"
-    
+    # Match the query patterns: filter by sentiment + created_at range (stats, export, timeline),
+    # created_at ranges on their own, and duplicate lookups by content hash
+    __table_args__ = (
+        Index("ix_feedbacks_sentiment_created_at", "sentiment", "created_at"),
+        Index("ix_feedbacks_created_at", "created_at"),
+        Index("ix_feedbacks_content_hash", "content_hash"),
+        Index("ux_feedbacks_dedup_key", "dedup_key", unique=True),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     text = Column(String(1000))
-    sentiment = Column(String(10))
+    sentiment = Column(SentimentType)
     score = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
+    model_version = Column(String(64), nullable=True)  # registry version that scored the text; null for fallback predictions
+    content_hash = Column(String(64), nullable=True, default=_content_hash_default)  # content_hash(text), set on insert
+    # Dedup mode (DEDUP_MODE): one row per content hash, repeats bump occurrences and last_seen_at
+    occurrences = Column(Integer, nullable=False, default=1, server_default="1")
+    last_seen_at = Column(DateTime, nullable=True, default=datetime.utcnow)
+    dedup_key = Column(String(64), nullable=True)  # content_hash of rows stored in dedup mode (unique), null otherwise
+
+class FeedbackCounter(Base):
+    """Running per-sentiment totals, maintained on every insert/delete of feedbacks"""
+    __tablename__ = "feedback_counters"
+
+    sentiment = Column(String(10), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+
+class SchemaVersion(Base):
+    """One row per applied migration (app.services.migrations)"""
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    description = Column(String(200), nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
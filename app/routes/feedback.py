@@ -1,14 +1,25 @@
+from datetime import datetime
+from typing import Literal, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Path, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.config import (
+    FEEDBACK_PAGE_SIZE, FEEDBACK_MAX_PAGE_SIZE, EXPORT_BATCH_SIZE, SEARCH_PAGE_SIZE, SEARCH_MAX_OFFSET
+)
 from app.schemas.feedback import (
     FeedbackRequest, FeedbackResponse, FeedbackListResponse,
-    FilteredFeedbackResponse, DeleteResponse
+    FilteredFeedbackResponse, SearchResponse, DeleteResponse
 )
-from app.services.ml_service import predict_sentiment
-from app.services.db_service import (
-    save_feedback, get_db, delete_feedback, delete_all_feedbacks,
-    get_feedbacks_by_sentiment, get_all_feedbacks
+from app.instrumentation import FastJSONResponse
+from app.routes.params import ModelQuery
+from app.services.ml_service import predict_versioned
+from app.services.db_service import get_db, iter_feedback_batches, search_terms, FEEDBACK_FIELDS
+from app.services.async_db_service import (
+    get_async_db, delete_feedback, delete_all_feedbacks, get_feedbacks_page, count_feedbacks, search_feedbacks
 )
+from app.services import export_service
+from app.services.write_behind import persist_prediction
 
 router = APIRouter(
     tags=["Feedback Management"],
@@ -36,26 +47,56 @@ router = APIRouter(
         }
     }
 )
-def predict_feedback(feedback: FeedbackRequest, db: Session = Depends(get_db)):
+def predict_feedback(
+    feedback: FeedbackRequest,
+    model: ModelQuery = None,
+    db: Session = Depends(get_db)
+):
     """
     Analyze text sentiment and save to database.
     
     - **text**: The text to analyze for sentiment
     - Returns sentiment prediction (Positive/Negative) and confidence score (0-1)
+    - **model**: Optional `lstm`, `linear` or `cascade`
     - Automatically saves the result to the database for later retrieval
     """
-    sentiment, score = predict_sentiment(feedback.text)
-    # Save to DB
-    save_feedback(db, feedback.text, sentiment, score)
+    [(sentiment, score)], [model_version] = predict_versioned([feedback.text], single=True, model=model)
+    # Save to DB (immediately, or queued in write-behind mode)
+    persist_prediction(db, feedback.text, sentiment, score, model_version)
     return {"sentiment": sentiment, "score": score}
 
+def _parse_fields(fields: Optional[str]):
+    """Validate a comma-separated `fields=` projection."""
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in FEEDBACK_FIELDS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(FEEDBACK_FIELDS)}"
+        )
+    return requested
+
+def _normalize_sentiment(sentiment: Optional[str]):
+    """Validate a 'positive' / 'negative' filter (any case) and return the stored label."""
+    if sentiment is None:
+        return None
+    if sentiment.lower() not in ["positive", "negative"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Sentiment must be 'positive' or 'negative'"
+        )
+    return sentiment.capitalize()
+
 @router.get(
     "/",
     response_model=FeedbackListResponse,
+    response_model_exclude_unset=True,
     status_code=status.HTTP_200_OK,
     summary="Get all feedbacks",
-    description="Retrieves all feedback entries from the database with their sentiment analysis results.",
-    response_description="Returns a list of all feedback entries",
+    description="Retrieves feedback entries page by page (keyset pagination on id). Pass the returned `next_cursor` as `cursor` to get the next page, and use `fields=` to return only some columns.",
+    response_description="Returns one page of feedback entries",
     responses={
         200: {
             "description": "List of all feedbacks retrieved successfully",
@@ -70,34 +111,172 @@ def predict_feedback(feedback: FeedbackRequest, db: Session = Depends(get_db)):
                                 "score": 0.95,
                                 "created_at": "2024-01-15T10:30:00"
                             }
-                        ]
+                        ],
+                        "next_cursor": None
                     }
                 }
             }
         }
     }
 )
-def get_all(db: Session = Depends(get_db)):
+async def get_all(
+    cursor: Optional[int] = Query(None, description="`next_cursor` from the previous page", ge=0),
+    limit: int = Query(FEEDBACK_PAGE_SIZE, description="Page size", ge=1, le=FEEDBACK_MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. `id,sentiment,score`"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    Retrieve all feedback entries from the database.
+    Retrieve feedback entries from the database, one page at a time.
     
-    Returns all feedbacks with their:
+    Returns feedbacks with their:
     - ID
     - Original text
     - Predicted sentiment
     - Confidence score
     - Creation timestamp
+    
+    - **cursor**: Pass the `next_cursor` of the previous page; omit for the first page
+    - **limit**: Number of feedbacks per page
+    - **fields**: Only return these fields (e.g. skip the `text` column)
+    - Rows are encoded straight from the database (no per-row validation), see FastJSONResponse
     """
-    feedbacks = get_all_feedbacks(db)
-    return {"feedbacks": feedbacks}
+    feedbacks, next_cursor = await get_feedbacks_page(db, limit, after_id=cursor, fields=_parse_fields(fields))
+    return FastJSONResponse({"feedbacks": feedbacks, "next_cursor": next_cursor})
+
+@router.get(
+    "/search",
+    response_model=SearchResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Search feedbacks",
+    description="Full-text search over feedback text, backed by the database's inverted index (SQLite FTS5 or MySQL FULLTEXT). Returns feedbacks containing every word of the query, best match first, with optional sentiment and date filters.",
+    response_description="Returns one page of matching feedbacks",
+    responses={
+        200: {
+            "description": "Search results retrieved successfully",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "query": "battery life",
+                        "feedbacks": [
+                            {
+                                "id": 42,
+                                "text": "Battery life is amazing",
+                                "sentiment": "Positive",
+                                "score": 0.97,
+                                "created_at": "2024-01-15T10:30:00",
+                                "model_version": "2024-06-01",
+                                "rank": 3.2
+                            }
+                        ],
+                        "next_offset": None
+                    }
+                }
+            }
+        },
+        400: {
+            "description": "Query without words, or invalid sentiment value",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "Search query must contain at least one word"
+                    }
+                }
+            }
+        }
+    }
+)
+async def search(
+    q: str = Query(..., description="Words to search for (all must match)", min_length=1, max_length=200),
+    sentiment: Optional[str] = Query(None, description="Only return 'positive' or 'negative' feedbacks"),
+    since: Optional[datetime] = Query(None, description="Only return feedbacks created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only return feedbacks created before this time"),
+    offset: int = Query(0, description="`next_offset` from the previous page", ge=0, le=SEARCH_MAX_OFFSET),
+    limit: int = Query(SEARCH_PAGE_SIZE, description="Page size", ge=1, le=FEEDBACK_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Search feedback text.
+    
+    - **q**: Search words; punctuation and operators are ignored, every word must match
+    - **sentiment**: Optional sentiment filter
+    - **since** / **until**: Optional creation time range
+    - **offset** / **limit**: Pagination; pass the returned `next_offset` to get the next page
+    """
+    if not search_terms(q):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query must contain at least one word"
+        )
+    sentiment = _normalize_sentiment(sentiment)
+    feedbacks, next_offset = await search_feedbacks(db, q, limit, offset, sentiment=sentiment, since=since, until=until)
+    return {"query": q, "feedbacks": feedbacks, "next_offset": next_offset}
+
+@router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    summary="Export feedbacks",
+    description="Streams the feedbacks table as NDJSON, CSV or Parquet. Rows are read through a server-side cursor in batches, so server memory stays flat regardless of table size.",
+    response_description="Streamed export file",
+    responses={
+        200: {
+            "description": "Export streamed successfully",
+            "content": {
+                "application/x-ndjson": {
+                    "example": '{"id": 1, "text": "I love this product!", "sentiment": "Positive", "score": 0.95, "created_at": "2024-01-15T10:30:00", "model_version": "2024-06-01", "occurrences": 1, "last_seen_at": "2024-01-15T10:30:00"}\n'
+                },
+                "text/csv": {},
+                "application/vnd.apache.parquet": {}
+            }
+        },
+        400: {
+            "description": "Invalid sentiment value",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "Sentiment must be 'positive' or 'negative'"
+                    }
+                }
+            }
+        },
+        501: {"description": "Parquet export requested but pyarrow is not installed"}
+    }
+)
+def export_feedbacks(
+    export_format: Literal["ndjson", "csv", "parquet"] = Query("ndjson", alias="format", description="Output format"),
+    sentiment: Optional[str] = Query(None, description="Only export 'positive' or 'negative' feedbacks"),
+    since: Optional[datetime] = Query(None, description="Only export feedbacks created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only export feedbacks created before this time"),
+):
+    """
+    Export feedbacks for offline analysis.
+    
+    - **format**: `ndjson` (default), `csv` or `parquet` (one row group per batch)
+    - **sentiment**: Optional sentiment filter
+    - **since** / **until**: Optional creation time range
+    """
+    sentiment = _normalize_sentiment(sentiment)
+    if export_format == "parquet" and export_service.pa is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Parquet export requires pyarrow"
+        )
+
+    media_type, extension = export_service.EXPORT_FORMATS[export_format]
+    batches = iter_feedback_batches(EXPORT_BATCH_SIZE, sentiment=sentiment, since=since, until=until)
+    return StreamingResponse(
+        export_service.ENCODERS[export_format](batches),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="feedbacks.{extension}"'}
+    )
 
 @router.get(
     "/filter/{sentiment}",
     response_model=FilteredFeedbackResponse,
+    response_model_exclude_unset=True,
     status_code=status.HTTP_200_OK,
     summary="Filter feedbacks by sentiment",
-    description="Retrieves all feedback entries that match the specified sentiment (positive or negative).",
-    response_description="Returns filtered feedbacks with count",
+    description="Retrieves feedback entries that match the specified sentiment (positive or negative), page by page, along with the total number of matches.",
+    response_description="Returns one page of filtered feedbacks with the total count",
     responses={
         200: {
             "description": "Filtered feedbacks retrieved successfully",
@@ -114,7 +293,8 @@ def get_all(db: Session = Depends(get_db)):
                                 "score": 0.95,
                                 "created_at": "2024-01-15T10:30:00"
                             }
-                        ]
+                        ],
+                        "next_cursor": None
                     }
                 }
             }
@@ -131,27 +311,29 @@ def get_all(db: Session = Depends(get_db)):
         }
     }
 )
-def filter_by_sentiment(
+async def filter_by_sentiment(
     sentiment: str = Path(
         ...,
         description="Sentiment to filter by (must be 'positive' or 'negative')",
         example="positive"
     ),
-    db: Session = Depends(get_db)
+    cursor: Optional[int] = Query(None, description="`next_cursor` from the previous page", ge=0),
+    limit: int = Query(FEEDBACK_PAGE_SIZE, description="Page size", ge=1, le=FEEDBACK_MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. `id,sentiment,score`"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Filter feedbacks by sentiment type.
     
     - **sentiment**: Must be either 'positive' or 'negative' (case-insensitive)
-    - Returns all feedbacks matching the specified sentiment along with the count
+    - **cursor**, **limit**, **fields**: Pagination and projection, as for `GET /api/feedbacks/`
+    - Returns one page of matching feedbacks along with the total count of matches
+    - Rows are encoded straight from the database (no per-row validation), as for `GET /api/feedbacks/`
     """
-    if sentiment.lower() not in ["positive", "negative"]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Sentiment must be 'positive' or 'negative'"
-        )
-    feedbacks = get_feedbacks_by_sentiment(db, sentiment.capitalize())
-    return {"sentiment": sentiment, "count": len(feedbacks), "feedbacks": feedbacks}
+    label = _normalize_sentiment(sentiment)
+    feedbacks, next_cursor = await get_feedbacks_page(db, limit, after_id=cursor, sentiment=label, fields=_parse_fields(fields))
+    count = await count_feedbacks(db, label)
+    return FastJSONResponse({"sentiment": sentiment, "count": count, "feedbacks": feedbacks, "next_cursor": next_cursor})
 
 @router.delete(
     "/{feedback_id}",
@@ -183,9 +365,9 @@ def filter_by_sentiment(
         }
     }
 )
-def delete_single(
+async def delete_single(
     feedback_id: int = Path(..., description="ID of the feedback to delete", example=1, gt=0),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a specific feedback entry.
@@ -194,7 +376,7 @@ def delete_single(
     - Returns success message if deletion is successful
     - Returns 404 if feedback ID doesn't exist
     """
-    success = delete_feedback(db, feedback_id)
+    success = await delete_feedback(db, feedback_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -222,12 +404,16 @@ def delete_single(
         }
     }
 )
-def delete_all(db: Session = Depends(get_db)):
+async def delete_all(db: AsyncSession = Depends(get_async_db)):
     """
     Delete all feedback entries from the database.
     
     **Warning**: This operation permanently removes all feedback data.
     Use with caution as this action cannot be undone.
+
+    - The table is truncated rather than deleted row by row (TRUNCATE on MySQL, which also
+      restarts the ids; the truncate optimization on SQLite), so it is fast on large tables
+    - Purged rows are not archived; for gradual, archived deletion configure the retention policy
     """
-    delete_all_feedbacks(db)
+    await delete_all_feedbacks(db)
     return {"message": "All feedbacks deleted successfully"}
@@ -0,0 +1,103 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from app.services import ml_service
+from app.services.async_db_service import async_engine
+
+router = APIRouter(
+    tags=["Health"],
+    responses={404: {"description": "Not found"}},
+)
+
+@router.get(
+    "/live",
+    status_code=status.HTTP_200_OK,
+    summary="Liveness probe",
+    description="Returns 200 as soon as the process is serving requests, before the model has finished loading.",
+    response_description="Returns the liveness status",
+    responses={
+        200: {
+            "description": "Process is alive",
+            "content": {
+                "application/json": {
+                    "example": {"status": "alive"}
+                }
+            }
+        }
+    }
+)
+def liveness():
+    """
+    Liveness probe.
+
+    Does no work beyond answering; use `/api/health/ready` to decide whether to route traffic here.
+    """
+    return {"status": "alive"}
+
+@router.get(
+    "/ready",
+    status_code=status.HTTP_200_OK,
+    summary="Readiness probe",
+    description="Returns 200 once the model load (including a warm-up inference) has finished and the database answers, 503 until then.",
+    response_description="Returns the readiness status and model load details",
+    responses={
+        200: {
+            "description": "Service is ready to take traffic",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "status": "ready",
+                        "database": True,
+                        "model": {
+                            "ready": True,
+                            "model_loaded": True,
+                            "model_version": "3f9a1c2b7d4e5f60",
+                            "backend": "numpy",
+                            "state": "ready",
+                            "error": None,
+                            "load_seconds": 0.412
+                        }
+                    }
+                }
+            }
+        },
+        503: {
+            "description": "Model still loading or database unavailable",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "status": "loading",
+                        "database": True,
+                        "model": {"ready": False, "model_loaded": False, "model_version": None, "backend": "keras", "state": "loading", "error": None, "load_seconds": None}
+                    }
+                }
+            }
+        }
+    }
+)
+async def readiness():
+    """
+    Readiness probe.
+
+    - **status**: `ready`, `loading` (model not warm yet) or `unavailable` (database unreachable)
+    - **model.state**: `ready`, or `fallback` when the model artifacts could not be loaded and
+      predictions come from the keyword heuristic
+    """
+    model = ml_service.get_model_status()
+    try:
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        database = True
+    except Exception:
+        database = False
+
+    if not database:
+        state = "unavailable"
+    elif not model["ready"]:
+        state = "loading"
+    else:
+        state = "ready"
+    body = {"status": state, "database": database, "model": model}
+    if state != "ready":
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=body)
+    return body
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, status
+from app.services import metrics
+from app.services import ml_service
+
+router = APIRouter(
+    tags=["Metrics"],
+    responses={404: {"description": "Not found"}},
+)
+
+@router.get(
+    "/",
+    status_code=status.HTTP_200_OK,
+    summary="Get service metrics",
+    description="Returns in-process service metrics, such as the inference batch-size and batching queue-wait histograms used to tune micro-batching.",
+    response_description="Returns a mapping of metric name to its current value",
+    responses={
+        200: {
+            "description": "Metrics retrieved successfully",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "inference_batch_size": {
+                            "type": "histogram",
+                            "description": "Number of texts per model forward pass",
+                            "count": 3,
+                            "sum": 12.0,
+                            "mean": 4.0,
+                            "buckets": {"1": 1, "2": 1, "4": 1, "8": 3, "+Inf": 3}
+                        }
+                    }
+                }
+            }
+        }
+    }
+)
+def get_metrics():
+    """
+    Get a snapshot of all registered metrics.
+
+    Histograms report cumulative bucket counts keyed by upper bound, plus count, sum and mean.
+    """
+    return metrics.snapshot()
+
+@router.get(
+    "/workers",
+    status_code=status.HTTP_200_OK,
+    summary="Get inference worker health",
+    description="Reports the state of each inference worker process (pid, pinned CPU, liveness, task and restart counts). Idle workers are pinged and restarted if unresponsive.",
+    response_description="Returns the inference pool status",
+    responses={
+        200: {
+            "description": "Worker status retrieved successfully",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "enabled": True,
+                        "workers": [
+                            {"index": 0, "pid": 4242, "cpu": 0, "alive": True, "busy": False, "responsive": True, "tasks": 120, "restarts": 0, "last_error": None}
+                        ]
+                    }
+                }
+            }
+        }
+    }
+)
+def get_worker_health():
+    """
+    Get the health of the inference worker pool.
+
+    `enabled` is false when inference runs in the API process (INFERENCE_WORKERS=0).
+    """
+    handle = ml_service.current_model()
+    if handle is None or handle.pool is None:
+        return {"enabled": False, "workers": []}
+    return {"enabled": True, "workers": handle.pool.health()}
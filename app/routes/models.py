@@ -0,0 +1,106 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Path
+from app.config import ADMIN_TOKEN
+from app.services import ml_service
+
+def require_admin(x_admin_token: Optional[str] = Header(None, description="Admin token (must match ADMIN_TOKEN)")):
+    # Fail closed: with no ADMIN_TOKEN configured the admin endpoints are disabled
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)")
+    if not hmac.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
+
+router = APIRouter(
+    tags=["Model Management"],
+    responses={404: {"description": "Not found"}},
+)
+
+@router.get(
+    "/",
+    status_code=status.HTTP_200_OK,
+    summary="List registered model versions",
+    description="Lists the versions in the model registry, the version loaded at startup (`active`) and the version currently serving requests.",
+    response_description="Returns the registry contents and the serving model",
+    responses={
+        200: {
+            "description": "Registry listed successfully",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "active": "2024-06-01",
+                        "serving": "2024-06-01",
+                        "versions": [
+                            {"version": "2024-05-01", "backend": "numpy", "created_at": "2024-05-01T09:00:00", "description": "baseline"},
+                            {"version": "2024-06-01", "backend": "numpy", "created_at": "2024-06-01T09:00:00", "description": "retrained on May feedback"}
+                        ]
+                    }
+                }
+            }
+        }
+    }
+)
+def list_models():
+    """
+    List registered model versions.
+
+    - **active**: version recorded in the registry and loaded at startup
+    - **serving**: version answering requests right now (null in fallback mode)
+    """
+    handle = ml_service.current_model()
+    return {
+        "active": ml_service.registry.active_version(),
+        "serving": handle.version if handle is not None else None,
+        "versions": ml_service.registry.versions(),
+    }
+
+@router.get(
+    "/status",
+    status_code=status.HTTP_200_OK,
+    summary="Get model load status",
+    description="Reports the serving model version and the state of the last reload (`idle`, `loading`, `done` or `failed`).",
+    response_description="Returns the model status",
+)
+def get_model_status():
+    """Get the serving model and the progress of the last reload."""
+    return ml_service.get_model_status()
+
+@router.post(
+    "/{version}/load",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Load and swap in a model version",
+    description="Loads a registered version in the background, runs a warm-up inference and atomically swaps it in. Requests already running finish on the previous version. Poll `/api/models/status` for the outcome. Requires `X-Admin-Token`; disabled unless ADMIN_TOKEN is set. The swap only affects the worker process that receives the request: with several workers, the others keep serving their current version until they restart and load the registry's ACTIVE version.",
+    response_description="Reload started",
+    dependencies=[Depends(require_admin)],
+    responses={
+        202: {
+            "description": "Reload started",
+            "content": {
+                "application/json": {
+                    "example": {"message": "Loading model version 2024-06-01", "version": "2024-06-01"}
+                }
+            }
+        },
+        403: {"description": "Invalid admin token, or ADMIN_TOKEN not set"},
+        404: {"description": "Model version not found"},
+        409: {"description": "Another reload is in progress"}
+    }
+)
+def load_model_version(
+    version: str = Path(..., description="Registered model version to load", example="2024-06-01")
+):
+    """
+    Load a model version without downtime.
+
+    - The new version is loaded and warmed while the current one keeps serving
+    - New requests switch to it at once; in-flight requests finish on the old one
+    - On success the version becomes the registry's active version (kept across restarts)
+    - Only this worker process swaps; other workers pick the version up on restart
+    """
+    try:
+        started = ml_service.start_reload(version)
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Model version {version} not found")
+    if not started:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Another model reload is in progress")
+    return {"message": f"Loading model version {version}", "version": version}
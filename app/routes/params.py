@@ -0,0 +1,10 @@
+"""Query parameters shared by several routes."""
+from typing import Annotated, Literal, Optional
+from fastapi import Query
+from app.services.ml_service import PREDICT_MODELS
+
+# Which model scores a request (ml_service.predict_versioned's `model`)
+ModelQuery = Annotated[
+    Optional[Literal[PREDICT_MODELS]],
+    Query(description="Model to score with; defaults to the server's PREDICT_MODEL. `cascade` uses the LSTM only for uncertain linear scores"),
+]
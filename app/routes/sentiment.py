@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
+import csv
+import json
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from app.schemas.feedback import FeedbackRequest, FeedbackResponse
-from app.services.ml_service import predict_sentiment
-from app.services.db_service import save_feedback, get_db
+from app.config import BATCH_PREDICT_MAX_TEXTS, STREAM_CHUNK_SIZE, STREAM_MAX_LINE_BYTES
+from app.schemas.feedback import FeedbackRequest, FeedbackResponse, BatchPredictRequest, BatchPredictResponse
+from app.routes.params import ModelQuery
+from app.services.ml_service import predict_versioned
+from app.services.db_service import save_feedbacks, get_db, SessionLocal
+from app.services.write_behind import persist_prediction
 
 router = APIRouter(
     tags=["Sentiment Analysis"],
@@ -31,15 +38,285 @@ router = APIRouter(
         }
     }
 )
-def predict_feedback(feedback: FeedbackRequest, db: Session = Depends(get_db)):
+def predict_feedback(
+    feedback: FeedbackRequest,
+    model: ModelQuery = None,
+    db: Session = Depends(get_db)
+):
     """
     Analyze text sentiment and save to database.
     
     - **text**: The text to analyze for sentiment
     - Returns sentiment prediction (Positive/Negative) and confidence score (0-1)
+    - **model**: Optional `lstm`, `linear` or `cascade`
     - Automatically saves the result to the database
     """
-    sentiment, score = predict_sentiment(feedback.text)
-    # Save to DB
-    save_feedback(db, feedback.text, sentiment, score)
+    [(sentiment, score)], [model_version] = predict_versioned([feedback.text], single=True, model=model)
+    # Save to DB (immediately, or queued in write-behind mode)
+    persist_prediction(db, feedback.text, sentiment, score, model_version)
     return {"sentiment": sentiment, "score": score}
+
+def _predict_many(texts, persist: bool, db: Session, model: str = None):
+    """Score texts in one vectorized pass and optionally store them with a single bulk insert."""
+    if len(texts) > BATCH_PREDICT_MAX_TEXTS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {BATCH_PREDICT_MAX_TEXTS} texts can be scored per request"
+        )
+    predictions, model_versions = predict_versioned(texts, model=model)
+    if persist:
+        save_feedbacks(db, (
+            {"text": text, "sentiment": sentiment, "score": score, "model_version": model_version}
+            for text, (sentiment, score), model_version in zip(texts, predictions, model_versions)
+        ))
+    return {
+        "count": len(predictions),
+        "persisted": persist,
+        "results": [{"sentiment": sentiment, "score": score} for sentiment, score in predictions]
+    }
+
+@router.post(
+    "/predict/batch",
+    response_model=BatchPredictResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Analyze sentiment of many texts",
+    description="Predicts the sentiment of a list of texts in one vectorized pass. Results keep the input order and are saved to the database with a single bulk insert unless `persist=false`.",
+    response_description="Returns one prediction per input text, in input order",
+    responses={
+        200: {
+            "description": "Successful bulk prediction",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "count": 2,
+                        "persisted": True,
+                        "results": [
+                            {"sentiment": "Positive", "score": 0.95},
+                            {"sentiment": "Negative", "score": 0.08}
+                        ]
+                    }
+                }
+            }
+        },
+        413: {"description": "Too many texts in one request"}
+    }
+)
+def predict_batch(
+    request: BatchPredictRequest,
+    persist: bool = Query(True, description="Save the predictions to the database"),
+    model: ModelQuery = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Analyze the sentiment of a list of texts.
+
+    - **texts**: The texts to analyze
+    - **persist**: Set to `false` to score without saving
+    - Returns predictions in the same order as the input texts
+    """
+    return _predict_many(request.texts, persist, db, model)
+
+@router.post(
+    "/predict/batch/upload",
+    response_model=BatchPredictResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Analyze sentiment of an NDJSON upload",
+    description="Same as `/predict/batch`, but reads the texts from an uploaded NDJSON file. Each line must be a JSON string or an object with a `text` field; blank lines are ignored.",
+    response_description="Returns one prediction per input line, in file order",
+    responses={
+        400: {
+            "description": "Malformed NDJSON line",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "Line 3: expected a JSON string or an object with a 'text' field"
+                    }
+                }
+            }
+        },
+        413: {"description": "Too many texts in one request"}
+    }
+)
+def predict_batch_upload(
+    file: UploadFile = File(..., description="NDJSON file, one text per line"),
+    persist: bool = Query(True, description="Save the predictions to the database"),
+    model: ModelQuery = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Analyze the sentiment of every line of an NDJSON file.
+
+    - **file**: NDJSON upload, e.g. `{"text": "Great!"}` or `"Great!"` per line
+    - **persist**: Set to `false` to score without saving
+    """
+    texts = []
+    for line_number, line in enumerate(file.file, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            item = None
+        if isinstance(item, dict):
+            item = item.get("text")
+        if not isinstance(item, str):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Line {line_number}: expected a JSON string or an object with a 'text' field"
+            )
+        texts.append(item)
+    return _predict_many(texts, persist, db, model)
+
+class _BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body generator reads the request body itself.
+
+    The default implementation listens for client disconnects by calling
+    `receive()` concurrently, which would steal request body messages from
+    the generator. A disconnect still surfaces as an error on `send()`.
+    Background tasks run after the body, as upstream.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+async def _iter_lines(request: Request):
+    """
+    Split the request body into lines as it arrives, without reading it all.
+    A line over STREAM_MAX_LINE_BYTES is reported once as None and the rest of it is skipped.
+    """
+    # Pieces of the current line; only each new chunk is searched for newlines
+    pieces, size, discarding = [], 0, False
+    async for chunk in request.stream():
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if not discarding:
+                piece = chunk[start:] if end < 0 else chunk[start:end]
+                pieces.append(piece)
+                size += len(piece)
+                if size > STREAM_MAX_LINE_BYTES:
+                    # Oversized line: report it and drop bytes up to its newline instead of buffering them
+                    yield None
+                    pieces, size, discarding = [], 0, True
+            if end < 0:
+                break
+            if not discarding:
+                yield b"".join(pieces)
+            pieces, size, discarding = [], 0, False
+            start = end + 1
+    if pieces and not discarding:
+        line = b"".join(pieces)
+        if line:
+            yield line
+
+def _parse_ndjson(line: str):
+    try:
+        item = json.loads(line)
+    except ValueError:
+        return None
+    if isinstance(item, dict):
+        item = item.get("text")
+    return item if isinstance(item, str) else None
+
+def _predict_chunk(items, persist: bool, model: str = None):
+    """Score one chunk of (line_number, text) pairs and optionally bulk insert it."""
+    texts = [text for _, text in items]
+    predictions, model_versions = predict_versioned(texts, model=model)
+    if persist:
+        db = SessionLocal()
+        try:
+            save_feedbacks(db, (
+                {"text": text, "sentiment": sentiment, "score": score, "model_version": model_version}
+                for text, (sentiment, score), model_version in zip(texts, predictions, model_versions)
+            ))
+        finally:
+            db.close()
+    return "".join(
+        json.dumps({"line": line_number, "sentiment": sentiment, "score": score}) + "\n"
+        for (line_number, _), (sentiment, score) in zip(items, predictions)
+    )
+
+async def _stream_predictions(request: Request, input_format: str, text_column: str, has_header: bool, persist: bool, model: str = None):
+    """
+    Read, score and emit the body one chunk at a time.
+
+    The generator is only resumed once the previous chunk has been written to
+    the client, so a slow reader pauses body consumption and prediction
+    (backpressure) and at most one chunk is held in memory.
+    """
+    column = 0 if not has_header else None
+    chunk, line_number = [], 0
+    async for raw_line in _iter_lines(request):
+        line_number += 1
+        if raw_line is None:
+            yield json.dumps({"line": line_number, "error": "Line too long"}) + "\n"
+            continue
+        line = raw_line.decode("utf-8", errors="replace").rstrip("\r")
+        if not line.strip():
+            continue
+
+        if input_format == "csv":
+            row = next(csv.reader([line]), [])
+            if column is None:
+                if text_column not in row:
+                    yield json.dumps({"line": line_number, "error": f"CSV header has no '{text_column}' column"}) + "\n"
+                    return
+                column = row.index(text_column)
+                continue
+            text = row[column] if column < len(row) else None
+            error = f"Row has no column {column + 1}"
+        else:
+            text = _parse_ndjson(line)
+            error = "Expected a JSON string or an object with a 'text' field"
+
+        if text is None:
+            yield json.dumps({"line": line_number, "error": error}) + "\n"
+            continue
+        chunk.append((line_number, text))
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            yield await run_in_threadpool(_predict_chunk, chunk, persist, model)
+            chunk = []
+    if chunk:
+        yield await run_in_threadpool(_predict_chunk, chunk, persist, model)
+
+@router.post(
+    "/predict/stream",
+    status_code=status.HTTP_200_OK,
+    summary="Stream sentiment predictions for a large NDJSON/CSV body",
+    description="Reads an NDJSON or CSV request body incrementally, scores it in bounded chunks and streams the results back as NDJSON while the upload is still being read. Memory use is constant regardless of input size. CSV records must be one per line.",
+    response_description="NDJSON stream with one result (or error) object per input line",
+    responses={
+        200: {
+            "description": "Streamed predictions",
+            "content": {
+                "application/x-ndjson": {
+                    "example": '{"line": 1, "sentiment": "Positive", "score": 0.95}\n{"line": 2, "error": "Expected a JSON string or an object with a \'text\' field"}\n'
+                }
+            }
+        }
+    }
+)
+async def predict_stream(
+    request: Request,
+    input_format: Optional[Literal["ndjson", "csv"]] = Query(None, alias="format", description="Input format; defaults to CSV for text/csv bodies and NDJSON otherwise"),
+    text_column: str = Query("text", description="CSV column holding the text (when the CSV has a header)"),
+    has_header: bool = Query(True, description="Whether the CSV body starts with a header row; without one the first column is used"),
+    persist: bool = Query(True, description="Save the predictions to the database"),
+    model: ModelQuery = None,
+):
+    """
+    Stream sentiment predictions for a very large input.
+
+    - Body: NDJSON (`{"text": ...}` or a JSON string per line) or CSV
+    - Each output line carries the 1-based input `line` number and either the prediction or an `error`
+    - Chunks of STREAM_CHUNK_SIZE rows are scored (and saved) as the body is read
+    """
+    if input_format is None:
+        input_format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    return _BodyStreamingResponse(
+        _stream_predictions(request, input_format, text_column, has_header, persist, model),
+        media_type="application/x-ndjson"
+    )
@@ -1,8 +1,31 @@
-from fastapi import APIRouter, Depends, status
+import time
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.services.db_service import get_db
-from app.models.db_models import Feedback
-from app.schemas.feedback import StatsResponse
+from app.config import STATS_PERCENTILE_TTL_SECONDS
+from app.services.db_service import (
+    get_db, get_sentiment_counters, aggregate_sentiment_stats,
+    get_score_percentiles, get_sentiment_timeline, SENTIMENTS
+)
+from app.services import async_db_service
+from app.schemas.feedback import StatsResponse, ScoreStatsResponse, TimelineResponse
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Full-table percentiles per sentiment: sentiment -> (computed at, percentiles)
+_percentile_cache = {}
+
+def _cached_percentiles(db: Session, sentiment: str):
+    """Percentiles over all rows of a sentiment, reused for STATS_PERCENTILE_TTL_SECONDS."""
+    now = time.monotonic()
+    cached = _percentile_cache.get(sentiment)
+    if cached is not None and now - cached[0] < STATS_PERCENTILE_TTL_SECONDS and cached[1][PERCENTILES[0]] is not None:
+        return cached[1]
+    percentiles = get_score_percentiles(db, sentiment, PERCENTILES)
+    _percentile_cache[sentiment] = (now, percentiles)
+    return percentiles
 
 router = APIRouter(
     tags=["Statistics"],
@@ -33,7 +56,7 @@ router = APIRouter(
         }
     }
 )
-def feedback_stats(db: Session = Depends(get_db)):
+async def feedback_stats(db: AsyncSession = Depends(async_db_service.get_async_db)):
     """
     Get comprehensive feedback statistics.
     
@@ -45,10 +68,12 @@ def feedback_stats(db: Session = Depends(get_db)):
     - **negative_percentage**: Percentage of negative feedbacks (0-100)
     
     Percentages are calculated based on total feedbacks. If no feedbacks exist, percentages will be 0.
+    Totals are read from counters maintained on every insert and delete, so this is O(1) in table size.
     """
-    total = db.query(Feedback).count()
-    positive = db.query(Feedback).filter(Feedback.sentiment == "Positive").count()
-    negative = db.query(Feedback).filter(Feedback.sentiment == "Negative").count()
+    counters = await async_db_service.get_sentiment_counters(db)
+    positive = counters.get("Positive", (0, 0.0))[0]
+    negative = counters.get("Negative", (0, 0.0))[0]
+    total = sum(count for count, _ in counters.values())
     
     return {
         "total_feedbacks": total,
@@ -57,3 +82,76 @@ def feedback_stats(db: Session = Depends(get_db)):
         "positive_percentage": (positive / total * 100) if total else 0,
         "negative_percentage": (negative / total * 100) if total else 0
     }
+
+@router.get(
+    "/scores",
+    response_model=ScoreStatsResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get score statistics per sentiment",
+    description="Returns the count, average score and score percentiles (p50/p90/p95/p99) for each sentiment, optionally restricted to a creation time range. Without a range, the percentiles may be up to STATS_PERCENTILE_TTL_SECONDS old.",
+    response_description="Returns per-sentiment score statistics",
+)
+def score_stats(
+    since: Optional[datetime] = Query(None, description="Only include feedbacks created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only include feedbacks created before this time"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the score distribution of each sentiment.
+    
+    - **since** / **until**: Optional creation time range
+    - Without a range, counts and averages come from the maintained counters; the percentiles
+      still need a scan of every row of the sentiment, so that result is cached for
+      STATS_PERCENTILE_TTL_SECONDS
+    - With a range, everything is computed from the matching rows on each call
+    """
+    if since is None and until is None:
+        totals = get_sentiment_counters(db)
+    else:
+        totals = aggregate_sentiment_stats(db, since=since, until=until)
+
+    sentiments = {}
+    for sentiment in SENTIMENTS:
+        count, score_sum = totals.get(sentiment, (0, 0.0))
+        if not count:
+            percentiles = {p: None for p in PERCENTILES}
+        elif since is None and until is None:
+            percentiles = _cached_percentiles(db, sentiment)
+        else:
+            percentiles = get_score_percentiles(db, sentiment, PERCENTILES, since=since, until=until)
+        sentiments[sentiment] = {
+            "count": count,
+            "average_score": (score_sum / count) if count else None,
+            "percentiles": {str(p): value for p, value in percentiles.items()}
+        }
+    return {"since": since, "until": until, "sentiments": sentiments}
+
+@router.get(
+    "/timeline",
+    response_model=TimelineResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get feedback counts over time",
+    description="Returns positive/negative feedback counts grouped into hourly or daily buckets, optionally restricted to a creation time range.",
+    response_description="Returns time-bucketed feedback counts",
+)
+def timeline_stats(
+    bucket: Literal["hour", "day"] = Query("day", description="Bucket size"),
+    since: Optional[datetime] = Query(None, description="Only include feedbacks created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only include feedbacks created before this time"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get feedback counts per time bucket.
+    
+    - **bucket**: `hour` or `day`
+    - **since** / **until**: Optional creation time range
+    - Buckets without feedbacks are omitted
+    """
+    rows = get_sentiment_timeline(db, bucket, since=since, until=until)
+    return {
+        "bucket": bucket,
+        "buckets": [
+            {"bucket": start, "total": positive + negative, "positive": positive, "negative": negative}
+            for start, positive, negative in rows
+        ]
+    }
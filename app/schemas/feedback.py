@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional
 
 class FeedbackRequest(BaseModel):
     """Request model for sentiment analysis"""
@@ -28,6 +28,37 @@ class FeedbackResponse(BaseModel):
         }
     )
 
+class BatchPredictRequest(BaseModel):
+    """Request model for bulk sentiment analysis"""
+    texts: List[str] = Field(..., description="The texts to analyze, scored in the given order", min_length=1, example=["I love this product!", "Worst purchase ever."])
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "texts": ["I love this product!", "Worst purchase ever."]
+            }
+        }
+    )
+
+class BatchPredictResponse(BaseModel):
+    """Response model for bulk sentiment prediction"""
+    count: int = Field(..., description="Number of texts scored", example=2)
+    persisted: bool = Field(..., description="Whether the results were saved to the database", example=True)
+    results: List[FeedbackResponse] = Field(..., description="Predictions, in the same order as the input texts")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "count": 2,
+                "persisted": True,
+                "results": [
+                    {"sentiment": "Positive", "score": 0.95},
+                    {"sentiment": "Negative", "score": 0.08}
+                ]
+            }
+        }
+    )
+
 class FeedbackDB(BaseModel):
     """Database model for feedback with all fields"""
     id: int = Field(..., description="Unique identifier for the feedback", example=1)
@@ -35,12 +66,29 @@ class FeedbackDB(BaseModel):
     sentiment: str = Field(..., description="Predicted sentiment", example="Positive")
     score: float = Field(..., description="Confidence score", example=0.95)
     created_at: datetime = Field(..., description="Timestamp when the feedback was created", example="2024-01-15T10:30:00")
+    model_version: Optional[str] = Field(None, description="Model version that produced the prediction (null for fallback predictions)", example="2024-06-01")
+    occurrences: int = Field(1, description="Times this text was submitted (above 1 only in dedup mode)", example=1)
+    last_seen_at: Optional[datetime] = Field(None, description="Timestamp of the latest submission of this text", example="2024-01-15T10:30:00")
+
+    model_config = ConfigDict(from_attributes=True, protected_namespaces=())
 
-    model_config = ConfigDict(from_attributes=True)
+class FeedbackProjection(BaseModel):
+    """Feedback with only the fields requested through `fields=` (all by default)"""
+    id: Optional[int] = Field(None, description="Unique identifier for the feedback", example=1)
+    text: Optional[str] = Field(None, description="The analyzed text", example="I love this product!")
+    sentiment: Optional[str] = Field(None, description="Predicted sentiment", example="Positive")
+    score: Optional[float] = Field(None, description="Confidence score", example=0.95)
+    created_at: Optional[datetime] = Field(None, description="Timestamp when the feedback was created", example="2024-01-15T10:30:00")
+    model_version: Optional[str] = Field(None, description="Model version that produced the prediction (null for fallback predictions)", example="2024-06-01")
+    occurrences: Optional[int] = Field(None, description="Times this text was submitted (above 1 only in dedup mode)", example=1)
+    last_seen_at: Optional[datetime] = Field(None, description="Timestamp of the latest submission of this text", example="2024-01-15T10:30:00")
+
+    model_config = ConfigDict(protected_namespaces=())
 
 class FeedbackListResponse(BaseModel):
-    """Response model for list of feedbacks"""
-    feedbacks: List[FeedbackDB] = Field(..., description="List of all feedback entries")
+    """Response model for a page of feedbacks"""
+    feedbacks: List[FeedbackProjection] = Field(..., description="One page of feedback entries, ordered by id")
+    next_cursor: Optional[int] = Field(None, description="Cursor for the next page, null on the last page", example=101)
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -51,9 +99,11 @@ class FeedbackListResponse(BaseModel):
                         "text": "I love this product!",
                         "sentiment": "Positive",
                         "score": 0.95,
-                        "created_at": "2024-01-15T10:30:00"
+                        "created_at": "2024-01-15T10:30:00",
+                        "model_version": "2024-06-01"
                     }
-                ]
+                ],
+                "next_cursor": None
             }
         }
     )
@@ -61,8 +111,9 @@ class FeedbackListResponse(BaseModel):
 class FilteredFeedbackResponse(BaseModel):
     """Response model for filtered feedbacks by sentiment"""
     sentiment: str = Field(..., description="The sentiment filter applied", example="positive")
-    count: int = Field(..., description="Number of feedbacks matching the sentiment", example=5)
-    feedbacks: List[FeedbackDB] = Field(..., description="List of feedbacks matching the sentiment")
+    count: int = Field(..., description="Total number of feedbacks matching the sentiment (repeated texts count once per submission)", example=5)
+    feedbacks: List[FeedbackProjection] = Field(..., description="One page of feedbacks matching the sentiment, ordered by id")
+    next_cursor: Optional[int] = Field(None, description="Cursor for the next page, null on the last page", example=None)
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -75,9 +126,41 @@ class FilteredFeedbackResponse(BaseModel):
                         "text": "I love this product!",
                         "sentiment": "Positive",
                         "score": 0.95,
-                        "created_at": "2024-01-15T10:30:00"
+                        "created_at": "2024-01-15T10:30:00",
+                        "model_version": "2024-06-01"
                     }
-                ]
+                ],
+                "next_cursor": None
+            }
+        }
+    )
+
+class SearchResult(FeedbackDB):
+    """Feedback matching a search query"""
+    rank: Optional[float] = Field(None, description="Relevance, higher is better (null when the database has no full-text index)", example=3.2)
+
+class SearchResponse(BaseModel):
+    """Response model for full-text search"""
+    query: str = Field(..., description="The search query", example="battery life")
+    feedbacks: List[SearchResult] = Field(..., description="One page of matching feedbacks, best match first")
+    next_offset: Optional[int] = Field(None, description="Offset of the next page, null on the last page", example=20)
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "query": "battery life",
+                "feedbacks": [
+                    {
+                        "id": 42,
+                        "text": "Battery life is amazing",
+                        "sentiment": "Positive",
+                        "score": 0.97,
+                        "created_at": "2024-01-15T10:30:00",
+                        "model_version": "2024-06-01",
+                        "rank": 3.2
+                    }
+                ],
+                "next_offset": None
             }
         }
     )
@@ -113,3 +196,51 @@ class StatsResponse(BaseModel):
             }
         }
     )
+
+class SentimentScoreStats(BaseModel):
+    """Score distribution for one sentiment"""
+    count: int = Field(..., description="Number of feedbacks", example=65)
+    average_score: Optional[float] = Field(None, description="Mean confidence score", example=0.87)
+    percentiles: Dict[str, Optional[float]] = Field(..., description="Score percentiles keyed by percentile (nearest rank)", example={"50": 0.91, "90": 0.98, "99": 0.99})
+
+class ScoreStatsResponse(BaseModel):
+    """Response model for per-sentiment score statistics"""
+    since: Optional[datetime] = Field(None, description="Start of the time range (inclusive)")
+    until: Optional[datetime] = Field(None, description="End of the time range (exclusive)")
+    sentiments: Dict[str, SentimentScoreStats] = Field(..., description="Score statistics keyed by sentiment")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "since": None,
+                "until": None,
+                "sentiments": {
+                    "Positive": {"count": 65, "average_score": 0.87, "percentiles": {"50": 0.91, "90": 0.98, "99": 0.99}},
+                    "Negative": {"count": 35, "average_score": 0.12, "percentiles": {"50": 0.09, "90": 0.31, "99": 0.45}}
+                }
+            }
+        }
+    )
+
+class TimelineBucket(BaseModel):
+    """Feedback counts for one time bucket"""
+    bucket: datetime = Field(..., description="Start of the bucket", example="2024-01-15T10:00:00")
+    total: int = Field(..., description="Number of feedbacks in the bucket", example=12)
+    positive: int = Field(..., description="Number of positive feedbacks in the bucket", example=8)
+    negative: int = Field(..., description="Number of negative feedbacks in the bucket", example=4)
+
+class TimelineResponse(BaseModel):
+    """Response model for time-bucketed feedback counts"""
+    bucket: str = Field(..., description="Bucket size: 'hour' or 'day'", example="hour")
+    buckets: List[TimelineBucket] = Field(..., description="Non-empty buckets in chronological order")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "bucket": "hour",
+                "buckets": [
+                    {"bucket": "2024-01-15T10:00:00", "total": 12, "positive": 8, "negative": 4}
+                ]
+            }
+        }
+    )
@@ -0,0 +1,73 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.config import ASYNC_DATABASE_URL
+from app.models.db_models import Feedback, FeedbackCounter
+from app.services.db_service import (
+    engine_options, counter_delta_statement,
+    page_statement, page_result, count_statement, FEEDBACK_FIELDS,
+    search_terms, search_statement, search_result,
+    truncate_statements, truncate_commits_implicitly, rebuild_counters, register_pool_metrics
+)
+
+# Async engine for routes that run on the event loop (aiomysql / aiosqlite).
+# Tables are created by the sync engine in db_service, and feedbacks are written through
+# it too (write_behind / db_service.save_feedbacks); this module only reads and deletes.
+async_options = engine_options(ASYNC_DATABASE_URL)
+async_options.pop("connect_args", None)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **async_options)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+register_pool_metrics("async", async_engine.sync_engine)
+
+# Dependency for FastAPI
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Stats: apply per-sentiment deltas in the caller's transaction
+async def _bump_counters(db: AsyncSession, deltas):
+    for sentiment, (count, score_sum) in deltas.items():
+        result = await db.execute(counter_delta_statement(sentiment, count, score_sum))
+        if not result.rowcount:
+            db.add(FeedbackCounter(sentiment=sentiment, count=count, score_sum=score_sum))
+
+# Get one page of feedbacks (keyset pagination on the primary key)
+async def get_feedbacks_page(db: AsyncSession, limit: int, after_id: int = None, sentiment: str = None, fields=None):
+    fields = list(fields or FEEDBACK_FIELDS)
+    rows = (await db.execute(page_statement(limit, after_id, sentiment, fields))).all()
+    return page_result(rows, limit, fields)
+
+# Count feedbacks (optionally by sentiment) without loading them
+async def count_feedbacks(db: AsyncSession, sentiment: str = None):
+    return (await db.execute(count_statement(sentiment))).scalar()
+
+# Search feedback text (ranked by the database's full-text index)
+async def search_feedbacks(db: AsyncSession, query: str, limit: int, offset: int = 0, sentiment: str = None, since=None, until=None):
+    rows = (await db.execute(search_statement(search_terms(query), limit, offset, sentiment, since, until))).all()
+    return search_result(rows, limit, offset)
+
+# Stats: current per-sentiment totals from the counters table
+async def get_sentiment_counters(db: AsyncSession):
+    rows = await db.execute(select(FeedbackCounter.sentiment, FeedbackCounter.count, FeedbackCounter.score_sum))
+    return {sentiment: (count, score_sum) for sentiment, count, score_sum in rows}
+
+# Delete feedback by ID
+async def delete_feedback(db: AsyncSession, feedback_id: int):
+    fb = await db.get(Feedback, feedback_id)
+    if fb:
+        await db.delete(fb)
+        await _bump_counters(db, {fb.sentiment: (-fb.occurrences, -fb.score * fb.occurrences)})
+        await db.commit()
+        return True
+    return False
+
+# Delete all feedbacks
+async def delete_all_feedbacks(db: AsyncSession):
+    # Resetting the counters first also opens the transaction the truncate statements run in
+    await db.execute(update(FeedbackCounter).values(count=0, score_sum=0.0))
+    for statement in truncate_statements():
+        await db.execute(statement)
+    await db.commit()
+    if truncate_commits_implicitly():
+        await db.run_sync(rebuild_counters)
@@ -0,0 +1,97 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from app.services import metrics
+
+BATCH_SIZE = metrics.histogram(
+    "inference_batch_size",
+    "Number of texts per model forward pass",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+QUEUE_WAIT = metrics.histogram(
+    "inference_queue_wait_seconds",
+    "Time a request waited in the batching queue before its forward pass",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Collects concurrent prediction calls into a single batched call.
+
+    Callers submit one text and block on a future. A background thread takes
+    the first queued item, keeps collecting until `max_batch_size` items are
+    queued or `max_wait_ms` has passed since that first item arrived, then runs
+    `predict_batch` once over the whole batch and resolves every future.
+    """
+
+    def __init__(self, predict_batch, max_batch_size: int = 32, max_wait_ms: float = 5):
+        self._predict_batch = predict_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, text: str) -> Future:
+        self._ensure_started()
+        future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def predict(self, text: str):
+        return self.submit(text).result()
+
+    def stop(self):
+        with self._lock:
+            if self._thread is not None:
+                self._queue.put(_STOP)
+                self._thread.join()
+                self._thread = None
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                    self._thread.start()
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = self._collect(first)
+
+            started = time.perf_counter()
+            for _, _, enqueued in batch:
+                QUEUE_WAIT.observe(started - enqueued)
+            BATCH_SIZE.observe(len(batch))
+
+            try:
+                results = self._predict_batch([text for text, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
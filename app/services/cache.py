@@ -0,0 +1,118 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from app.services import metrics
+from app.text_utils import normalize_text
+
+CACHE_HITS = metrics.counter("prediction_cache_hits", "Predictions served from the cache")
+CACHE_MISSES = metrics.counter("prediction_cache_misses", "Predictions not found in the cache")
+CACHE_EVICTIONS = metrics.counter("prediction_cache_evictions", "Cache entries dropped because the cache was full or the entry expired")
+
+
+def cache_key(text: str, model_version: str) -> str:
+    return hashlib.sha256(f"{model_version}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class SQLiteCacheTier:
+    """Second cache tier in a SQLite file, shared by every uvicorn worker on the host."""
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self.ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS prediction_cache ("
+            "key TEXT PRIMARY KEY, sentiment TEXT NOT NULL, score REAL NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sentiment, score FROM prediction_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, key: str, value):
+        sentiment, score = value
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO prediction_cache (key, sentiment, score, expires_at) VALUES (?, ?, ?, ?)",
+                (key, sentiment, score, time.time() + self.ttl),
+            )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self._conn.execute("DELETE FROM prediction_cache WHERE expires_at <= ?", (time.time(),))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM prediction_cache")
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache with a TTL for (sentiment, score) predictions.
+
+    Entries are keyed on a hash of the normalized text and the model version, so
+    a model change needs no clear: old and new versions can be served side by side
+    during a reload, and the old version's entries age out through the LRU and TTL.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 3600, shared_tier: SQLiteCacheTier = None):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.shared_tier = shared_tier
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, text: str, model_version: str):
+        key = cache_key(text, model_version)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    CACHE_HITS.inc()
+                    return entry[1]
+                del self._entries[key]
+                CACHE_EVICTIONS.inc()
+
+        if self.shared_tier is not None:
+            value = self.shared_tier.get(key)
+            if value is not None:
+                self._store(key, value)
+                CACHE_HITS.inc()
+                return value
+        CACHE_MISSES.inc()
+        return None
+
+    def set(self, text: str, model_version: str, value):
+        key = cache_key(text, model_version)
+        self._store(key, value)
+        if self.shared_tier is not None:
+            self.shared_tier.set(key, value)
+
+    def _store(self, key: str, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                CACHE_EVICTIONS.inc()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.shared_tier is not None:
+            self.shared_tier.clear()
@@ -1,21 +1,137 @@
-from sqlalchemy import create_engine
+import re
+import time
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import create_engine, insert, update, delete, func, select, case, inspect, null, table, column, literal_column, type_coerce, Float
+from sqlalchemy import text as sql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 from sqlalchemy.orm import sessionmaker, Session
-from app.models.db_models import Base, Feedback
-from app.config import DATABASE_URL
+from app.models.db_models import Feedback, FeedbackCounter
+from app.text_utils import content_hash
+from app.services import metrics
+from app.services.migrations import FTS5_TRIGGERS, migrate
+from app.config import (
+    DATABASE_URL, DB_ECHO, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING, DEDUP_MODE
+)
 
-# Create engine with SQLite specific connect_args
-connect_args = {}
-if "sqlite" in DATABASE_URL:
-    connect_args = {"check_same_thread": False}
+def engine_options(url: str):
+    """Engine keyword arguments for `url`: pool tuning for servers, thread settings for SQLite."""
+    if "sqlite" in url:
+        return {"echo": DB_ECHO, "connect_args": {"check_same_thread": False}}
+    return {
+        "echo": DB_ECHO,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
 
-engine = create_engine(DATABASE_URL, echo=True, connect_args=connect_args)
-
-# Create all tables (only once)
-Base.metadata.create_all(bind=engine)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Metrics: connection pool usage (read at scrape time) and write latencies
+POOL_CHECKED_OUT = metrics.gauge("db_pool_checked_out", "Connections currently checked out of the pool", labels=("engine",))
+POOL_SIZE = metrics.gauge("db_pool_size", "Configured size of the connection pool", labels=("engine",))
+POOL_OVERFLOW = metrics.gauge("db_pool_overflow", "Connections open beyond pool_size (negative while the pool is filling)", labels=("engine",))
+DB_WRITE_SECONDS = metrics.stage("db_write")
+DB_COMMIT_SECONDS = metrics.stage("db_commit")
+
+def register_pool_metrics(name: str, sync_engine):
+    """Expose pool gauges for `sync_engine`; pools without these counters (e.g. SQLite's) report 0."""
+    def reader(method):
+        return lambda: getattr(sync_engine.pool, method, lambda: 0)()
+    POOL_CHECKED_OUT.labels(name).function = reader("checkedout")
+    POOL_SIZE.labels(name).function = reader("size")
+    POOL_OVERFLOW.labels(name).function = reader("overflow")
+
+register_pool_metrics("sync", engine)
+
+def _commit(db: Session, started: float):
+    """Commit, recording the time spent writing before the commit and in the commit itself."""
+    committing = time.perf_counter()
+    DB_WRITE_SECONDS.observe(committing - started)
+    db.commit()
+    DB_COMMIT_SECONDS.observe(time.perf_counter() - committing)
+
+SENTIMENTS = ("Positive", "Negative")
+
+# Stats: one grouped aggregate over the feedbacks table
+def aggregate_sentiment_stats(db: Session, since=None, until=None):
+    """Returns {sentiment: (count, score_sum)} computed in a single GROUP BY query, weighted by occurrences."""
+    query = db.query(
+        Feedback.sentiment,
+        func.coalesce(func.sum(Feedback.occurrences), 0),
+        func.coalesce(func.sum(Feedback.score * Feedback.occurrences), 0.0),
+    )
+    if since is not None:
+        query = query.filter(Feedback.created_at >= since)
+    if until is not None:
+        query = query.filter(Feedback.created_at < until)
+    return {sentiment: (count, float(score_sum)) for sentiment, count, score_sum in query.group_by(Feedback.sentiment)}
+
+# Stats: rebuild the counters table from the feedbacks table
+def rebuild_counters(db: Session):
+    totals = aggregate_sentiment_stats(db)
+    db.query(FeedbackCounter).delete()
+    for sentiment in set(SENTIMENTS) | set(totals):
+        count, score_sum = totals.get(sentiment, (0, 0.0))
+        db.add(FeedbackCounter(sentiment=sentiment, count=count, score_sum=score_sum))
+    db.commit()
+
+def _init_counters():
+    """Backfill the counters table once, e.g. for a database that predates it."""
+    db = SessionLocal()
+    try:
+        if db.query(FeedbackCounter).count() == 0:
+            rebuild_counters(db)
+    except IntegrityError:
+        # Another worker backfilled it concurrently
+        db.rollback()
+    finally:
+        db.close()
+
+# Schema setup: run from the app lifespan and init_db.py, not at import time
+def init_db():
+    """Apply pending schema migrations and backfill the counters. Idempotent."""
+    global _fulltext_backend
+    migrate(engine)
+    _fulltext_backend = None
+    fulltext_backend()
+    _init_counters()
+
+def counter_delta_statement(sentiment: str, count: int, score_sum: float):
+    return (
+        update(FeedbackCounter)
+        .where(FeedbackCounter.sentiment == sentiment)
+        .values(count=FeedbackCounter.count + count, score_sum=FeedbackCounter.score_sum + score_sum)
+    )
+
+# Stats: apply per-sentiment deltas in the caller's transaction
+def _bump_counters(db: Session, deltas):
+    """deltas: {sentiment: (count_delta, score_sum_delta)}"""
+    for sentiment, (count, score_sum) in deltas.items():
+        updated = db.execute(counter_delta_statement(sentiment, count, score_sum)).rowcount
+        if not updated:
+            db.add(FeedbackCounter(sentiment=sentiment, count=count, score_sum=score_sum))
+
+def counter_deltas(rows, sign: int = 1):
+    """Per-sentiment deltas for rows with sentiment and score keys (and optionally occurrences)."""
+    deltas = defaultdict(lambda: (0, 0.0))
+    for row in rows:
+        occurrences = sign * row.get("occurrences", 1)
+        count, score_sum = deltas[row["sentiment"]]
+        deltas[row["sentiment"]] = (count + occurrences, score_sum + occurrences * row["score"])
+    return deltas
+
+# Stats: current per-sentiment totals (reads the counters table, O(1))
+def get_sentiment_counters(db: Session):
+    """Returns {sentiment: (count, score_sum)}"""
+    return {row.sentiment: (row.count, row.score_sum) for row in db.query(FeedbackCounter)}
+
 # Dependency for FastAPI
 def get_db():
     db = SessionLocal()
@@ -24,36 +140,337 @@ def get_db():
     finally:
         db.close()
 
+# Dedup mode: collapse repeated texts into one row with an occurrence count
+def dedup_rows(rows):
+    """Merge rows with the same content hash; returns insert-ready rows with dedup_key and occurrences set."""
+    now = datetime.utcnow()
+    merged = {}
+    for row in rows:
+        key = content_hash(row["text"])
+        if key in merged:
+            merged[key]["occurrences"] += 1
+        else:
+            merged[key] = {
+                "model_version": None, **row, "content_hash": key, "dedup_key": key,
+                "occurrences": 1, "created_at": now, "last_seen_at": now,
+            }
+    return list(merged.values())
+
+def stored_predictions_statement(rows):
+    """Sentiment and score already stored for the dedup keys of `rows` (repeats are counted under these)."""
+    return select(Feedback.dedup_key, Feedback.sentiment, Feedback.score).where(
+        Feedback.dedup_key.in_([row["dedup_key"] for row in rows])
+    )
+
+def dedup_counter_deltas(rows, stored):
+    """Counter deltas for upserted `rows`; stored: {dedup_key: (sentiment, score)} of rows that already existed."""
+    effective = []
+    for row in rows:
+        sentiment, score = stored.get(row["dedup_key"], (row["sentiment"], row["score"]))
+        effective.append({"sentiment": sentiment, "score": score, "occurrences": row["occurrences"]})
+    return counter_deltas(effective)
+
+def upsert_statement():
+    """INSERT that bumps occurrences and last_seen_at of the existing row with the same dedup_key instead."""
+    if engine.dialect.name == "mysql":
+        statement = mysql.insert(Feedback)
+        return statement.on_duplicate_key_update(
+            occurrences=Feedback.occurrences + statement.inserted.occurrences,
+            last_seen_at=statement.inserted.last_seen_at,
+        )
+    statement = (postgresql if engine.dialect.name == "postgresql" else sqlite).insert(Feedback)
+    return statement.on_conflict_do_update(
+        index_elements=[Feedback.dedup_key],
+        set_={
+            "occurrences": Feedback.occurrences + statement.excluded.occurrences,
+            "last_seen_at": statement.excluded.last_seen_at,
+        },
+    )
+
+def _save_deduplicated(db: Session, rows):
+    rows = dedup_rows(rows)
+    stored = {key: (sentiment, score) for key, sentiment, score in db.execute(stored_predictions_statement(rows))}
+    db.execute(upsert_statement(), rows)
+    _bump_counters(db, dedup_counter_deltas(rows, stored))
+    return rows
+
 # CRUD: save feedback
-def save_feedback(db: Session, text: str, sentiment: str, score: float):
-    fb = Feedback(text=text, sentiment=sentiment, score=score)
+def save_feedback(db: Session, text: str, sentiment: str, score: float, model_version: str = None):
+    started = time.perf_counter()
+    if DEDUP_MODE:
+        [row] = _save_deduplicated(db, [{"text": text, "sentiment": sentiment, "score": score, "model_version": model_version}])
+        _commit(db, started)
+        return db.execute(select(Feedback).where(Feedback.dedup_key == row["dedup_key"]).execution_options(populate_existing=True)).scalar_one()
+    fb = Feedback(text=text, sentiment=sentiment, score=score, model_version=model_version)
     db.add(fb)
-    db.commit()
+    _bump_counters(db, {sentiment: (1, score)})
+    _commit(db, started)
     db.refresh(fb)
     return fb
 
+# CRUD: save many feedbacks in one multi-row insert (no per-row commit/refresh)
+def save_feedbacks(db: Session, rows):
+    """
+    rows: iterable of dicts with text, sentiment and score keys (and optionally model_version).
+    Returns the number of rows saved (in dedup mode, repeats count although they update an existing row).
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+    started = time.perf_counter()
+    if DEDUP_MODE:
+        _save_deduplicated(db, rows)
+    else:
+        db.execute(insert(Feedback), rows)
+        _bump_counters(db, counter_deltas(rows))
+    _commit(db, started)
+    return len(rows)
+
 # Get feedback by ID
 def get_feedback(db: Session, feedback_id: int):
     return db.query(Feedback).filter(Feedback.id == feedback_id).first()
 
-# Get all feedbacks
-def get_all_feedbacks(db: Session):
-    return db.query(Feedback).all()
+FEEDBACK_FIELDS = ("id", "text", "sentiment", "score", "created_at", "model_version", "occurrences", "last_seen_at")
+
+def page_statement(limit: int, after_id: int = None, sentiment: str = None, fields=None):
+    """SELECT for one keyset page; fetches one extra row to detect whether a next page exists."""
+    columns = [getattr(Feedback, field) for field in fields]
+    if "id" not in fields:
+        columns.append(Feedback.id)
+    query = select(*columns)
+    if sentiment is not None:
+        query = query.where(Feedback.sentiment == sentiment)
+    if after_id is not None:
+        query = query.where(Feedback.id > after_id)
+    return query.order_by(Feedback.id).limit(limit + 1)
+
+def page_result(rows, limit: int, fields):
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    # zip stops at `fields`: drops the id column page_statement appends for the cursor
+    return [dict(zip(fields, row)) for row in rows[:limit]], next_cursor
+
+# Get one page of feedbacks (keyset pagination on the primary key)
+def get_feedbacks_page(db: Session, limit: int, after_id: int = None, sentiment: str = None, fields=None):
+    """
+    Returns (rows, next_cursor). Rows are ordered by id and only contain `fields`
+    (all columns by default). `next_cursor` is the id to pass as `after_id` for
+    the next page, or None on the last page.
+    """
+    fields = list(fields or FEEDBACK_FIELDS)
+    rows = db.execute(page_statement(limit, after_id, sentiment, fields)).all()
+    return page_result(rows, limit, fields)
+
+def count_statement(sentiment: str = None):
+    """Number of submissions (rows weighted by occurrences)."""
+    query = select(func.coalesce(func.sum(Feedback.occurrences), 0))
+    if sentiment is not None:
+        query = query.where(Feedback.sentiment == sentiment)
+    return query
+
+# Count feedbacks (optionally by sentiment) without loading them
+def count_feedbacks(db: Session, sentiment: str = None):
+    return db.execute(count_statement(sentiment)).scalar()
+
+# Full-text search: FTS5 table on SQLite, FULLTEXT index on MySQL (migration 6), LIKE scan otherwise
+_fulltext_backend = None
+_fts = table("feedbacks_fts", column("rowid"))
+_fts_match = literal_column("feedbacks_fts")
+SEARCH_MAX_TERMS = 16
+
+def fulltext_backend():
+    """'fts5', 'mysql' or 'like' for the connected database (detected once)."""
+    global _fulltext_backend
+    if _fulltext_backend is None:
+        inspector = inspect(engine)
+        if engine.dialect.name == "mysql" and "ft_feedbacks_text" in {index["name"] for index in inspector.get_indexes("feedbacks")}:
+            _fulltext_backend = "mysql"
+        elif engine.dialect.name == "sqlite" and inspector.has_table("feedbacks_fts"):
+            _fulltext_backend = "fts5"
+        else:
+            _fulltext_backend = "like"
+    return _fulltext_backend
+
+def search_terms(query: str):
+    """Lowercased word tokens of a search query; operators and quotes are not passed through to the engine."""
+    return re.findall(r"\w+", query.lower())[:SEARCH_MAX_TERMS]
+
+def search_statement(terms, limit: int, offset: int = 0, sentiment: str = None, since=None, until=None):
+    """
+    Feedbacks containing every term, best match first, with a `rank` column
+    (higher is better; null for the LIKE fallback, which orders newest first).
+    """
+    columns = [getattr(Feedback, field) for field in FEEDBACK_FIELDS]
+    backend = fulltext_backend()
+    if backend == "fts5":
+        # bm25() is negative, lower is better
+        bm25 = func.bm25(_fts_match)
+        query = (
+            select(*columns, (-bm25).label("rank"))
+            .select_from(_fts.join(Feedback, Feedback.id == _fts.c.rowid))
+            .where(_fts_match.op("MATCH")(" ".join(f'"{term}"' for term in terms)))
+            .order_by(bm25, Feedback.id)
+        )
+    elif backend == "mysql":
+        # MATCH ... AGAINST (... IN BOOLEAN MODE): '+' makes every term required
+        match = Feedback.text.match(" ".join(f"+{term}" for term in terms))
+        relevance = type_coerce(match, Float)
+        query = select(*columns, relevance.label("rank")).where(match).order_by(relevance.desc(), Feedback.id)
+    else:
+        query = (
+            select(*columns, null().label("rank"))
+            .where(*(Feedback.text.contains(term, autoescape=True) for term in terms))
+            .order_by(Feedback.id.desc())
+        )
+    if sentiment is not None:
+        query = query.where(Feedback.sentiment == sentiment)
+    if since is not None:
+        query = query.where(Feedback.created_at >= since)
+    if until is not None:
+        query = query.where(Feedback.created_at < until)
+    return query.limit(limit + 1).offset(offset)
+
+def search_result(rows, limit: int, offset: int):
+    next_offset = offset + limit if len(rows) > limit else None
+    return [dict(row._mapping) for row in rows[:limit]], next_offset
+
+# Search feedback text (see search_statement); returns (rows, next_offset)
+def search_feedbacks(db: Session, query: str, limit: int, offset: int = 0, sentiment: str = None, since=None, until=None):
+    rows = db.execute(search_statement(search_terms(query), limit, offset, sentiment, since, until)).all()
+    return search_result(rows, limit, offset)
 
-# Get feedbacks by sentiment
-def get_feedbacks_by_sentiment(db: Session, sentiment: str):
-    return db.query(Feedback).filter(Feedback.sentiment == sentiment).all()
+# Stream feedbacks in batches through a server-side cursor (flat memory on large tables)
+def iter_feedback_batches(batch_size: int, sentiment: str = None, since=None, until=None):
+    """
+    Yields lists of at most `batch_size` rows (FEEDBACK_FIELDS columns), ordered by id.
+    Uses its own session so it can outlive the request-scoped one while a response streams.
+    """
+    query = select(*(getattr(Feedback, field) for field in FEEDBACK_FIELDS)).order_by(Feedback.id)
+    if sentiment is not None:
+        query = query.where(Feedback.sentiment == sentiment)
+    if since is not None:
+        query = query.where(Feedback.created_at >= since)
+    if until is not None:
+        query = query.where(Feedback.created_at < until)
+
+    db = SessionLocal()
+    try:
+        result = db.execute(query.execution_options(stream_results=True, yield_per=batch_size))
+        for partition in result.partitions():
+            yield partition
+    finally:
+        db.close()
 
 # Delete feedback by ID
 def delete_feedback(db: Session, feedback_id: int):
     fb = db.query(Feedback).filter(Feedback.id == feedback_id).first()
     if fb:
         db.delete(fb)
+        _bump_counters(db, {fb.sentiment: (-fb.occurrences, -fb.score * fb.occurrences)})
         db.commit()
         return True
     return False
 
-# Delete all feedbacks
+# Retention: the next batch of rows in (after_id, upper_id], optionally only those created before `before`
+def retention_batch_statement(after_id: int, upper_id: int, limit: int, before=None):
+    query = select(*(getattr(Feedback, field) for field in FEEDBACK_FIELDS)).where(Feedback.id > after_id, Feedback.id <= upper_id)
+    if before is not None:
+        query = query.where(Feedback.created_at < before)
+    return query.order_by(Feedback.id).limit(limit).with_for_update()
+
+# Retention: delete a batch read with retention_batch_statement as one primary-key range, in the caller's transaction
+def delete_retention_batch(db: Session, rows, before=None):
+    """Returns False (and rolls back) if a concurrent delete removed some of the rows since they were read."""
+    statement = delete(Feedback).where(Feedback.id.between(rows[0].id, rows[-1].id))
+    if before is not None:
+        statement = statement.where(Feedback.created_at < before)
+    if db.execute(statement).rowcount != len(rows):
+        db.rollback()
+        return False
+    _bump_counters(db, counter_deltas([row._mapping for row in rows], sign=-1))
+    return True
+
+# Delete all feedbacks: truncate instead of a row-by-row DELETE
+def truncate_statements():
+    """
+    TRUNCATE on MySQL / PostgreSQL (on MySQL it commits implicitly and resets AUTO_INCREMENT).
+    SQLite has no TRUNCATE; an unqualified DELETE is optimized into one, but only on tables
+    without triggers, so the FTS5 sync triggers are dropped around it and the index emptied directly.
+    Run them inside an open transaction: pysqlite only begins one before DML, so a DROP TRIGGER
+    issued first would commit at once and a rollback would leave the index without its triggers.
+    """
+    dialect = engine.dialect.name
+    if dialect in ("mysql", "postgresql"):
+        return [sql("TRUNCATE TABLE feedbacks")]
+    if fulltext_backend() != "fts5":
+        return [sql("DELETE FROM feedbacks")]
+    return (
+        [sql(f"DROP TRIGGER IF EXISTS {name}") for name in FTS5_TRIGGERS]
+        + [sql("DELETE FROM feedbacks"), sql("INSERT INTO feedbacks_fts(feedbacks_fts) VALUES ('delete-all')")]
+        + [sql(statement) for statement in FTS5_TRIGGERS.values()]
+    )
+
+def truncate_commits_implicitly():
+    """True when TRUNCATE commits on its own (MySQL), so the counters must be recounted afterwards."""
+    return engine.dialect.name == "mysql"
+
 def delete_all_feedbacks(db: Session):
-    db.query(Feedback).delete()
+    # Resetting the counters first also opens the transaction the truncate statements run in
+    db.query(FeedbackCounter).update({FeedbackCounter.count: 0, FeedbackCounter.score_sum: 0.0})
+    for statement in truncate_statements():
+        db.execute(statement)
     db.commit()
+    if truncate_commits_implicitly():
+        # Rows inserted between the reset and the TRUNCATE's implicit commit may have bumped the counters
+        rebuild_counters(db)
+
+# Stats: score percentiles per sentiment (nearest rank, weighted by occurrences)
+def get_score_percentiles(db: Session, sentiment: str, percentiles, since=None, until=None):
+    conditions = [Feedback.sentiment == sentiment]
+    if since is not None:
+        conditions.append(Feedback.created_at >= since)
+    if until is not None:
+        conditions.append(Feedback.created_at < until)
+    total = db.execute(select(func.coalesce(func.sum(Feedback.occurrences), 0)).where(*conditions)).scalar()
+    if not total:
+        return {percentile: None for percentile in percentiles}
+    # Running total of occurrences in score order: the row covering rank r is the first with running total > r
+    running = select(
+        Feedback.score,
+        func.sum(Feedback.occurrences).over(order_by=(Feedback.score, Feedback.id)).label("running"),
+    ).where(*conditions).subquery()
+    return {
+        percentile: db.execute(
+            select(running.c.score)
+            .where(running.c.running > round(percentile / 100 * (total - 1)))
+            .order_by(running.c.running)
+            .limit(1)
+        ).scalar()
+        for percentile in percentiles
+    }
+
+def _time_bucket(column, bucket: str):
+    """Dialect-specific expression truncating a timestamp to the hour or day."""
+    fmt = "%Y-%m-%d %H:00:00" if bucket == "hour" else "%Y-%m-%d 00:00:00"
+    if engine.dialect.name == "sqlite":
+        return func.strftime(fmt, column)
+    if engine.dialect.name == "postgresql":
+        return func.date_trunc(bucket, column)
+    return func.date_format(column, fmt)
+
+# Stats: feedback counts per hour/day bucket
+def get_sentiment_timeline(db: Session, bucket: str, since=None, until=None):
+    """
+    Returns [(bucket_start, positive, negative)] ordered by bucket.
+    Counts are weighted by occurrences; in dedup mode repeats fall in the bucket of the first submission.
+    """
+    bucket_expr = _time_bucket(Feedback.created_at, bucket).label("bucket")
+    query = db.query(
+        bucket_expr,
+        func.sum(case((Feedback.sentiment == "Positive", Feedback.occurrences), else_=0)),
+        func.sum(case((Feedback.sentiment == "Negative", Feedback.occurrences), else_=0)),
+    )
+    if since is not None:
+        query = query.filter(Feedback.created_at >= since)
+    if until is not None:
+        query = query.filter(Feedback.created_at < until)
+    return query.group_by(bucket_expr).order_by(bucket_expr).all()
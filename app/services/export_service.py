@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+
+from app.services.db_service import FEEDBACK_FIELDS
+
+# Parquet export is optional (requires pyarrow)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _row_dict(row):
+    data = dict(zip(FEEDBACK_FIELDS, row))
+    for field in ("created_at", "last_seen_at"):
+        data[field] = data[field].isoformat() if data[field] else None
+    return data
+
+
+def encode_ndjson(batches):
+    for batch in batches:
+        yield "".join(json.dumps(_row_dict(row)) + "\n" for row in batch)
+
+
+def encode_csv(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FEEDBACK_FIELDS)
+    for batch in batches:
+        writer.writerows(_row_dict(row).values() for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose buffered bytes are handed out after each row group."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def encode_parquet(batches):
+    """Write each batch as one Parquet row group and stream the file as it is produced."""
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("text", pa.string()),
+        ("sentiment", pa.string()),
+        ("score", pa.float64()),
+        ("created_at", pa.timestamp("us")),
+        ("model_version", pa.string()),
+        ("occurrences", pa.int64()),
+        ("last_seen_at", pa.timestamp("us")),
+    ])
+    sink = _DrainableSink()
+    with pq.ParquetWriter(sink, schema, compression="snappy") as writer:
+        for batch in batches:
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays([pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+ENCODERS = {
+    "ndjson": encode_ndjson,
+    "csv": encode_csv,
+    "parquet": encode_parquet,
+}
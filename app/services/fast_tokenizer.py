@@ -0,0 +1,110 @@
+"""
+Drop-in replacement for the pickled Keras `Tokenizer` at inference time.
+
+The vocabulary is exported once from tokenizer.pkl into a small JSON file
+holding only the words the model can see (ids 1 .. num_words - 1, stored as an
+array ordered by id) plus the text filters. Loading it needs no Keras, and
+tokenization produces exactly the ids of `Tokenizer.texts_to_sequences`.
+
+Export:
+    python -m app.services.fast_tokenizer export --tokenizer ml_models/ml_models/tokenizer.pkl --output ml_models/ml_models/tokenizer_vocab.json
+"""
+import argparse
+import json
+import os
+import pickle
+
+from app.services.numpy_lstm import pad_sequences
+
+# Keras Tokenizer defaults
+DEFAULT_FILTERS = '!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n'
+
+# Joins a batch into one string so lowercasing and filtering run once per batch
+_BATCH_SEPARATOR = "\x1e"
+
+
+class FastTokenizer:
+    """Keras-compatible word tokenizer over a fixed vocabulary."""
+
+    def __init__(self, words, filters: str = DEFAULT_FILTERS, lower: bool = True, split: str = " ", oov_token=None):
+        # words[i] has id i + 1; the OOV token, if any, is part of the vocabulary
+        self.index = {word: i + 1 for i, word in enumerate(words)}
+        self.words = list(words)
+        self.filters = filters
+        self.lower = lower
+        self.split = split
+        self.oov_token = oov_token
+        self.oov_index = self.index.get(oov_token) if oov_token is not None else None
+        self._table = str.maketrans({c: split for c in filters})
+        self._batchable = _BATCH_SEPARATOR not in filters and _BATCH_SEPARATOR != split
+
+    @classmethod
+    def from_keras(cls, tokenizer):
+        """Build from a fitted `keras.preprocessing.text.Tokenizer`, keeping ids below num_words."""
+        if getattr(tokenizer, "char_level", False):
+            raise ValueError("Character-level tokenizers are not supported")
+        by_index = sorted(tokenizer.word_index.items(), key=lambda item: item[1])
+        limit = tokenizer.num_words or (len(by_index) + 1)
+        words = [word for word, index in by_index if index < limit]
+        if [index for _, index in by_index[:len(words)]] != list(range(1, len(words) + 1)):
+            raise ValueError("Tokenizer word_index ids are not contiguous")
+        return cls(words, filters=tokenizer.filters, lower=tokenizer.lower, split=tokenizer.split, oov_token=tokenizer.oov_token)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["words"], filters=data["filters"], lower=data["lower"], split=data["split"], oov_token=data.get("oov_token"))
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "num_words": len(self.words) + 1,
+                "filters": self.filters,
+                "lower": self.lower,
+                "split": self.split,
+                "oov_token": self.oov_token,
+                "words": self.words,
+            }, f, ensure_ascii=False)
+
+    def _clean(self, texts):
+        """Lowercase and replace filter characters, once for the whole batch when possible."""
+        if self._batchable and len(texts) > 1 and not any(_BATCH_SEPARATOR in text for text in texts):
+            joined = _BATCH_SEPARATOR.join(texts)
+            if self.lower:
+                joined = joined.lower()
+            return joined.translate(self._table).split(_BATCH_SEPARATOR)
+        return [(text.lower() if self.lower else text).translate(self._table) for text in texts]
+
+    def texts_to_sequences(self, texts):
+        """Same ids as `Tokenizer.texts_to_sequences`."""
+        get = self.index.get
+        split = self.split
+        if self.oov_index is None:
+            return [list(filter(None, map(get, text.split(split)))) for text in self._clean(texts)]
+        oov = self.oov_index
+        return [[get(word, oov) for word in text.split(split) if word] for text in self._clean(texts)]
+
+    def texts_to_padded(self, texts, maxlen: int):
+        """Tokenize and left-pad a batch into an int32 array of shape (N, maxlen)."""
+        return pad_sequences(self.texts_to_sequences(texts), maxlen=maxlen)
+
+
+def main(argv=None):
+    from app.config import MODELS_DIR, TOKENIZER_VOCAB_PATH
+
+    parser = argparse.ArgumentParser(description="Export the pickled Keras tokenizer vocabulary")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export = subparsers.add_parser("export", help="Export the vocabulary")
+    export.add_argument("--tokenizer", default=os.path.join(MODELS_DIR, "tokenizer.pkl"), help="Pickled Keras tokenizer")
+    export.add_argument("--output", default=TOKENIZER_VOCAB_PATH, help="Output JSON file")
+    args = parser.parse_args(argv)
+
+    with open(args.tokenizer, "rb") as f:
+        tokenizer = FastTokenizer.from_keras(pickle.load(f))
+    tokenizer.save(args.output)
+    print(f"Exported {len(tokenizer.words)} words to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Process pool for model forward passes.
+
+Each worker process loads the exported NumPy model (see numpy_lstm) with its
+weights memory-mapped read-only, so every worker - and every uvicorn worker on
+the host - shares the same physical pages: adding inference workers adds CPU,
+not copies of the weights. The parent process tokenizes and pads; workers only
+receive (N, T) id arrays (T < MAX_LEN when leading padding is skipped) and
+return scores.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+
+from app.services import metrics
+
+WORKER_RESTARTS = metrics.counter("inference_worker_restarts", "Inference worker processes restarted after a crash or timeout")
+
+
+def available_cpus():
+    """CPUs this process may run on (respects container/affinity limits)."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _worker_main(connection, model_dir: str, cpu):
+    """Worker process: serve forward passes until the parent closes the pipe."""
+    if cpu is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpu})
+    from app.services.numpy_lstm import NumpyLSTMModel
+
+    model = NumpyLSTMModel.load(model_dir, mmap=True)
+    connection.send(("ready", os.getpid()))
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        task, payload = message
+        if task == "ping":
+            connection.send(("ok", None))
+            continue
+        try:
+            padded, skipped_padding = payload
+            connection.send(("ok", model.predict(padded, skipped_padding=skipped_padding)))
+        except Exception as e:
+            connection.send(("error", repr(e)))
+
+
+class _Worker:
+    def __init__(self, index: int, cpu):
+        self.index = index
+        self.cpu = cpu
+        self.process = None
+        self.connection = None
+        self.pid = None
+        self.tasks = 0
+        self.restarts = 0
+        self.last_error = None
+
+
+class InferencePool:
+    """
+    Fixed-size pool of inference worker processes.
+
+    `predict` blocks the calling thread until an idle worker has run the
+    forward pass. A worker that dies or times out is replaced and the call is
+    retried once on the fresh worker.
+    """
+
+    def __init__(self, model_dir: str, workers: int, pin_cpus: bool = True, timeout: float = 30):
+        self.model_dir = model_dir
+        self.timeout = timeout
+        cpus = available_cpus()
+        self._workers = [
+            _Worker(index, cpus[index % len(cpus)] if pin_cpus else None)
+            for index in range(max(1, workers))
+        ]
+        self._idle = queue.Queue()
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            for worker in self._workers:
+                self._spawn(worker)
+                self._idle.put(worker)
+            self._started = True
+
+    def _spawn(self, worker: _Worker):
+        parent, child = self._context.Pipe()
+        worker.process = self._context.Process(
+            target=_worker_main,
+            args=(child, self.model_dir, worker.cpu),
+            name=f"inference-worker-{worker.index}",
+            daemon=True,
+        )
+        worker.process.start()
+        child.close()
+        worker.connection = parent
+        if not parent.poll(self.timeout):
+            raise RuntimeError(f"Inference worker {worker.index} did not start within {self.timeout}s")
+        _, worker.pid = parent.recv()
+
+    def _restart(self, worker: _Worker, reason: str):
+        worker.last_error = reason
+        worker.restarts += 1
+        WORKER_RESTARTS.inc()
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join(timeout=5)
+        worker.connection.close()
+        self._spawn(worker)
+
+    def _call(self, worker: _Worker, task: str, payload):
+        worker.connection.send((task, payload))
+        if not worker.connection.poll(self.timeout):
+            raise TimeoutError(f"Inference worker {worker.index} timed out")
+        status, result = worker.connection.recv()
+        if status == "error":
+            raise RuntimeError(result)
+        return result
+
+    def predict(self, padded, skipped_padding: int = 0):
+        """Run the model over padded id sequences of shape (N, T); returns (N, 1) scores (see NumpyLSTMModel.predict)."""
+        self.start()
+        worker = self._idle.get()
+        try:
+            if not worker.process.is_alive():
+                self._restart(worker, f"exited with code {worker.process.exitcode}")
+            for attempt in range(2):
+                try:
+                    result = self._call(worker, "predict", (padded, skipped_padding))
+                    worker.tasks += 1
+                    return result
+                except (EOFError, OSError, TimeoutError) as e:
+                    self._restart(worker, repr(e))
+                    if attempt:
+                        raise
+        finally:
+            self._idle.put(worker)
+
+    def _ping_idle(self):
+        """Ping (and restart if needed) every worker that is currently idle."""
+        responsive = {}
+        idle = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for worker in idle:
+            try:
+                self._call(worker, "ping", None)
+                responsive[worker.index] = True
+            except (EOFError, OSError, TimeoutError, RuntimeError) as e:
+                self._restart(worker, repr(e))
+                responsive[worker.index] = False
+            finally:
+                self._idle.put(worker)
+        return responsive
+
+    def health(self):
+        """Per-worker status. Idle workers are pinged; unresponsive ones are restarted."""
+        responsive = self._ping_idle() if self._started else {}
+        return [
+            {
+                "index": worker.index,
+                "pid": worker.pid,
+                "cpu": worker.cpu,
+                "alive": worker.process is not None and worker.process.is_alive(),
+                "busy": self._started and worker.index not in responsive,
+                "responsive": responsive.get(worker.index),
+                "tasks": worker.tasks,
+                "restarts": worker.restarts,
+                "last_error": worker.last_error,
+            }
+            for worker in self._workers
+        ]
+
+    def stop(self):
+        with self._lock:
+            if not self._started:
+                return
+            for worker in self._workers:
+                try:
+                    worker.connection.send(None)
+                except OSError:
+                    pass
+                worker.process.join(timeout=5)
+                if worker.process.is_alive():
+                    worker.process.kill()
+                worker.connection.close()
+            self._idle = queue.Queue()
+            self._started = False
@@ -0,0 +1,206 @@
+"""
+Weighted sentiment lexicon scored in one pass over the text.
+
+Used by ml_service when no model is loaded (fallback mode). All lexicon terms
+and negations are compiled into one Aho-Corasick automaton, so scoring a text
+costs one transition per character plus a short output walk at each word end,
+independent of the number of terms.
+
+Matching is case-insensitive, on whole words; runs of whitespace count as one
+space, so multi-word terms ("waste of money") match across line breaks. When
+terms overlap, the longest one wins. A negation ("not", "never", ...) scales
+the terms starting within NEGATION_SCOPE words after it by NEGATION_WEIGHT,
+until the next clause punctuation. The summed weight is squashed into
+[0, 1] like VADER's compound score, so the same text always gets the same score.
+
+Lexicon files:
+    JSON  {"format": "weighted-lexicon", "terms": {"great": 3.1, ...}, "negations": ["not", ...]}
+    TSV   term<TAB>weight[<TAB>ignored...] per line (e.g. vader_lexicon.txt); default negations
+"""
+import json
+import math
+
+FORMAT = "weighted-lexicon"
+
+# Words after a negation that it applies to, and the factor applied to their weight
+NEGATION_SCOPE = 3
+NEGATION_WEIGHT = -0.75
+# compound = total / sqrt(total^2 + alpha): how fast the score saturates towards 0 or 1
+NORMALIZATION_ALPHA = 15.0
+# Characters that end a clause (and any negation scope)
+CLAUSE_BREAKS = frozenset(".,;:!?")
+
+DEFAULT_NEGATIONS = (
+    "not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "without", "hardly", "barely",
+    "don't", "doesn't", "didn't", "isn't", "aren't", "wasn't", "weren't", "won't", "wouldn't",
+    "can't", "cannot", "couldn't", "shouldn't", "haven't", "hasn't", "dont", "doesnt", "didnt", "isnt", "wasnt",
+)
+
+# Built-in terms (VADER-style weights, -4..4) used when no lexicon file is deployed
+DEFAULT_TERMS = {
+    "good": 1.9, "great": 3.1, "excellent": 2.7, "amazing": 2.8, "love": 3.2, "loved": 2.9, "best": 3.2,
+    "awesome": 3.1, "wonderful": 2.7, "fantastic": 2.6, "perfect": 2.7, "nice": 1.8, "happy": 2.7,
+    "recommend": 1.5, "enjoyed": 2.3, "fun": 2.3, "beautiful": 2.9, "brilliant": 2.8, "like": 1.5,
+    "works great": 2.5, "well done": 2.5,
+    "bad": -2.5, "terrible": -2.1, "awful": -2.0, "hate": -2.7, "hated": -3.2, "worst": -3.1,
+    "horrible": -2.5, "poor": -2.1, "disappointing": -2.2, "disappointed": -1.9, "boring": -1.3,
+    "broken": -1.6, "useless": -1.8, "waste": -1.8, "waste of money": -2.8, "refund": -1.2,
+    "annoying": -1.9, "sucks": -1.5, "rude": -2.0, "slow": -0.9,
+    "not bad": 1.5,
+}
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _normalize_term(term: str) -> str:
+    term = " ".join(term.lower().split())
+    if not term or not _is_word_char(term[0]) or not _is_word_char(term[-1]):
+        raise ValueError(f"Lexicon terms must start and end with a letter or digit: {term!r}")
+    return term
+
+
+class LexiconScorer:
+    """Aho-Corasick automaton over weighted terms and negations."""
+
+    def __init__(self, terms, negations=DEFAULT_NEGATIONS, negation_scope: int = NEGATION_SCOPE,
+                 negation_weight: float = NEGATION_WEIGHT, alpha: float = NORMALIZATION_ALPHA):
+        self.terms = {_normalize_term(term): float(weight) for term, weight in dict(terms).items()}
+        # A term that is also a negation is scored as a term
+        self.negations = frozenset(_normalize_term(term) for term in negations) - set(self.terms)
+        self.negation_scope = int(negation_scope)
+        self.negation_weight = float(negation_weight)
+        self.alpha = float(alpha)
+        self._build()
+
+    def _build(self):
+        # Pattern i: length in characters and weight (None for a negation)
+        patterns = list(self.terms.items()) + [(term, None) for term in sorted(self.negations)]
+        self._lengths = [len(term) for term, _ in patterns]
+        self._weights = [weight for _, weight in patterns]
+
+        goto, match = [{}], [-1]
+        for index, (term, _) in enumerate(patterns):
+            state = 0
+            for char in term:
+                if char not in goto[state]:
+                    goto.append({})
+                    match.append(-1)
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            match[state] = index
+
+        # Breadth-first failure links; `link` points at the nearest suffix state that ends a pattern,
+        # so the matches ending at a state are match[state], match[link[state]], ... longest first
+        fail, link = [0] * len(goto), [0] * len(goto)
+        queue = list(goto[0].values())  # depth 1: fail to the root
+        for state in queue:
+            for char, child in goto[state].items():
+                queue.append(child)
+                suffix = fail[state]
+                while suffix and char not in goto[suffix]:
+                    suffix = fail[suffix]
+                fail[child] = goto[suffix].get(char, 0)
+                link[child] = fail[child] if match[fail[child]] >= 0 else link[fail[child]]
+        self._goto, self._fail, self._match, self._link = goto, fail, match, link
+
+    @classmethod
+    def default(cls):
+        return cls(DEFAULT_TERMS)
+
+    @classmethod
+    def load(cls, path: str):
+        """Load a JSON export, or a TSV file with one `term<TAB>weight` per line."""
+        if path.endswith(".json"):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != FORMAT:
+                raise ValueError(f"{path} is not a {FORMAT} export")
+            options = {key: data[key] for key in ("negation_scope", "negation_weight", "alpha") if key in data}
+            return cls(data["terms"], data.get("negations", DEFAULT_NEGATIONS), **options)
+        terms = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                fields = line.rstrip("\n").split("\t")
+                term = " ".join(fields[0].lower().split())
+                # Emoticons and other punctuation-only entries cannot match on word boundaries
+                if term and _is_word_char(term[0]) and _is_word_char(term[-1]):
+                    terms[term] = float(fields[1])
+        return cls(terms)
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "format": FORMAT,
+                "terms": self.terms,
+                "negations": sorted(self.negations),
+                "negation_scope": self.negation_scope,
+                "negation_weight": self.negation_weight,
+                "alpha": self.alpha,
+            }, f)
+
+    def total(self, text: str) -> float:
+        """Summed weight of the terms matched in `text`, after negation and overlap resolution."""
+        goto, fail, match, link = self._goto, self._fail, self._match, self._link
+        lengths, weights = self._lengths, self._weights
+        state = 0
+        position = -1  # index of the last character fed to the automaton
+        word = -1  # index of the current word
+        word_starts = {}  # position -> index of the word starting there
+        in_word = space = False
+        negation_word, negated_until = -1, -1
+        accepted = []  # (start word, weight, end word) of the counted terms, in text order
+
+        for char in text.lower() + " ":  # the trailing space ends the last word
+            if _is_word_char(char):
+                if not in_word:
+                    word += 1
+                    word_starts[position + 1] = word
+                    in_word = True
+                space = False
+            else:
+                if in_word:
+                    in_word = False
+                    # Longest pattern ending at this word end that also starts on a word boundary
+                    node = state if match[state] >= 0 else link[state]
+                    while node:
+                        index = match[node]
+                        start = word_starts.get(position - lengths[index] + 1)
+                        if start is not None:
+                            weight = weights[index]
+                            if weight is None:
+                                negation_word, negated_until = word, word + self.negation_scope
+                            else:
+                                if negation_word < start <= negated_until:
+                                    weight *= self.negation_weight
+                                # A longer term covering earlier matches replaces them
+                                while accepted and start <= accepted[-1][0]:
+                                    accepted.pop()
+                                if not accepted or start > accepted[-1][2]:
+                                    accepted.append((start, weight, word))
+                            break
+                        node = link[node]
+                if char in CLAUSE_BREAKS:
+                    negated_until = -1
+                if char.isspace():
+                    if space:
+                        continue
+                    char, space = " ", True
+                else:
+                    space = False
+            position += 1
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+        return sum(weight for _, weight, _ in accepted)
+
+    def score(self, total: float) -> float:
+        """Map a summed weight to [0, 1]; 0.5 when nothing matched."""
+        return 0.5 + 0.5 * total / math.sqrt(total * total + self.alpha)
+
+    def predict_proba(self, texts):
+        """Positive-class score per text, in input order."""
+        return [self.score(self.total(text)) for text in texts]
@@ -0,0 +1,170 @@
+"""
+Serving runtime for the notebook's TF-IDF + LogisticRegression baseline.
+
+The fitted `TfidfVectorizer` and `LogisticRegression` are exported once into a
+JSON file (vocabulary, idf, coefficients and the vectorizer settings); scoring
+then needs neither scikit-learn nor SciPy. Scores match
+`log_reg.predict_proba(tfidf.transform(texts))` for the positive class.
+
+Per text the cost is one regex scan plus a dictionary lookup per token, so it
+is used as the cheap first stage of the cascade in ml_service.
+
+Export (pickle `tfidf` and `log_reg` from model.ipynb first):
+    python -m app.services.linear_model export --vectorizer tfidf.pkl --classifier log_reg.pkl --output ml_models/ml_models/linear_model.json
+"""
+import argparse
+import json
+import math
+import pickle
+import re
+from collections import Counter
+
+FORMAT = "tfidf-logreg"
+# Positive class for the label sets the notebook uses (classes compared as lowercase strings)
+DEFAULT_POSITIVE_LABELS = {frozenset({"0", "1"}): "1", frozenset({"negative", "positive"}): "positive"}
+
+
+class SparseLinearModel:
+    """TF-IDF features scored by a binary logistic regression."""
+
+    def __init__(self, vocabulary, idf, coef, intercept: float, token_pattern: str = r"(?u)\b\w\w+\b",
+                 lowercase: bool = True, stop_words=(), ngram_range=(1, 1), sublinear_tf: bool = False,
+                 binary: bool = False, norm="l2"):
+        if norm not in ("l2", None):
+            raise ValueError(f"Unsupported norm: {norm}")
+        self.vocabulary, self.idf, self.coef = list(vocabulary), list(idf), list(coef)
+        # term -> (idf, idf * coef): the numerator of the logit only needs the product
+        self.terms = {term: (idf[i], idf[i] * coef[i]) for i, term in enumerate(vocabulary)}
+        self.intercept = float(intercept)
+        self.token_pattern = token_pattern
+        self.lowercase = lowercase
+        self.stop_words = frozenset(stop_words or ())
+        self.ngram_range = tuple(ngram_range)
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+        self.norm = norm
+        self._tokens = re.compile(token_pattern).findall
+
+    @classmethod
+    def from_sklearn(cls, vectorizer, classifier, positive_label=None):
+        """
+        Build from a fitted `TfidfVectorizer` and binary `LogisticRegression`.
+
+        `positive_label` defaults to 1 for 0/1 classes and "positive" for negative/positive ones.
+        """
+        if vectorizer.analyzer != "word" or vectorizer.preprocessor is not None or vectorizer.tokenizer is not None \
+                or vectorizer.strip_accents is not None:
+            raise ValueError("Only the default word analyzer without custom preprocessing is supported")
+        if len(classifier.classes_) != 2:
+            raise ValueError("Only binary classifiers are supported")
+        labels = [str(label).lower() for label in classifier.classes_]
+        if positive_label is None:
+            positive_label = DEFAULT_POSITIVE_LABELS.get(frozenset(labels))
+            if positive_label is None:
+                raise ValueError(f"Cannot tell the positive class of {list(classifier.classes_)}: pass positive_label")
+        if str(positive_label).lower() not in labels:
+            raise ValueError(f"Positive label {positive_label!r} not in classifier classes {list(classifier.classes_)}")
+        # predict_proba's second column is classes_[1]; flip the model if that is the negative class
+        sign = 1.0 if labels.index(str(positive_label).lower()) == 1 else -1.0
+        vocabulary = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+        idf = vectorizer.idf_.tolist() if vectorizer.use_idf else [1.0] * len(vocabulary)
+        return cls(
+            vocabulary,
+            idf,
+            (sign * classifier.coef_[0]).tolist(),
+            sign * float(classifier.intercept_[0]),
+            token_pattern=vectorizer.token_pattern,
+            lowercase=vectorizer.lowercase,
+            stop_words=sorted(vectorizer.get_stop_words() or ()),
+            ngram_range=vectorizer.ngram_range,
+            sublinear_tf=vectorizer.sublinear_tf,
+            binary=vectorizer.binary,
+            norm=vectorizer.norm,
+        )
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != FORMAT:
+            raise ValueError(f"{path} is not a {FORMAT} export")
+        return cls(
+            data["vocabulary"], data["idf"], data["coef"], data["intercept"],
+            token_pattern=data["token_pattern"], lowercase=data["lowercase"], stop_words=data["stop_words"],
+            ngram_range=data["ngram_range"], sublinear_tf=data["sublinear_tf"], binary=data["binary"], norm=data["norm"],
+        )
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "format": FORMAT,
+                "vocabulary": self.vocabulary,
+                "idf": self.idf,
+                "coef": self.coef,
+                "intercept": self.intercept,
+                "token_pattern": self.token_pattern,
+                "lowercase": self.lowercase,
+                "stop_words": sorted(self.stop_words),
+                "ngram_range": list(self.ngram_range),
+                "sublinear_tf": self.sublinear_tf,
+                "binary": self.binary,
+                "norm": self.norm,
+            }, f, ensure_ascii=False)
+
+    def _ngrams(self, text: str):
+        tokens = [token for token in self._tokens(text.lower() if self.lowercase else text) if token not in self.stop_words]
+        low, high = self.ngram_range
+        if (low, high) == (1, 1):
+            return tokens
+        grams = []
+        for n in range(low, min(high, len(tokens)) + 1):
+            grams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return grams
+
+    def _score(self, text: str) -> float:
+        terms = self.terms
+        numerator = 0.0
+        squares = 0.0
+        for term, count in Counter(self._ngrams(text)).items():
+            weights = terms.get(term)
+            if weights is None:
+                continue
+            tf = 1.0 if self.binary else (1.0 + math.log(count) if self.sublinear_tf else float(count))
+            numerator += tf * weights[1]
+            squares += (tf * weights[0]) ** 2
+        if self.norm == "l2" and squares:
+            numerator /= math.sqrt(squares)
+        logit = numerator + self.intercept
+        if logit >= 0:
+            return 1.0 / (1.0 + math.exp(-logit))
+        exp = math.exp(logit)
+        return exp / (1.0 + exp)
+
+    def predict_proba(self, texts):
+        """Probability of the positive class for each text."""
+        return [self._score(text) for text in texts]
+
+
+def main(argv=None):
+    from app.config import LINEAR_MODEL_PATH
+
+    parser = argparse.ArgumentParser(description="Export the TF-IDF + LogisticRegression baseline")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export = subparsers.add_parser("export", help="Export a fitted vectorizer and classifier")
+    export.add_argument("--vectorizer", required=True, help="Pickled TfidfVectorizer")
+    export.add_argument("--classifier", required=True, help="Pickled LogisticRegression")
+    export.add_argument("--positive-label", help="Class label of positive reviews (default: 1 or positive)")
+    export.add_argument("--output", default=LINEAR_MODEL_PATH, help="Output JSON file")
+    args = parser.parse_args(argv)
+
+    with open(args.vectorizer, "rb") as f:
+        vectorizer = pickle.load(f)
+    with open(args.classifier, "rb") as f:
+        classifier = pickle.load(f)
+    model = SparseLinearModel.from_sklearn(vectorizer, classifier, positive_label=args.positive_label)
+    model.save(args.output)
+    print(f"Exported {len(model.terms)} terms to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
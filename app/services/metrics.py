@@ -0,0 +1,232 @@
+import math
+import threading
+from bisect import bisect_left
+
+# In-process metrics registry (name -> metric)
+_registry = {}
+_registry_lock = threading.Lock()
+
+# Default buckets for latencies in seconds (0.5 ms .. 10 s)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    """Monotonically increasing counter."""
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self):
+        return {"type": "counter", "description": self.description, "value": self.value}
+
+    def samples(self):
+        return [("", {}, self.value)]
+
+
+class Gauge:
+    """Value that can go up and down, or be read from a callback at snapshot time."""
+
+    TYPE = "gauge"
+
+    def __init__(self, name: str, description: str, function=None):
+        self.name = name
+        self.description = description
+        self.function = function
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def get(self):
+        return self.function() if self.function is not None else self.value
+
+    def snapshot(self):
+        return {"type": "gauge", "description": self.description, "value": self.get()}
+
+    def samples(self):
+        return [("", {}, self.get())]
+
+
+class Histogram:
+    """Histogram with fixed bucket upper bounds (cumulative, Prometheus style)."""
+
+    TYPE = "histogram"
+
+    def __init__(self, name: str, description: str, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def _cumulative(self):
+        with self._lock:
+            counts = list(self.counts)
+            total, count = self.sum, self.count
+        cumulative, buckets = 0, []
+        for bound, bucket_count in zip(list(self.buckets) + [math.inf], counts):
+            cumulative += bucket_count
+            buckets.append((bound, cumulative))
+        return buckets, total, count
+
+    def snapshot(self):
+        buckets, total, count = self._cumulative()
+        return {
+            "type": "histogram",
+            "description": self.description,
+            "count": count,
+            "sum": total,
+            "mean": (total / count) if count else 0,
+            "buckets": {("+Inf" if bound == math.inf else str(bound)): value for bound, value in buckets},
+        }
+
+    def samples(self):
+        buckets, total, count = self._cumulative()
+        samples = [("_bucket", {"le": _format_number(bound)}, value) for bound, value in buckets]
+        samples.append(("_sum", {}, total))
+        samples.append(("_count", {}, count))
+        return samples
+
+
+class Family:
+    """
+    A metric with label dimensions. `labels(*values)` returns the child metric
+    for one combination of label values, created on first use; hot paths should
+    resolve their children once and keep them.
+    """
+
+    def __init__(self, name: str, kind, description: str, labelnames, *args):
+        self.name = name
+        self.kind = kind
+        self.TYPE = kind.TYPE
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._args = args
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self.kind(self.name, self.description, *self._args))
+        return child
+
+    def series(self):
+        with self._lock:
+            children = list(self._children.items())
+        return [(dict(zip(self.labelnames, values)), child) for values, child in children]
+
+    def snapshot(self):
+        series = []
+        for labels, child in self.series():
+            data = child.snapshot()
+            del data["type"], data["description"]
+            series.append({"labels": labels, **data})
+        return {"type": self.TYPE, "description": self.description, "labels": list(self.labelnames), "series": series}
+
+
+def _get_or_create(cls, name, *args):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = cls(name, *args)
+            _registry[name] = metric
+        return metric
+
+
+def counter(name: str, description: str, labels=()) -> Counter:
+    if labels:
+        return _get_or_create(Family, name, Counter, description, labels)
+    return _get_or_create(Counter, name, description)
+
+
+def gauge(name: str, description: str, function=None, labels=()) -> Gauge:
+    if labels:
+        return _get_or_create(Family, name, Gauge, description, labels)
+    return _get_or_create(Gauge, name, description, function)
+
+
+def histogram(name: str, description: str, buckets=LATENCY_BUCKETS, labels=()) -> Histogram:
+    if labels:
+        return _get_or_create(Family, name, Histogram, description, labels, buckets)
+    return _get_or_create(Histogram, name, description, buckets)
+
+
+def stage(name: str) -> Histogram:
+    """Latency histogram of one hot-path stage (tokenize, forward, db_commit, serialize, ...)."""
+    return histogram("stage_duration_seconds", "Time spent per hot-path stage", labels=("stage",)).labels(name)
+
+
+def snapshot():
+    """Return a JSON-serializable view of every registered metric."""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    return {metric.name: metric.snapshot() for metric in metrics}
+
+
+# Prometheus text exposition format (version 0.0.4)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_number(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_prometheus() -> str:
+    """Every registered metric in the Prometheus text format."""
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda metric: metric.name)
+    lines = []
+    for metric in metrics:
+        help_text = metric.description.replace("\\", "\\\\").replace("\n", "\\n")
+        lines.append(f"# HELP {metric.name} {help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+        series = metric.series() if isinstance(metric, Family) else [({}, metric)]
+        for labels, child in series:
+            for suffix, extra, value in child.samples():
+                pairs = {**labels, **extra}
+                label_text = ",".join(f'{key}="{_escape(str(label))}"' for key, label in pairs.items())
+                lines.append(f"{metric.name}{suffix}{{{label_text}}} {_format_number(value)}" if label_text
+                             else f"{metric.name}{suffix} {_format_number(value)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,221 @@
+"""
+Versioned schema migrations, applied in order by `migrate()` from init_db()
+(the app lifespan and init_db.py).
+
+The schema_version table records the migrations that ran. Each migration also
+inspects the live schema before changing it, so databases created by the old
+`create_all` setup (which have no schema_version table) are upgraded through
+the same steps as new ones.
+
+    python -m app.services.migrations status
+    python -m app.services.migrations upgrade
+"""
+import argparse
+import contextlib
+from collections import namedtuple
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, String, Table, inspect, insert, select, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+from app.models.db_models import Feedback, SchemaVersion, SentimentType
+from app.text_utils import content_hash
+
+Migration = namedtuple("Migration", "version description apply")
+MIGRATIONS = []
+
+# Rows per statement when backfilling a new column
+BACKFILL_BATCH_SIZE = 1000
+
+def migration(version: int, description: str):
+    def register(function):
+        MIGRATIONS.append(Migration(version, description, function))
+        return function
+    return register
+
+def _columns(connection, table: str):
+    return {column["name"]: column for column in inspect(connection).get_columns(table)}
+
+def _indexes(connection, table: str):
+    return {index["name"] for index in inspect(connection).get_indexes(table)}
+
+# Schema as it was before migrations existed (what create_all used to build)
+_baseline = MetaData()
+Table(
+    "feedbacks", _baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("text", String(1000)),
+    Column("sentiment", String(10)),
+    Column("score", Float),
+    Column("created_at", DateTime),
+)
+Table(
+    "feedback_counters", _baseline,
+    Column("sentiment", String(10), primary_key=True),
+    Column("count", Integer, nullable=False),
+    Column("score_sum", Float, nullable=False),
+)
+
+@migration(1, "feedbacks and feedback_counters tables")
+def _create_baseline(connection):
+    _baseline.create_all(connection, checkfirst=True)
+
+@migration(2, "feedbacks.model_version")
+def _add_model_version(connection):
+    if "model_version" not in _columns(connection, "feedbacks"):
+        connection.execute(text("ALTER TABLE feedbacks ADD COLUMN model_version VARCHAR(64)"))
+
+@migration(3, "feedbacks.sentiment as a one-byte code instead of VARCHAR(10)")
+def _compact_sentiment(connection):
+    columns = _columns(connection, "feedbacks")
+    if "sentiment_code" not in columns and isinstance(columns["sentiment"]["type"], Integer):
+        return
+    dialect = connection.dialect
+    column_type = SentimentType().load_dialect_impl(dialect).compile(dialect=dialect)
+    cases = " ".join(f"WHEN '{label}' THEN {code}" for label, code in SentimentType.CODES.items())
+    # Add, copy, drop, rename: works on SQLite (no ALTER COLUMN) and MySQL alike. MySQL commits each
+    # ALTER on its own, so every step checks whether an interrupted earlier run already did it.
+    if "sentiment_code" not in columns:
+        connection.execute(text(f"ALTER TABLE feedbacks ADD COLUMN sentiment_code {column_type}"))
+    if "sentiment" in columns:
+        connection.execute(text(f"UPDATE feedbacks SET sentiment_code = CASE sentiment {cases} END"))
+        connection.execute(text("ALTER TABLE feedbacks DROP COLUMN sentiment"))
+    connection.execute(text("ALTER TABLE feedbacks RENAME COLUMN sentiment_code TO sentiment"))
+
+@migration(4, "feedbacks.content_hash, backfilled for existing rows")
+def _add_content_hash(connection):
+    if "content_hash" not in _columns(connection, "feedbacks"):
+        connection.execute(text("ALTER TABLE feedbacks ADD COLUMN content_hash VARCHAR(64)"))
+    after_id = 0
+    while True:
+        rows = connection.execute(
+            text("SELECT id, text FROM feedbacks WHERE id > :after_id AND content_hash IS NULL ORDER BY id LIMIT :limit"),
+            {"after_id": after_id, "limit": BACKFILL_BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            text("UPDATE feedbacks SET content_hash = :content_hash WHERE id = :id"),
+            [{"id": row_id, "content_hash": content_hash(row_text or "")} for row_id, row_text in rows],
+        )
+        after_id = rows[-1][0]
+
+@migration(5, "indexes on (sentiment, created_at), created_at and content_hash")
+def _add_query_indexes(connection):
+    existing = _indexes(connection, "feedbacks")
+    for index in Feedback.__table__.indexes:
+        if index.name in ("ix_feedbacks_sentiment_created_at", "ix_feedbacks_created_at", "ix_feedbacks_content_hash") \
+                and index.name not in existing:
+            index.create(connection)
+
+# Triggers keeping the SQLite FTS5 table in sync with feedbacks (also recreated by db_service's truncate path)
+FTS5_TRIGGERS = {
+    "feedbacks_fts_insert":
+        "CREATE TRIGGER IF NOT EXISTS feedbacks_fts_insert AFTER INSERT ON feedbacks BEGIN "
+        "INSERT INTO feedbacks_fts(rowid, text) VALUES (new.id, new.text); END",
+    "feedbacks_fts_delete":
+        "CREATE TRIGGER IF NOT EXISTS feedbacks_fts_delete AFTER DELETE ON feedbacks BEGIN "
+        "INSERT INTO feedbacks_fts(feedbacks_fts, rowid, text) VALUES ('delete', old.id, old.text); END",
+    "feedbacks_fts_update":
+        "CREATE TRIGGER IF NOT EXISTS feedbacks_fts_update AFTER UPDATE OF text ON feedbacks BEGIN "
+        "INSERT INTO feedbacks_fts(feedbacks_fts, rowid, text) VALUES ('delete', old.id, old.text); "
+        "INSERT INTO feedbacks_fts(rowid, text) VALUES (new.id, new.text); END",
+}
+
+@migration(6, "full-text index on feedbacks.text (SQLite FTS5 table + triggers, or MySQL FULLTEXT)")
+def _add_fulltext_index(connection):
+    dialect = connection.dialect.name
+    if dialect == "mysql":
+        if "ft_feedbacks_text" not in _indexes(connection, "feedbacks"):
+            connection.execute(text("ALTER TABLE feedbacks ADD FULLTEXT INDEX ft_feedbacks_text (text)"))
+        return
+    if dialect != "sqlite":
+        print(f"Warning: no full-text index for {dialect}; search falls back to unindexed LIKE scans")
+        return
+    try:
+        # External-content table: the text lives in feedbacks only, the triggers keep the index in sync
+        connection.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS feedbacks_fts USING fts5("
+            "text, content='feedbacks', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        ))
+    except OperationalError:
+        print("Warning: this SQLite build has no FTS5; search falls back to unindexed LIKE scans")
+        return
+    for statement in FTS5_TRIGGERS.values():
+        connection.execute(text(statement))
+    connection.execute(text("INSERT INTO feedbacks_fts(feedbacks_fts) VALUES ('rebuild')"))
+
+@migration(7, "feedbacks.occurrences, last_seen_at and dedup_key for deduplicated storage")
+def _add_dedup_columns(connection):
+    existing = _columns(connection, "feedbacks")
+    if "occurrences" not in existing:
+        connection.execute(text("ALTER TABLE feedbacks ADD COLUMN occurrences INTEGER NOT NULL DEFAULT 1"))
+    if "last_seen_at" not in existing:
+        connection.execute(text("ALTER TABLE feedbacks ADD COLUMN last_seen_at DATETIME"))
+        connection.execute(text("UPDATE feedbacks SET last_seen_at = created_at"))
+    if "dedup_key" not in existing:
+        connection.execute(text("ALTER TABLE feedbacks ADD COLUMN dedup_key VARCHAR(64)"))
+    if "ux_feedbacks_dedup_key" not in _indexes(connection, "feedbacks"):
+        # Unique but nullable: rows stored outside dedup mode (null key) never conflict
+        next(index for index in Feedback.__table__.indexes if index.name == "ux_feedbacks_dedup_key").create(connection)
+
+@contextlib.contextmanager
+def _migration_lock(engine):
+    """Serialize migrations across workers starting together (MySQL named lock; SQLite locks the file itself)."""
+    if engine.dialect.name != "mysql":
+        yield
+        return
+    with engine.connect() as connection:
+        if not connection.execute(text("SELECT GET_LOCK('feedbacks_schema_migrations', 300)")).scalar():
+            raise RuntimeError("Timed out waiting for another process to finish the schema migrations")
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT RELEASE_LOCK('feedbacks_schema_migrations')"))
+
+def applied_versions(engine):
+    if not inspect(engine).has_table(SchemaVersion.__tablename__):
+        return set()
+    with engine.connect() as connection:
+        return set(connection.execute(select(SchemaVersion.version)).scalars())
+
+def migrate(engine, target: int = None):
+    """Apply pending migrations up to `target` (default: all). Returns the versions applied. Idempotent."""
+    SchemaVersion.__table__.create(engine, checkfirst=True)
+    applied = []
+    with _migration_lock(engine):
+        done = applied_versions(engine)
+        for step in sorted(MIGRATIONS):
+            if step.version in done or (target is not None and step.version > target):
+                continue
+            try:
+                with engine.begin() as connection:
+                    step.apply(connection)
+                    connection.execute(insert(SchemaVersion).values(version=step.version, description=step.description))
+            except IntegrityError:
+                # Another worker recorded this version first
+                continue
+            applied.append(step.version)
+    unknown = applied_versions(engine) - {step.version for step in MIGRATIONS}
+    if unknown:
+        print(f"Warning: database has schema versions unknown to this code: {sorted(unknown)}")
+    return applied
+
+def main(argv=None):
+    from app.services.db_service import engine
+
+    parser = argparse.ArgumentParser(description="Apply or inspect schema migrations")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("status", help="List migrations and whether they are applied")
+    upgrade = subparsers.add_parser("upgrade", help="Apply pending migrations")
+    upgrade.add_argument("--target", type=int, help="Stop after this version")
+    args = parser.parse_args(argv)
+
+    if args.command == "upgrade":
+        applied = migrate(engine, args.target)
+        print(f"Applied: {', '.join(map(str, applied))}" if applied else "Schema is up to date")
+    else:
+        done = applied_versions(engine)
+        for step in sorted(MIGRATIONS):
+            marker = "*" if step.version in done else " "
+            print(f"{marker} {step.version:>4}  {step.description}")
+
+if __name__ == "__main__":
+    main()
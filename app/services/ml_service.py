@@ -1,59 +1,465 @@
 import pickle
 import os
-from tensorflow.keras.preprocessing.sequence import pad_sequences
-import random
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from app.config import (
+    BATCHING_ENABLED, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, PREDICT_CHUNK_SIZE,
+    INFERENCE_BACKEND, NUMPY_MODEL_DIR, TOKENIZER_VOCAB_PATH, MODEL_REGISTRY_DIR,
+    LINEAR_MODEL_PATH, LEXICON_PATH, PREDICT_MODEL, CASCADE_BAND, LENGTH_AWARE_INFERENCE, LENGTH_BUCKETS,
+    INFERENCE_WORKERS, INFERENCE_PIN_CPUS, INFERENCE_TIMEOUT_SECONDS,
+    CACHE_ENABLED, CACHE_MAX_SIZE, CACHE_TTL_SECONDS, CACHE_SHARED_PATH
+)
+# Keras-compatible padding in NumPy; TensorFlow is only imported when model.pkl is unpickled
+from app.services.numpy_lstm import NumpyLSTMModel, length_buckets, pad_sequences
+from app.services import metrics
+from app.services.batching import MicroBatcher
+from app.services.fast_tokenizer import FastTokenizer
+from app.services.cache import PredictionCache, SQLiteCacheTier
+from app.services.inference_pool import InferencePool, available_cpus
+from app.services.lexicon import LexiconScorer
+from app.services.linear_model import SparseLinearModel
+from app.services.model_registry import ModelArtifacts, ModelRegistry
 
 # Get the absolute path to the project root
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Paths to ML model and tokenizer
+# Paths to ML model and tokenizer (used when the registry has no active version)
 MODEL_PATH = os.path.join(BASE_DIR, "ml_models/ml_models/model.pkl")
 TOKENIZER_PATH = os.path.join(BASE_DIR, "ml_models/ml_models/tokenizer.pkl")
 MAX_LEN = 200
 
-# Load tokenizer and model once (with error handling for testing)
-try:
-    tokenizer = pickle.load(open(TOKENIZER_PATH, "rb"))
-    model = pickle.load(open(MODEL_PATH, "rb"))
-except Exception as e:
-    print(f"Warning: Could not load ML model: {e}")
-    print("Using mock model for testing purposes...")
-    tokenizer = None
-    model = None
+# The exported vocabulary tokenizes without Keras; fall back to the pickled Keras Tokenizer
+tokenizer_artifact = TOKENIZER_VOCAB_PATH if os.path.exists(TOKENIZER_VOCAB_PATH) else TOKENIZER_PATH
 
-def predict_sentiment(text: str):
+WARMUP_TEXT = "warm up the sentiment model"
+
+# Models a prediction can be served by
+PREDICT_MODELS = ("lstm", "linear", "cascade")
+
+# Per-stage latencies of the prediction hot path
+TOKENIZE_SECONDS = metrics.stage("tokenize")
+PAD_SECONDS = metrics.stage("pad")
+FORWARD_SECONDS = metrics.stage("forward")
+LINEAR_SECONDS = metrics.stage("linear")
+LEXICON_SECONDS = metrics.stage("lexicon")
+PREDICT_SECONDS = metrics.stage("predict")
+FORWARD_BATCH_SIZE = metrics.histogram(
+    "model_forward_batch_size",
+    "Rows per model forward pass (after micro-batching and chunking)",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+)
+
+PADDING_STEPS_SKIPPED = metrics.counter(
+    "lstm_padding_steps_skipped", "Padding timesteps not run thanks to length-aware inference (rows x steps)"
+)
+
+CASCADE_TEXTS = metrics.counter("cascade_texts", "Texts scored through the linear -> LSTM cascade")
+CASCADE_SHORT_CIRCUITS = metrics.counter("cascade_short_circuits", "Cascade texts answered by the linear model alone")
+CASCADE_SECONDS_SAVED = metrics.counter(
+    "cascade_seconds_saved", "Estimated LSTM time saved by short-circuited texts, net of linear scoring time"
+)
+
+registry = ModelRegistry(MODEL_REGISTRY_DIR)
+
+def artifact_version(*paths):
+    """Fingerprint of model artifacts (name, size and mtime of every file)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        files = [path]
+        if os.path.isdir(path):
+            files = [os.path.join(path, name) for name in sorted(os.listdir(path))]
+        for file in files:
+            stat = os.stat(file)
+            digest.update(f"{os.path.basename(file)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
+def _label(prediction):
+    sentiment = "Positive" if prediction > 0.5 else "Negative"
+    return sentiment, float(prediction)
+
+
+class ModelHandle:
     """
-    Predict sentiment of a single text input.
-    Returns sentiment label and probability/score.
+    One loaded model version: tokenizer, model, optional worker pool and its own micro-batcher.
+
+    Requests hold the handle for their whole prediction (`acquire`/`release`),
+    so swapping in a new version never changes the model under a request;
+    `retire` waits for them before releasing the old version's resources.
     """
-    # If model is loaded, use it
-    if model is not None and tokenizer is not None:
+
+    def __init__(self, version: str, backend: str, tokenizer, model, pool=None, linear=None):
+        self.version = version
+        self.backend = backend
+        self.tokenizer = tokenizer
+        self.model = model
+        self.pool = pool
+        # Optional TF-IDF + LogisticRegression first stage for the cascade
+        self.linear = linear
+        self.linear_version = f"{version}:linear"
+        # Moving average of LSTM seconds per text, used to estimate what the cascade saves
+        self.seconds_per_text = None
+        # Concurrent requests are coalesced into shared forward passes
+        self.batcher = MicroBatcher(self.predict, max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS)
+        self._in_flight = 0
+        self._idle = threading.Condition()
+
+    def acquire(self):
+        with self._idle:
+            self._in_flight += 1
+
+    def release(self):
+        with self._idle:
+            self._in_flight -= 1
+            if not self._in_flight:
+                self._idle.notify_all()
+
+    def _forward(self, padded_input, skipped_padding: int = 0):
+        forward_started = time.perf_counter()
+        if self.pool is not None:
+            predictions = self.pool.predict(padded_input, skipped_padding)
+        elif skipped_padding:
+            predictions = self.model.predict(padded_input, verbose=0, skipped_padding=skipped_padding)
+        else:
+            predictions = self.model.predict(padded_input, verbose=0)
+        FORWARD_SECONDS.observe(time.perf_counter() - forward_started)
+        FORWARD_BATCH_SIZE.observe(len(padded_input))
+        return predictions[:, 0]
+
+    def _predict_padded(self, sequences):
+        """Pad the whole batch once into a single (N, MAX_LEN) tensor; forward passes of at most PREDICT_CHUNK_SIZE rows."""
+        padding_started = time.perf_counter()
+        padded_input = pad_sequences(sequences, maxlen=MAX_LEN)
+        PAD_SECONDS.observe(time.perf_counter() - padding_started)
+        scores = []
+        for start in range(0, len(padded_input), PREDICT_CHUNK_SIZE):
+            scores.extend(self._forward(padded_input[start:start + PREDICT_CHUNK_SIZE]))
+        return scores
+
+    def _predict_length_aware(self, sequences):
+        """
+        Group rows into length buckets and pad each chunk only to its longest row;
+        the padding steps up to MAX_LEN are replaced by the model's precomputed
+        padding state, so scores equal those of the fully padded batch.
+        """
+        sequences = [sequence[-MAX_LEN:] for sequence in sequences]
+        scores = [None] * len(sequences)
+        for indices, width in length_buckets([len(sequence) for sequence in sequences], LENGTH_BUCKETS, PREDICT_CHUNK_SIZE):
+            padding_started = time.perf_counter()
+            chunk = pad_sequences([sequences[index] for index in indices], maxlen=width)
+            PAD_SECONDS.observe(time.perf_counter() - padding_started)
+            PADDING_STEPS_SKIPPED.inc(len(indices) * (MAX_LEN - width))
+            for index, score in zip(indices, self._forward(chunk, MAX_LEN - width)):
+                scores[index] = score
+        return scores
+
+    def predict(self, texts):
+        """
+        Run the model over a batch of texts.
+        Tokenizes the whole batch once; with the NumPy backend and
+        LENGTH_AWARE_INFERENCE, the LSTM only runs over each chunk's real tokens.
+        """
+        started = time.perf_counter()
+        sequences = self.tokenizer.texts_to_sequences(texts)
+        TOKENIZE_SECONDS.observe(time.perf_counter() - started)
+        if LENGTH_AWARE_INFERENCE and self.backend == "numpy":
+            scores = self._predict_length_aware(sequences)
+        else:
+            scores = self._predict_padded(sequences)
+        results = [_label(score) for score in scores]
+        per_text = (time.perf_counter() - started) / max(1, len(texts))
+        self.seconds_per_text = per_text if self.seconds_per_text is None else 0.9 * self.seconds_per_text + 0.1 * per_text
+        return results
+
+    def predict_single(self, texts):
+        if BATCHING_ENABLED:
+            return [self.batcher.predict(texts[0])]
+        return self.predict(texts)
+
+    def stop(self):
+        """Finish queued inference and stop the worker processes."""
+        self.batcher.stop()
+        if self.pool is not None:
+            self.pool.stop()
+
+    def retire(self, timeout: float = 60):
+        """Wait (up to `timeout`) for requests still using this version, then stop it."""
+        with self._idle:
+            self._idle.wait_for(lambda: self._in_flight == 0, timeout=timeout)
+        self.stop()
+
+
+def _default_artifacts():
+    model_path = NUMPY_MODEL_DIR if INFERENCE_BACKEND == "numpy" else MODEL_PATH
+    linear_path = LINEAR_MODEL_PATH if os.path.exists(LINEAR_MODEL_PATH) else None
+    return ModelArtifacts(None, INFERENCE_BACKEND, tokenizer_artifact, model_path, linear_path)
+
+def _load_handle(artifacts: ModelArtifacts):
+    """Load a model version and run a warm-up inference; raises if the artifacts cannot be loaded."""
+    if artifacts.tokenizer_path.endswith(".json"):
+        tokenizer = FastTokenizer.load(artifacts.tokenizer_path)
+    else:
+        with open(artifacts.tokenizer_path, "rb") as f:
+            tokenizer = pickle.load(f)
+    if artifacts.backend == "numpy":
+        model = NumpyLSTMModel.load(artifacts.model_path)
+    else:
+        with open(artifacts.model_path, "rb") as f:
+            model = pickle.load(f)
+    linear = SparseLinearModel.load(artifacts.linear_path) if artifacts.linear_path else None
+    version = artifacts.version or artifact_version(artifacts.tokenizer_path, artifacts.model_path)
+
+    # Optional pool of inference processes sharing memory-mapped weights
+    pool = None
+    if INFERENCE_WORKERS not in ("", "0"):
+        if artifacts.backend != "numpy":
+            print("Warning: INFERENCE_WORKERS requires INFERENCE_BACKEND=numpy; running inference in-process")
+        else:
+            workers = len(available_cpus()) if INFERENCE_WORKERS == "auto" else int(INFERENCE_WORKERS)
+            pool = InferencePool(artifacts.model_path, workers, pin_cpus=INFERENCE_PIN_CPUS, timeout=INFERENCE_TIMEOUT_SECONDS)
+            pool.start()
+
+    handle = ModelHandle(version, artifacts.backend, tokenizer, model, pool, linear)
+    # The first forward pass pays for lazy allocations; do it before taking traffic
+    try:
+        handle.predict([WARMUP_TEXT])
+    except Exception:
+        handle.stop()
+        raise
+    return handle
+
+# Model state: the serving handle is replaced as a whole, never mutated
+_handle = None
+_swap_lock = threading.Lock()
+load_status = {"state": "not_loaded", "error": None, "load_seconds": None}
+reload_status = {"state": "idle", "version": None, "error": None, "started_at": None, "finished_at": None}
+model_loaded = threading.Event()
+_load_lock = threading.Lock()
+_reload_lock = threading.Lock()
+
+def current_model():
+    """The handle serving new requests, or None in fallback mode."""
+    return _handle
+
+@contextmanager
+def _use_model():
+    with _swap_lock:
+        handle = _handle
+        if handle is not None:
+            handle.acquire()
+    try:
+        yield handle
+    finally:
+        if handle is not None:
+            handle.release()
+
+def _swap(handle: ModelHandle):
+    """Route new requests to `handle`; the previous version finishes its in-flight requests first."""
+    global _handle
+    with _swap_lock:
+        previous, _handle = _handle, handle
+    if previous is not None:
+        previous.retire()
+
+def load_model():
+    """
+    Load the registry's active version (or the configured artifacts) once, including a warm-up inference.
+    Concurrent callers wait for the load in progress; later calls return immediately.
+    """
+    if model_loaded.is_set():
+        return
+    with _load_lock:
+        if model_loaded.is_set():
+            return
+        load_status["state"] = "loading"
+        started = time.perf_counter()
         try:
-            tokenized_input = tokenizer.texts_to_sequences([text])
-            padded_input = pad_sequences(tokenized_input, maxlen=MAX_LEN)
-            prediction = model.predict(padded_input)[0][0]
-            sentiment = "Positive" if prediction > 0.5 else "Negative"
-            return sentiment, float(prediction)
+            active = registry.active_version()
+            _swap(_load_handle(registry.artifacts(active) if active else _default_artifacts()))
+            load_status["state"] = "ready"
         except Exception as e:
-            print(f"Error in prediction: {e}")
-    
-    # Fallback: Mock prediction based on text content
-    # Simple heuristic: positive keywords vs negative keywords
-    positive_words = ["good", "great", "excellent", "amazing", "love", "best", "awesome", "wonderful", "fantastic"]
-    negative_words = ["bad", "terrible", "awful", "hate", "worst", "horrible", "poor", "disappointing"]
-    
-    text_lower = text.lower()
-    positive_count = sum(1 for word in positive_words if word in text_lower)
-    negative_count = sum(1 for word in negative_words if word in text_lower)
-    
-    if positive_count > negative_count:
-        score = 0.7 + random.uniform(0, 0.3)
-        sentiment = "Positive"
-    elif negative_count > positive_count:
-        score = 0.3 - random.uniform(0, 0.3)
-        sentiment = "Negative"
-    else:
-        score = random.uniform(0.3, 0.7)
-        sentiment = "Positive" if score > 0.5 else "Negative"
-    
-    return sentiment, min(max(score, 0.0), 1.0)  # Ensure score is between 0 and 1
+            print(f"Warning: Could not load ML model: {e}")
+            print("Using mock model for testing purposes...")
+            load_status["state"] = "fallback"
+            load_status["error"] = str(e)
+        load_status["load_seconds"] = round(time.perf_counter() - started, 3)
+        model_loaded.set()
+
+def start_background_load():
+    """Load the model in a daemon thread so the server accepts connections right away."""
+    thread = threading.Thread(target=load_model, name="model-loader", daemon=True)
+    thread.start()
+    return thread
+
+def reload_model(version: str):
+    """Load, warm and swap in a registered version, then make it the registry's active version."""
+    load_model()
+    reload_status.update(state="loading", version=version, error=None, started_at=time.time(), finished_at=None)
+    try:
+        _swap(_load_handle(registry.artifacts(version)))
+        registry.set_active(version)
+        load_status.update(state="ready", error=None)
+        reload_status["state"] = "done"
+    except Exception as e:
+        print(f"Error loading model version {version}: {e}")
+        reload_status.update(state="failed", error=str(e))
+    reload_status["finished_at"] = time.time()
+
+def start_reload(version: str):
+    """
+    Reload in a background thread. Returns False if another reload is still running.
+    Raises KeyError for an unknown version.
+    """
+    registry.artifacts(version)
+    if not _reload_lock.acquire(blocking=False):
+        return False
+
+    def run():
+        try:
+            reload_model(version)
+        finally:
+            _reload_lock.release()
+
+    threading.Thread(target=run, name="model-reloader", daemon=True).start()
+    return True
+
+def get_model_status():
+    """Readiness details: load state, serving version and the last reload."""
+    handle = _handle
+    return {
+        "ready": model_loaded.is_set(),
+        "model_loaded": handle is not None,
+        "model_version": handle.version if handle is not None else None,
+        "backend": handle.backend if handle is not None else INFERENCE_BACKEND,
+        "linear_model": handle is not None and handle.linear is not None,
+        **load_status,
+        "reload": dict(reload_status),
+        "cascade": {
+            "band": CASCADE_BAND,
+            "texts": int(CASCADE_TEXTS.value),
+            "short_circuited": int(CASCADE_SHORT_CIRCUITS.value),
+            "short_circuit_rate": CASCADE_SHORT_CIRCUITS.value / CASCADE_TEXTS.value if CASCADE_TEXTS.value else None,
+            "estimated_seconds_saved": round(CASCADE_SECONDS_SAVED.value, 6),
+        },
+    }
+
+def shutdown():
+    """Finish queued inference and stop the worker processes."""
+    handle = _handle
+    if handle is not None:
+        handle.stop()
+
+# Cache of model predictions for repeated texts
+prediction_cache = None
+if CACHE_ENABLED:
+    prediction_cache = PredictionCache(
+        max_size=CACHE_MAX_SIZE,
+        ttl_seconds=CACHE_TTL_SECONDS,
+        shared_tier=SQLiteCacheTier(CACHE_SHARED_PATH, CACHE_TTL_SECONDS) if CACHE_SHARED_PATH else None
+    )
+
+def _predict_cached(texts, model_version, predict):
+    """Serve what we can from the prediction cache and run `predict` on the rest."""
+    if prediction_cache is None:
+        return predict(texts)
+    results = [prediction_cache.get(text, model_version) for text in texts]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        for i, result in zip(missing, predict([texts[i] for i in missing])):
+            results[i] = result
+            prediction_cache.set(texts[i], model_version, result)
+    return results
+
+def _predict_linear(handle: ModelHandle, texts, lstm_predict, cascade: bool):
+    """
+    Score with the sparse linear model; in cascade mode re-score with the LSTM
+    only the texts whose linear probability lies within CASCADE_BAND of 0.5.
+    """
+    started = time.perf_counter()
+    scores = handle.linear.predict_proba(texts)
+    linear_seconds = time.perf_counter() - started
+    LINEAR_SECONDS.observe(linear_seconds)
+    results = [_label(score) for score in scores]
+    versions = [handle.linear_version] * len(texts)
+    if not cascade:
+        return results, versions
+
+    uncertain = [i for i, score in enumerate(scores) if abs(score - 0.5) < CASCADE_BAND]
+    if uncertain:
+        lstm_results = _predict_cached([texts[i] for i in uncertain], handle.version, lstm_predict)
+        for i, result in zip(uncertain, lstm_results):
+            results[i] = result
+            versions[i] = handle.version
+    short_circuited = len(texts) - len(uncertain)
+    CASCADE_TEXTS.inc(len(texts))
+    CASCADE_SHORT_CIRCUITS.inc(short_circuited)
+    if short_circuited and handle.seconds_per_text is not None:
+        saved = short_circuited * handle.seconds_per_text - linear_seconds
+        CASCADE_SECONDS_SAVED.inc(max(0.0, saved))
+    return results, versions
+
+def predict_versioned(texts, single: bool = False, model: str = None):
+    """
+    Predict sentiment of a list of texts with the model version that produced each one.
+    Returns ((sentiment, score) pairs in input order, model versions in input order); a
+    version is None when the fallback heuristic answered. `single` routes LSTM calls
+    through the micro-batcher. `model` is one of PREDICT_MODELS (default PREDICT_MODEL);
+    "linear" and "cascade" use the LSTM alone when no linear model is deployed.
+    """
+    if not texts:
+        return [], []
+    load_model()
+    model = model or PREDICT_MODEL
+    started = time.perf_counter()
+    try:
+        with _use_model() as handle:
+            # If model is loaded, use it
+            if handle is not None:
+                try:
+                    predict = handle.predict_single if single else handle.predict
+                    if model != "lstm" and handle.linear is not None:
+                        return _predict_linear(handle, texts, predict, cascade=model == "cascade")
+                    return _predict_cached(texts, handle.version, predict), [handle.version] * len(texts)
+                except Exception as e:
+                    print(f"Error in prediction: {e}")
+        return _fallback_predict(texts), [None] * len(texts)
+    finally:
+        PREDICT_SECONDS.observe(time.perf_counter() - started)
+
+def predict_sentiment(text: str, model: str = None):
+    """
+    Predict sentiment of a single text input.
+    Returns sentiment label and probability/score.
+    """
+    return predict_versioned([text], single=True, model=model)[0][0]
+
+def predict_sentiments(texts, model: str = None):
+    """
+    Predict sentiment of a list of texts.
+    Returns (sentiment, score) pairs in the same order as the input.
+    """
+    return predict_versioned(texts, model=model)[0]
+
+_lexicon = None
+_lexicon_lock = threading.Lock()
+
+def fallback_scorer():
+    """The lexicon scoring predictions while no model is loaded (loaded once, on first use)."""
+    global _lexicon
+    with _lexicon_lock:
+        if _lexicon is None:
+            if os.path.exists(LEXICON_PATH):
+                try:
+                    _lexicon = LexiconScorer.load(LEXICON_PATH)
+                except Exception as e:
+                    print(f"Warning: could not load lexicon {LEXICON_PATH}: {e}; using the built-in lexicon")
+            _lexicon = _lexicon or LexiconScorer.default()
+        return _lexicon
+
+def _fallback_predict(texts):
+    """Fallback: deterministic weighted-lexicon scores (see app.services.lexicon)"""
+    started = time.perf_counter()
+    scores = fallback_scorer().predict_proba(texts)
+    LEXICON_SECONDS.observe(time.perf_counter() - started)
+    return [_label(score) for score in scores]
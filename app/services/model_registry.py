@@ -0,0 +1,169 @@
+"""
+Directory of versioned model artifacts.
+
+Each version is a sub-directory of MODEL_REGISTRY_DIR:
+
+    registry/
+        ACTIVE                  name of the version loaded at startup
+        2024-06-01/
+            metadata.json       {"version", "backend", "created_at", "description", ...}
+            tokenizer_vocab.json  or  tokenizer.pkl
+            numpy_model/          or  model.pkl
+            linear_model.json     optional cascade stage (app.services.linear_model)
+
+Versions are immutable once registered; shipping a model means registering a
+new version and loading it through POST /api/models/{version}/load.
+
+    python -m app.services.model_registry register --version 2024-06-01 --model ml_models/ml_models/numpy_model --tokenizer ml_models/ml_models/tokenizer_vocab.json
+    python -m app.services.model_registry list
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+
+METADATA_FILE = "metadata.json"
+ACTIVE_FILE = "ACTIVE"
+TOKENIZER_FILES = ("tokenizer_vocab.json", "tokenizer.pkl")
+MODEL_FILES = {"numpy": "numpy_model", "keras": "model.pkl"}
+LINEAR_MODEL_FILE = "linear_model.json"
+# Leaves room in Feedback.model_version for the ":linear" suffix of cascade rows
+VERSION_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,55}$")
+
+
+class ModelArtifacts:
+    """Paths of one model version's tokenizer and model files."""
+
+    def __init__(self, version: str, backend: str, tokenizer_path: str, model_path: str, linear_path=None, metadata=None):
+        self.version = version
+        self.backend = backend
+        self.tokenizer_path = tokenizer_path
+        self.model_path = model_path
+        self.linear_path = linear_path
+        self.metadata = metadata or {}
+
+
+class ModelRegistry:
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, version: str, *parts):
+        if not VERSION_PATTERN.match(version):
+            raise ValueError(f"Invalid model version name: {version!r}")
+        return os.path.join(self.root, version, *parts)
+
+    def versions(self):
+        """Metadata of every registered version, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        found = []
+        for name in sorted(os.listdir(self.root)):
+            metadata_path = os.path.join(self.root, name, METADATA_FILE)
+            if os.path.isfile(metadata_path):
+                with open(metadata_path, encoding="utf-8") as f:
+                    found.append(json.load(f))
+        return sorted(found, key=lambda metadata: metadata.get("created_at", ""))
+
+    def artifacts(self, version: str) -> ModelArtifacts:
+        metadata_path = self._path(version, METADATA_FILE)
+        if not os.path.isfile(metadata_path):
+            raise KeyError(version)
+        with open(metadata_path, encoding="utf-8") as f:
+            metadata = json.load(f)
+        backend = metadata["backend"]
+        tokenizer_path = next(
+            (self._path(version, name) for name in TOKENIZER_FILES if os.path.exists(self._path(version, name))),
+            self._path(version, TOKENIZER_FILES[0]),
+        )
+        linear_path = self._path(version, LINEAR_MODEL_FILE)
+        return ModelArtifacts(
+            version, backend, tokenizer_path, self._path(version, MODEL_FILES[backend]),
+            linear_path if os.path.exists(linear_path) else None, metadata
+        )
+
+    def register(self, version: str, model_path: str, tokenizer_path: str, description: str = "", linear_path=None, **extra):
+        """Copy artifacts into a new version directory; the backend follows from the model artifact."""
+        target = self._path(version)
+        if os.path.exists(target):
+            raise FileExistsError(f"Model version {version} already exists")
+        backend = "numpy" if os.path.isdir(model_path) else "keras"
+        tokenizer_name = TOKENIZER_FILES[0] if tokenizer_path.endswith(".json") else TOKENIZER_FILES[1]
+
+        # Copy into a temporary directory and rename, so a version is never seen half-written
+        staging = os.path.join(self.root, f".{version}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        if backend == "numpy":
+            shutil.copytree(model_path, os.path.join(staging, MODEL_FILES[backend]))
+        else:
+            shutil.copy2(model_path, os.path.join(staging, MODEL_FILES[backend]))
+        shutil.copy2(tokenizer_path, os.path.join(staging, tokenizer_name))
+        if linear_path:
+            shutil.copy2(linear_path, os.path.join(staging, LINEAR_MODEL_FILE))
+        metadata = {
+            "version": version,
+            "backend": backend,
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "description": description,
+            **extra,
+        }
+        with open(os.path.join(staging, METADATA_FILE), "w", encoding="utf-8") as f:
+            json.dump(metadata, f, indent=2)
+        os.rename(staging, target)
+        return metadata
+
+    def active_version(self):
+        try:
+            with open(os.path.join(self.root, ACTIVE_FILE), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def set_active(self, version: str):
+        """Record the version to load at startup (atomic replace of the ACTIVE file)."""
+        self.artifacts(version)
+        os.makedirs(self.root, exist_ok=True)
+        pointer = os.path.join(self.root, ACTIVE_FILE)
+        with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(pointer + ".tmp", pointer)
+
+
+def main(argv=None):
+    from app.config import MODEL_REGISTRY_DIR
+
+    parser = argparse.ArgumentParser(description="Manage the versioned model registry")
+    parser.add_argument("--registry", default=MODEL_REGISTRY_DIR, help="Registry directory")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    register = subparsers.add_parser("register", help="Register a new model version")
+    register.add_argument("--version", required=True, help="Version name, e.g. 2024-06-01")
+    register.add_argument("--model", required=True, help="model.pkl or an exported numpy_model directory")
+    register.add_argument("--tokenizer", required=True, help="tokenizer_vocab.json or tokenizer.pkl")
+    register.add_argument("--linear", help="Optional linear_model.json for the cascade")
+    register.add_argument("--description", default="", help="Free-form notes stored in metadata.json")
+    register.add_argument("--activate", action="store_true", help="Also make it the version loaded at startup")
+    subparsers.add_parser("list", help="List registered versions")
+    activate = subparsers.add_parser("activate", help="Set the version loaded at startup")
+    activate.add_argument("version")
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.registry)
+    if args.command == "register":
+        metadata = registry.register(args.version, args.model, args.tokenizer, description=args.description, linear_path=args.linear)
+        if args.activate:
+            registry.set_active(args.version)
+        print(json.dumps(metadata, indent=2))
+    elif args.command == "activate":
+        registry.set_active(args.version)
+        print(f"Active model version: {args.version}")
+    else:
+        active = registry.active_version()
+        for metadata in registry.versions():
+            marker = "*" if metadata["version"] == active else " "
+            print(f"{marker} {metadata['version']}\t{metadata['backend']}\t{metadata['created_at']}\t{metadata.get('description', '')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Pure-NumPy inference runtime for the Embedding -> LSTM -> Dense sentiment model.
+
+The Keras model is exported once into a directory of plain `.npy` weight files
+plus a `meta.json`; serving then only needs NumPy, so workers start without
+importing TensorFlow and the weights can be memory-mapped.
+
+Export:
+    python -m app.services.numpy_lstm export --model ml_models/ml_models/model.pkl --output ml_models/ml_models/numpy_model
+
+Reduced-precision variants of an exported model (see `quantize_model`):
+    python -m app.services.numpy_lstm quantize --model-dir ml_models/ml_models/numpy_model --precision int8 --output ml_models/ml_models/numpy_model_int8
+"""
+import argparse
+import json
+import os
+import pickle
+from itertools import chain
+
+import numpy as np
+
+WEIGHT_FILES = (
+    "embedding",
+    "lstm_kernel",
+    "lstm_recurrent_kernel",
+    "lstm_bias",
+    "dense_kernel",
+    "dense_bias",
+)
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _hard_sigmoid(x):
+    return np.clip(0.2 * x + 0.5, 0.0, 1.0)
+
+
+PRECISIONS = ("float32", "float16", "int8")
+# Biases are tiny and feed every step unscaled; they stay float32 in every precision
+FULL_PRECISION_WEIGHTS = ("lstm_bias", "dense_bias")
+
+ACTIVATIONS = {
+    "sigmoid": _sigmoid,
+    "hard_sigmoid": _hard_sigmoid,
+    "tanh": np.tanh,
+    "linear": lambda x: x,
+}
+
+
+def length_buckets(lengths, boundaries, chunk_size: int):
+    """
+    Group row indices by length for length-aware inference: rows are sorted by
+    length, split where the length crosses a bucket boundary, and each group is
+    cut into chunks of at most `chunk_size` rows. Yields (indices, width) with
+    width the longest length in the chunk.
+    """
+    lengths = np.asarray(lengths)
+    order = np.argsort(lengths, kind="stable")
+    bucket_of = np.searchsorted(np.asarray(sorted(boundaries)), lengths[order], side="left")
+    splits = np.flatnonzero(np.diff(bucket_of)) + 1
+    for group in np.split(order, splits):
+        for start in range(0, len(group), chunk_size):
+            chunk = group[start:start + chunk_size]
+            yield chunk, int(lengths[chunk].max())
+
+
+def pad_sequences(sequences, maxlen: int, value: int = 0):
+    """
+    NumPy equivalent of Keras `pad_sequences` with its defaults
+    (padding='pre', truncating='pre'): keep the last `maxlen` ids of each
+    sequence and left-pad shorter ones with `value`.
+    All rows are scattered into the output with one vectorized assignment.
+    """
+    sequences = [sequence[-maxlen:] if len(sequence) > maxlen else sequence for sequence in sequences]
+    lengths = np.fromiter((len(sequence) for sequence in sequences), dtype=np.int64, count=len(sequences))
+    padded = np.full((len(sequences), maxlen), value, dtype=np.int32)
+    total = int(lengths.sum())
+    if total:
+        flat = np.fromiter(chain.from_iterable(sequences), dtype=np.int32, count=total)
+        rows = np.repeat(np.arange(len(sequences)), lengths)
+        starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        cols = np.repeat(maxlen - lengths, lengths) + np.arange(total) - starts
+        padded[rows, cols] = flat
+    return padded
+
+
+class NumpyLSTMModel:
+    """Forward pass of the exported model; `predict` mirrors `keras.Model.predict`."""
+
+    def __init__(self, weights, meta):
+        self.meta = meta
+        self.precision = meta.get("precision", "float32")
+        # The embedding table dominates the model: it stays in its stored precision (and memory-mapped);
+        # only the rows looked up per request are widened to float32
+        self.embedding = weights["embedding"]
+        self.embedding_scale = weights.get("embedding_scale")
+        # NumPy has no float16/int8 matrix product on CPU, so the (small) kernels are widened once here
+        self.lstm_kernel = dequantize(weights, "lstm_kernel")
+        self.lstm_recurrent_kernel = dequantize(weights, "lstm_recurrent_kernel")
+        self.lstm_bias = dequantize(weights, "lstm_bias")
+        self.dense_kernel = dequantize(weights, "dense_kernel")
+        self.dense_bias = dequantize(weights, "dense_bias")
+        self.units = self.lstm_recurrent_kernel.shape[0]
+        self.activation = ACTIVATIONS[meta.get("activation", "tanh")]
+        self.recurrent_activation = ACTIVATIONS[meta.get("recurrent_activation", "sigmoid")]
+        self.output_activation = ACTIVATIONS[meta.get("output_activation", "sigmoid")]
+        self.max_len = meta.get("max_len", 200)
+        self._padding_states = None
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True):
+        """Load an exported model directory; weights are memory-mapped by default."""
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        weights = {}
+        for name in WEIGHT_FILES:
+            weights[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            if meta.get("precision") == "int8" and name not in FULL_PRECISION_WEIGHTS:
+                weights[f"{name}_scale"] = np.load(os.path.join(path, f"{name}_scale.npy"))
+        return cls(weights, meta)
+
+    def _embed(self, x):
+        rows = self.embedding[x]
+        if self.embedding_scale is not None:
+            return rows.astype(np.float32) * self.embedding_scale[x][..., None]
+        return rows.astype(np.float32, copy=False)
+
+    def _step(self, inputs, h, c):
+        units = self.units
+        z = inputs + h @ self.lstm_recurrent_kernel
+        i = self.recurrent_activation(z[:, :units])
+        f = self.recurrent_activation(z[:, units:2 * units])
+        g = self.activation(z[:, 2 * units:3 * units])
+        o = self.recurrent_activation(z[:, 3 * units:])
+        c = f * c + i * g
+        return o * self.activation(c), c
+
+    def padding_states(self, steps: int = 0):
+        """
+        (h, c) after k steps of padding id 0 from the zero state, for k = 0..max(max_len, steps).
+
+        Every pre-padded sequence starts with the same run of padding steps, so
+        the state they produce depends only on how many there are; computing it
+        once lets inference skip those steps (see `predict(skipped_padding=)`).
+        """
+        steps = max(self.max_len, steps)
+        if self._padding_states is None or len(self._padding_states[0]) <= steps:
+            inputs = self._embed(np.zeros(1, dtype=np.int64)) @ self.lstm_kernel + self.lstm_bias
+            h = np.zeros((1, self.units), dtype=np.float32)
+            c = np.zeros((1, self.units), dtype=np.float32)
+            hs, cs = [h[0]], [c[0]]
+            for _ in range(steps):
+                h, c = self._step(inputs, h, c)
+                hs.append(h[0])
+                cs.append(c[0])
+            self._padding_states = (np.stack(hs), np.stack(cs))
+        return self._padding_states
+
+    def predict(self, x, verbose=0, skipped_padding: int = 0):
+        """
+        Return sigmoid scores of shape (N, 1) for padded id sequences of shape (N, T).
+
+        `skipped_padding`: x holds only the last T steps of longer pre-padded
+        sequences whose first `skipped_padding` steps were all padding; the
+        recurrence starts from the precomputed state after those steps, which
+        gives the same scores as running them.
+        """
+        x = np.asarray(x, dtype=np.int64)
+        # Input projections for every timestep at once: (N, T, 4 * units)
+        inputs = self._embed(x) @ self.lstm_kernel + self.lstm_bias
+
+        if skipped_padding:
+            padding_h, padding_c = self.padding_states(skipped_padding)
+            h = np.repeat(padding_h[None, skipped_padding], x.shape[0], axis=0)
+            c = np.repeat(padding_c[None, skipped_padding], x.shape[0], axis=0)
+        else:
+            h = np.zeros((x.shape[0], self.units), dtype=np.float32)
+            c = np.zeros((x.shape[0], self.units), dtype=np.float32)
+        for t in range(x.shape[1]):
+            h, c = self._step(inputs[:, t], h, c)
+        return self.output_activation(h @ self.dense_kernel + self.dense_bias).astype(np.float32)
+
+
+def dequantize(weights, name: str):
+    """float32 copy of weight `name` (int8 weights are multiplied by their per-channel scales)."""
+    array = np.asarray(weights[name], dtype=np.float32)
+    scale = weights.get(f"{name}_scale")
+    if scale is None:
+        return array
+    # Embedding rows are channels (one scale per token); kernels have one scale per output column
+    return array * (scale[:, None] if name == "embedding" else scale)
+
+
+def quantize_int8(array, axis: int):
+    """Symmetric per-channel int8: returns (int8 values, float32 scales) with `axis` reduced to one scale."""
+    scale = np.abs(array).max(axis=axis) / 127.0
+    scale = np.where(scale > 0, scale, 1.0).astype(np.float32)
+    expanded = np.expand_dims(scale, axis)
+    return np.clip(np.round(array / expanded), -127, 127).astype(np.int8), scale
+
+
+def quantize_model(model_dir: str, output_dir: str, precision: str):
+    """
+    Write a float16 or int8 copy of an exported float32 model to `output_dir`.
+
+    float16 halves every weight matrix. int8 stores each matrix as int8 with
+    one float32 scale per channel (embedding row, kernel output column), a
+    quarter of the float32 size. Biases stay float32. The result loads with
+    `NumpyLSTMModel.load` like any exported model.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}; expected one of {', '.join(PRECISIONS)}")
+    with open(os.path.join(model_dir, "meta.json")) as f:
+        meta = json.load(f)
+    if meta.get("precision", "float32") != "float32":
+        raise ValueError(f"{model_dir} is already quantized ({meta['precision']}); quantize the float32 export")
+
+    os.makedirs(output_dir, exist_ok=True)
+    for name in WEIGHT_FILES:
+        array = np.load(os.path.join(model_dir, f"{name}.npy")).astype(np.float32)
+        if precision == "int8" and name not in FULL_PRECISION_WEIGHTS:
+            array, scale = quantize_int8(array, axis=1 if name == "embedding" else 0)
+            np.save(os.path.join(output_dir, f"{name}_scale.npy"), scale)
+        elif precision == "float16" and name not in FULL_PRECISION_WEIGHTS:
+            array = array.astype(np.float16)
+        np.save(os.path.join(output_dir, f"{name}.npy"), array)
+
+    meta = {**meta, "precision": precision}
+    with open(os.path.join(output_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def export_model(model, output_dir: str, max_len: int = 200):
+    """Write the weights of a Keras Embedding/LSTM/Dense model to `output_dir`."""
+    layers = {layer.__class__.__name__: layer for layer in model.layers}
+    missing = {"Embedding", "LSTM", "Dense"} - set(layers)
+    if missing:
+        raise ValueError(f"Model has no {', '.join(sorted(missing))} layer")
+
+    (embedding,) = layers["Embedding"].get_weights()
+    lstm_kernel, lstm_recurrent_kernel, lstm_bias = layers["LSTM"].get_weights()
+    dense_kernel, dense_bias = layers["Dense"].get_weights()
+    lstm_config = layers["LSTM"].get_config()
+
+    os.makedirs(output_dir, exist_ok=True)
+    arrays = dict(zip(WEIGHT_FILES, (embedding, lstm_kernel, lstm_recurrent_kernel, lstm_bias, dense_kernel, dense_bias)))
+    for name, array in arrays.items():
+        np.save(os.path.join(output_dir, f"{name}.npy"), np.ascontiguousarray(array, dtype=np.float32))
+
+    meta = {
+        "max_len": max_len,
+        "vocab_size": int(embedding.shape[0]),
+        "embedding_dim": int(embedding.shape[1]),
+        "units": int(lstm_recurrent_kernel.shape[0]),
+        "activation": lstm_config.get("activation", "tanh"),
+        "recurrent_activation": lstm_config.get("recurrent_activation", "sigmoid"),
+        "output_activation": layers["Dense"].get_config().get("activation", "sigmoid"),
+    }
+    with open(os.path.join(output_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def main(argv=None):
+    from app.config import MODELS_DIR, NUMPY_MODEL_DIR
+
+    parser = argparse.ArgumentParser(description="Export the pickled Keras model to the NumPy runtime format")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export = subparsers.add_parser("export", help="Export model weights")
+    export.add_argument("--model", default=os.path.join(MODELS_DIR, "model.pkl"), help="Pickled Keras model")
+    export.add_argument("--output", default=NUMPY_MODEL_DIR, help="Output directory")
+    export.add_argument("--max-len", type=int, default=200, help="Padded sequence length used by the model")
+    quantize = subparsers.add_parser("quantize", help="Write a float16 or int8 variant of an exported model")
+    quantize.add_argument("--model-dir", default=NUMPY_MODEL_DIR, help="Exported float32 model directory")
+    quantize.add_argument("--precision", choices=PRECISIONS[1:], required=True)
+    quantize.add_argument("--output", required=True, help="Output directory")
+    args = parser.parse_args(argv)
+
+    if args.command == "quantize":
+        meta = quantize_model(args.model_dir, args.output, args.precision)
+        print(f"Wrote {args.precision} model to {args.output}: {meta}")
+        return
+    with open(args.model, "rb") as f:
+        model = pickle.load(f)
+    meta = export_model(model, args.output, max_len=args.max_len)
+    print(f"Exported model to {args.output}: {meta}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Retention policy for the feedbacks table, enforced by a background thread.
+
+Rows older than RETENTION_MAX_AGE_DAYS (by created_at; in dedup mode, by first
+occurrence) and rows beyond the newest RETENTION_MAX_ROWS are purged in
+primary-key-ranged batches: one short transaction per RETENTION_BATCH_SIZE rows,
+deleting `id BETWEEN first AND last` and adjusting the counters table, then a
+RETENTION_BATCH_PAUSE_MS pause so request traffic is never locked out for long.
+
+With RETENTION_ARCHIVE_DIR set, each batch is appended to a gzipped NDJSON file
+(same fields as the export, one gzip member per batch) before its transaction
+commits. A crash in between archives the batch again on the next run; rows
+are never deleted without being archived.
+
+    python -m app.services.retention status
+    python -m app.services.retention purge
+"""
+import argparse
+import contextlib
+import gzip
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy import func, select, text
+from app.config import (
+    RETENTION_MAX_AGE_DAYS, RETENTION_MAX_ROWS, RETENTION_INTERVAL_SECONDS,
+    RETENTION_BATCH_SIZE, RETENTION_BATCH_PAUSE_MS, RETENTION_ARCHIVE_DIR
+)
+from app.models.db_models import Feedback
+from app.services import metrics
+from app.services.db_service import SessionLocal, engine, retention_batch_statement, delete_retention_batch
+from app.services.export_service import encode_ndjson
+
+PURGED_ROWS = metrics.counter("retention_purged_rows", "Feedback rows deleted by the retention policy")
+ARCHIVED_ROWS = metrics.counter("retention_archived_rows", "Purged feedback rows written to the archive")
+PURGE_BATCH_SECONDS = metrics.histogram(
+    "retention_batch_seconds",
+    "Time to archive and delete one retention batch (one transaction)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+# What a purge run deletes: ids up to `max_id` (row limit) and/or rows created before `before` (age limit)
+PurgePlan = namedtuple("PurgePlan", "max_id before")
+
+
+def plan_purge(db, max_age_days: float = RETENTION_MAX_AGE_DAYS, max_rows: int = RETENTION_MAX_ROWS, now: datetime = None):
+    """The rows the policy would delete right now."""
+    max_id = None
+    if max_rows > 0:
+        # Highest id outside the newest `max_rows` rows (walks the primary key index from the top)
+        max_id = db.execute(select(Feedback.id).order_by(Feedback.id.desc()).offset(max_rows).limit(1)).scalar()
+    before = (now or datetime.utcnow()) - timedelta(days=max_age_days) if max_age_days > 0 else None
+    return PurgePlan(max_id, before)
+
+
+def _ranges(db, plan: PurgePlan):
+    """(after id, upper id, created_at cutoff) ranges to purge: the row-limit prefix, then old rows above it."""
+    if plan.max_id is not None:
+        yield 0, plan.max_id, None
+    if plan.before is not None:
+        # Ids grow with created_at, so old rows sit below the newest old one; the cutoff is rechecked per row
+        upper = db.execute(select(func.max(Feedback.id)).where(Feedback.created_at < plan.before)).scalar()
+        after = plan.max_id or 0
+        if upper is not None and upper > after:
+            yield after, upper, plan.before
+
+
+def archive_path(directory: str, now: datetime = None):
+    return os.path.join(directory, f"feedbacks-{(now or datetime.utcnow()).strftime('%Y%m%dT%H%M%S')}.ndjson.gz")
+
+
+def _archive(path: str, rows):
+    # Appending a complete gzip member per batch keeps the file readable after any crash
+    with gzip.open(path, "ab") as f:
+        f.write("".join(encode_ndjson([rows])).encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+    ARCHIVED_ROWS.inc(len(rows))
+
+
+def _purge_batch(after_id: int, upper_id: int, before, batch_size: int, archive: str):
+    """Delete the next batch of rows in (after_id, upper_id]; returns its rows (empty when done)."""
+    db = SessionLocal()
+    try:
+        while True:
+            rows = db.execute(retention_batch_statement(after_id, upper_id, batch_size, before)).all()
+            if not rows or delete_retention_batch(db, rows, before):
+                break
+            # A concurrent delete changed the range since it was read: read it again
+        if rows:
+            if archive:
+                _archive(archive, rows)
+            db.commit()
+        return rows
+    finally:
+        db.close()
+
+
+@contextlib.contextmanager
+def _purge_lock():
+    """One purge at a time across workers (MySQL named lock; SQLite serializes writers itself). Yields False if busy."""
+    if engine.dialect.name != "mysql":
+        yield True
+        return
+    with engine.connect() as connection:
+        acquired = bool(connection.execute(text("SELECT GET_LOCK('feedbacks_retention', 0)")).scalar())
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(text("SELECT RELEASE_LOCK('feedbacks_retention')"))
+
+
+def purge(plan: PurgePlan = None, batch_size: int = RETENTION_BATCH_SIZE, pause_ms: float = RETENTION_BATCH_PAUSE_MS,
+          archive_dir: str = RETENTION_ARCHIVE_DIR, stop: threading.Event = None):
+    """Apply the retention policy (or `plan`) in batches; returns the number of rows deleted."""
+    with _purge_lock() as acquired:
+        if not acquired:
+            return 0
+        db = SessionLocal()
+        try:
+            plan = plan or plan_purge(db)
+            ranges = list(_ranges(db, plan))
+        finally:
+            db.close()
+        archive = None
+        if archive_dir and ranges:
+            os.makedirs(archive_dir, exist_ok=True)
+            archive = archive_path(archive_dir)
+
+        purged = 0
+        for after_id, upper_id, before in ranges:
+            while stop is None or not stop.is_set():
+                started = time.perf_counter()
+                rows = _purge_batch(after_id, upper_id, before, batch_size, archive)
+                if not rows:
+                    break
+                PURGE_BATCH_SECONDS.observe(time.perf_counter() - started)
+                PURGED_ROWS.inc(len(rows))
+                purged += len(rows)
+                after_id = rows[-1].id
+                if pause_ms > 0:
+                    time.sleep(pause_ms / 1000)
+        return purged
+
+
+class RetentionJob:
+    """Background thread running `purge()` every `interval` seconds; `stop()` ends it after the current batch."""
+
+    def __init__(self, interval: float = RETENTION_INTERVAL_SECONDS):
+        self.interval = interval
+        self.last_run = None  # (finished at, rows purged)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="retention", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            if self._thread is not None:
+                self._stop.set()
+                self._thread.join()
+                self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.last_run = (datetime.utcnow(), purge(stop=self._stop))
+            except Exception as e:
+                print(f"Error in retention purge: {e}")
+            self._stop.wait(self.interval)
+
+
+def retention_enabled():
+    return RETENTION_MAX_AGE_DAYS > 0 or RETENTION_MAX_ROWS > 0
+
+
+retention_job = RetentionJob()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or apply the feedbacks retention policy")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("status", help="Show the policy and how many rows it would purge now")
+    subparsers.add_parser("purge", help="Purge now, in batches")
+    args = parser.parse_args(argv)
+
+    if args.command == "purge":
+        print(f"Purged {purge()} rows")
+        return
+    db = SessionLocal()
+    try:
+        plan = plan_purge(db)
+        print(f"max_age_days={RETENTION_MAX_AGE_DAYS:g} max_rows={RETENTION_MAX_ROWS} archive_dir={RETENTION_ARCHIVE_DIR or '-'}")
+        for after_id, upper_id, before in _ranges(db, plan):
+            query = select(func.count()).where(Feedback.id > after_id, Feedback.id <= upper_id)
+            if before is not None:
+                query = query.where(Feedback.created_at < before)
+            label = f"created before {before.isoformat()}" if before is not None else "beyond the newest rows"
+            print(f"{db.execute(query).scalar()} rows with id in ({after_id}, {upper_id}] {label}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
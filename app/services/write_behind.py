@@ -0,0 +1,143 @@
+import queue
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.config import (
+    PERSISTENCE_MODE, WRITE_BEHIND_QUEUE_SIZE, WRITE_BEHIND_BATCH_SIZE, WRITE_BEHIND_FLUSH_INTERVAL_MS
+)
+from app.services import metrics
+from app.services.db_service import SessionLocal, save_feedback, save_feedbacks
+
+FLUSH_LATENCY = metrics.histogram(
+    "write_behind_flush_seconds",
+    "Time to insert one write-behind batch",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+FLUSH_SIZE = metrics.histogram(
+    "write_behind_flush_rows",
+    "Rows inserted per write-behind flush",
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 5000),
+)
+FLUSH_ERRORS = metrics.counter("write_behind_failed_rows", "Rows lost because their write-behind flush failed")
+SYNC_FALLBACKS = metrics.counter("write_behind_sync_fallbacks", "Rows written synchronously because the queue was full")
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """
+    Bounded in-process queue of rows flushed by a background thread.
+
+    A flush happens when `batch_size` rows are queued or `flush_interval_ms`
+    has passed since the first row of the batch, whichever comes first.
+    `stop()` flushes everything still queued.
+    """
+
+    def __init__(self, flush, max_size: int = 10000, batch_size: int = 500, flush_interval_ms: float = 200):
+        self._flush = flush
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.0, flush_interval_ms) / 1000
+        self._queue = queue.Queue(maxsize=max_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def put(self, row) -> bool:
+        """Queue a row; returns False if the queue is full."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            return False
+
+    def stop(self):
+        with self._lock:
+            if self._thread is not None:
+                self._queue.put(_STOP)
+                self._thread.join()
+                self._thread = None
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                    self._thread.start()
+
+    def _write(self, rows):
+        started = time.perf_counter()
+        try:
+            self._flush(rows)
+        except Exception as e:
+            FLUSH_ERRORS.inc(len(rows))
+            print(f"Error in write-behind flush of {len(rows)} rows: {e}")
+            return
+        FLUSH_LATENCY.observe(time.perf_counter() - started)
+        FLUSH_SIZE.observe(len(rows))
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            rows = [first]
+            deadline = time.perf_counter() + self.flush_interval
+            while len(rows) < self.batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                rows.append(item)
+            self._write(rows)
+
+        # Drain whatever was queued behind the stop marker
+        rows = []
+        while True:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(rows) >= self.batch_size:
+                self._write(rows)
+                rows = []
+        if rows:
+            self._write(rows)
+
+
+def _insert_rows(rows):
+    db = SessionLocal()
+    try:
+        save_feedbacks(db, rows)
+    finally:
+        db.close()
+
+
+write_behind = WriteBehindQueue(
+    _insert_rows,
+    max_size=WRITE_BEHIND_QUEUE_SIZE,
+    batch_size=WRITE_BEHIND_BATCH_SIZE,
+    flush_interval_ms=WRITE_BEHIND_FLUSH_INTERVAL_MS,
+)
+metrics.gauge("write_behind_queue_depth", "Rows waiting to be flushed", function=write_behind.depth)
+
+
+def persist_prediction(db: Session, text: str, sentiment: str, score: float, model_version: str = None):
+    """
+    Store a prediction according to PERSISTENCE_MODE.
+    In write-behind mode the row is queued; if the queue is full it is written synchronously instead of dropped.
+    """
+    if PERSISTENCE_MODE == "write_behind":
+        if write_behind.put({"text": text, "sentiment": sentiment, "score": score, "model_version": model_version}):
+            return
+        SYNC_FALLBACKS.inc()
+    save_feedback(db, text, sentiment, score, model_version)
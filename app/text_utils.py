@@ -0,0 +1,23 @@
+"""
+Text normalization shared by the prediction cache (app.services.cache) and the
+feedbacks table's content_hash column (app.models.db_models).
+"""
+import hashlib
+import re
+
+# The tokenizer's word separators: split=" " plus the "\t" and "\n" filters. Other whitespace
+# (e.g. "\u00a0", "\r") stays inside words, so it must not be collapsed either.
+_SEPARATORS = re.compile(r"[ \t\n]+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for cache lookups and duplicate detection.
+    Lowercasing and collapsing runs of tokenizer separators does not change what the tokenizer sees.
+    """
+    return _SEPARATORS.sub(" ", text.lower()).strip(" ")
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest of the normalized text, for duplicate lookups."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
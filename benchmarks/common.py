@@ -0,0 +1,122 @@
+"""
+Shared helpers for the benchmark scripts: synthetic inputs, a synthetic model
+with the notebook's shapes, and latency summaries.
+"""
+import json
+import math
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from app.services.fast_tokenizer import FastTokenizer  # noqa: E402
+from app.services.numpy_lstm import WEIGHT_FILES  # noqa: E402
+
+MAX_LEN = 200
+# Shapes of the LSTM trained in ml_models/ml_models/model.ipynb
+VOCAB_SIZE, EMBEDDING_DIM, UNITS = 5000, 128, 128
+
+SENTIMENT_WORDS = ["good", "great", "love", "excellent", "bad", "awful", "hate", "terrible", "not", "boring"]
+
+
+class LengthDistribution:
+    """
+    Words per text, parsed from a spec:
+    `fixed:N`, `uniform:A-B` or `lognormal:MEDIAN,SIGMA` (clipped to 1..1000).
+    """
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        kind, _, value = spec.partition(":")
+        if kind == "fixed":
+            count = int(value)
+            self._sample = lambda rng: count
+        elif kind == "uniform":
+            low, high = (int(part) for part in value.split("-"))
+            self._sample = lambda rng: rng.randint(low, high)
+        elif kind == "lognormal":
+            median, sigma = (float(part) for part in value.split(","))
+            self._sample = lambda rng: round(rng.lognormvariate(math.log(median), sigma))
+        else:
+            raise ValueError(f"Unknown length distribution: {spec}")
+
+    def sample(self, rng: random.Random) -> int:
+        return min(max(1, self._sample(rng)), 1000)
+
+
+def vocabulary(size: int = VOCAB_SIZE - 1):
+    return SENTIMENT_WORDS + [f"word{i}" for i in range(size - len(SENTIMENT_WORDS))]
+
+
+def synthetic_texts(count: int, lengths: LengthDistribution, seed: int = 0, words=None):
+    """Texts mixing in-vocabulary words, sentiment words, OOV words and punctuation."""
+    rng = random.Random(seed)
+    words = words or vocabulary()
+    oov = [f"oov{i}" for i in range(1000)]
+    texts = []
+    for _ in range(count):
+        tokens = []
+        for _ in range(lengths.sample(rng)):
+            word = rng.choice(oov) if rng.random() < 0.1 else rng.choice(words)
+            tokens.append(word + rng.choice(["", "", "", ",", "!", "."]))
+        texts.append(" ".join(tokens))
+    return texts
+
+
+def build_synthetic_model(directory: str, seed: int = 0):
+    """
+    Write a random-weight NumPy model and matching tokenizer vocabulary with
+    the notebook's shapes, so benchmarks exercise real inference cost even
+    where the trained artifacts are not available. Returns (model_dir, vocab_path).
+    """
+    rng = np.random.default_rng(seed)
+    model_dir = os.path.join(directory, "numpy_model")
+    os.makedirs(model_dir, exist_ok=True)
+    shapes = {
+        "embedding": (VOCAB_SIZE, EMBEDDING_DIM),
+        "lstm_kernel": (EMBEDDING_DIM, 4 * UNITS),
+        "lstm_recurrent_kernel": (UNITS, 4 * UNITS),
+        "lstm_bias": (4 * UNITS,),
+        "dense_kernel": (UNITS, 1),
+        "dense_bias": (1,),
+    }
+    for name in WEIGHT_FILES:
+        np.save(os.path.join(model_dir, f"{name}.npy"), (rng.standard_normal(shapes[name]) * 0.1).astype(np.float32))
+    with open(os.path.join(model_dir, "meta.json"), "w") as f:
+        json.dump({"max_len": MAX_LEN, "vocab_size": VOCAB_SIZE, "embedding_dim": EMBEDDING_DIM, "units": UNITS}, f)
+    vocab_path = os.path.join(directory, "tokenizer_vocab.json")
+    FastTokenizer(vocabulary()).save(vocab_path)
+    return model_dir, vocab_path
+
+
+def percentile(sorted_values, q: float):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(seconds):
+    """Latency summary in milliseconds."""
+    values = sorted(seconds)
+    if not values:
+        return {"count": 0, "mean_ms": None, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    return {
+        "count": len(values),
+        "mean_ms": 1000 * sum(values) / len(values),
+        "p50_ms": 1000 * percentile(values, 50),
+        "p95_ms": 1000 * percentile(values, 95),
+        "p99_ms": 1000 * percentile(values, 99),
+        "max_ms": 1000 * values[-1],
+    }
+
+
+def write_json(path: str, payload):
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+    print(f"Wrote {path}")
@@ -0,0 +1,94 @@
+"""
+Rows per second of the feedback listing paths (fetch + validate + encode one
+page of N rows from a fresh SQLite file):
+
+    orm_pydantic   ORM objects validated through the response model (from_attributes), then dumped
+    rows_pydantic  row dicts validated through the response model, then dumped (the path before FastJSONResponse)
+    rows_core      row dicts encoded by instrumentation.dumps without orjson (pydantic_core.to_json, no validation)
+    rows_orjson    row dicts encoded by instrumentation.dumps with orjson (FastJSONResponse)
+
+    python benchmarks/json_benchmark.py
+    python benchmarks/json_benchmark.py --rows 1000,10000,100000 --repeat 5 --json listing.json
+"""
+import argparse
+import random
+import tempfile
+
+from common import LengthDistribution, percentile, synthetic_texts, write_json
+from stage_benchmark import db_stage, measure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="10000,100000", help="Comma-separated page sizes")
+    parser.add_argument("--lengths", default="lognormal:40,0.8", help="Words per stored text")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.rows.split(",")]
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        db_service = db_stage(workdir)
+        from pydantic import TypeAdapter
+        from sqlalchemy import select
+        from app import instrumentation
+        from app.models.db_models import Feedback
+        from app.schemas.feedback import FeedbackListResponse
+
+        rng = random.Random(args.seed)
+        texts = synthetic_texts(max(sizes), LengthDistribution(args.lengths), seed=args.seed)
+        db = db_service.SessionLocal()
+        for start in range(0, len(texts), 10000):
+            db_service.save_feedbacks(db, [
+                {"text": text[:1000], "sentiment": rng.choice(("Positive", "Negative")), "score": rng.random(), "model_version": "bench"}
+                for text in texts[start:start + 10000]
+            ])
+        adapter = TypeAdapter(FeedbackListResponse)
+        orjson = instrumentation.orjson
+
+        def orm_pydantic(limit):
+            objects = db.execute(select(Feedback).order_by(Feedback.id).limit(limit)).scalars().all()
+            content = adapter.validate_python({"feedbacks": objects, "next_cursor": None}, from_attributes=True)
+            db.expunge_all()
+            return adapter.dump_json(content, exclude_unset=True)
+
+        def rows_pydantic(limit):
+            feedbacks, next_cursor = db_service.get_feedbacks_page(db, limit)
+            return adapter.dump_json(adapter.validate_python({"feedbacks": feedbacks, "next_cursor": next_cursor}), exclude_unset=True)
+
+        def rows_dumps(encoder):
+            def run(limit):
+                instrumentation.orjson = encoder
+                feedbacks, next_cursor = db_service.get_feedbacks_page(db, limit)
+                return instrumentation.dumps({"feedbacks": feedbacks, "next_cursor": next_cursor})
+            return run
+
+        paths = {"orm_pydantic": orm_pydantic, "rows_pydantic": rows_pydantic, "rows_core": rows_dumps(None)}
+        if orjson is not None:
+            paths["rows_orjson"] = rows_dumps(orjson)
+        else:
+            print("orjson is not installed: skipping rows_orjson")
+
+        try:
+            print(f"{'path':<14} {'rows':>8} {'median ms':>10} {'rows/s':>10} {'vs rows_pydantic':>17}")
+            for size in sizes:
+                medians = {}
+                for name, path in paths.items():
+                    medians[name] = percentile(measure(lambda: path(size), args.repeat), 50)
+                for name, median in medians.items():
+                    speedup = medians["rows_pydantic"] / median
+                    results.append({"path": name, "rows": size, "median_ms": median * 1000, "rows_per_second": size / median, "speedup": speedup})
+                    print(f"{name:<14} {size:>8} {median * 1000:>10.1f} {size / median:>10.0f} {speedup:>16.2f}x")
+        finally:
+            instrumentation.orjson = orjson
+            db.close()
+
+    if args.json:
+        config = {key: value for key, value in vars(args).items() if key != "json"}
+        write_json(args.json, {"config": config, "results": results})
+
+
+if __name__ == "__main__":
+    main()
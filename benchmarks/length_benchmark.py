@@ -0,0 +1,97 @@
+"""
+Forward-pass latency versus input length, padded to MAX_LEN versus
+length-aware (only the real tokens are run; the padding steps come from the
+model's precomputed padding state, see NumpyLSTMModel.predict).
+
+    fixed      every text has exactly N tokens
+    mixed      one batch drawn from --mixed (lognormal by default), grouped
+               with length_buckets like ModelHandle does
+
+    python benchmarks/length_benchmark.py
+    python benchmarks/length_benchmark.py --tokens 1,10,50,200 --batches 1,64 --json lengths.json
+    python benchmarks/length_benchmark.py --model-dir ml_models/ml_models/numpy_model
+
+Without --model-dir a random-weight model with the notebook's shapes is used.
+"""
+import argparse
+import random
+import tempfile
+
+import numpy as np
+
+from common import MAX_LEN, VOCAB_SIZE, LengthDistribution, build_synthetic_model, percentile, write_json
+from stage_benchmark import measure
+
+DEFAULT_BUCKETS = "8,16,32,64,128"
+
+
+def padded_forward(model, sequences):
+    from app.services.numpy_lstm import pad_sequences
+
+    return model.predict(pad_sequences(sequences, maxlen=MAX_LEN))
+
+
+def length_aware_forward(model, sequences, buckets, chunk_size: int):
+    from app.services.numpy_lstm import length_buckets, pad_sequences
+
+    scores = np.empty((len(sequences), 1), dtype=np.float32)
+    for indices, width in length_buckets([len(sequence) for sequence in sequences], buckets, chunk_size):
+        chunk = pad_sequences([sequences[index] for index in indices], maxlen=width)
+        scores[indices] = model.predict(chunk, skipped_padding=MAX_LEN - width)
+    return scores
+
+
+def random_sequences(count: int, lengths, rng: random.Random):
+    return [[rng.randrange(1, VOCAB_SIZE) for _ in range(min(lengths(), MAX_LEN))] for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", default="1,5,10,25,50,100,200", help="Comma-separated token counts per text")
+    parser.add_argument("--batches", default="1,32", help="Comma-separated batch sizes")
+    parser.add_argument("--mixed", default="lognormal:20,0.9", help="Length distribution of the mixed batch ('' to skip)")
+    parser.add_argument("--buckets", default=DEFAULT_BUCKETS, help="Length bucket boundaries")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Rows per forward pass")
+    parser.add_argument("--model-dir", help="Exported NumPy model directory (default: synthetic)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    from app.services.numpy_lstm import NumpyLSTMModel
+
+    buckets = [int(bound) for bound in args.buckets.split(",")]
+    rng = random.Random(args.seed)
+    cases = []
+    for batch in (int(value) for value in args.batches.split(",")):
+        for tokens in (int(value) for value in args.tokens.split(",")):
+            cases.append((f"fixed:{tokens}", batch, random_sequences(batch, lambda tokens=tokens: tokens, rng)))
+        if args.mixed:
+            distribution = LengthDistribution(args.mixed)
+            cases.append((args.mixed, batch, random_sequences(batch, lambda: distribution.sample(rng), rng)))
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        model_dir = args.model_dir or build_synthetic_model(workdir, seed=args.seed)[0]
+        model = NumpyLSTMModel.load(model_dir)
+        model.padding_states()
+
+        print(f"{'lengths':<20} {'batch':>6} {'padded ms':>10} {'aware ms':>10} {'speedup':>8} {'max diff':>10}")
+        for lengths, batch, sequences in cases:
+            expected = padded_forward(model, sequences)
+            difference = float(np.abs(length_aware_forward(model, sequences, buckets, args.chunk_size) - expected).max())
+            padded = percentile(measure(lambda: padded_forward(model, sequences), args.repeat), 50)
+            aware = percentile(measure(lambda: length_aware_forward(model, sequences, buckets, args.chunk_size), args.repeat), 50)
+            results.append({
+                "lengths": lengths, "batch": batch, "padded_ms": padded * 1000, "length_aware_ms": aware * 1000,
+                "speedup": padded / aware, "max_abs_difference": difference,
+            })
+            print(f"{lengths:<20} {batch:>6} {padded * 1000:>10.3f} {aware * 1000:>10.3f} {padded / aware:>7.1f}x {difference:>10.2e}")
+
+    if args.json:
+        config = {key: value for key, value in vars(args).items() if key != "json"}
+        write_json(args.json, {"config": config, "results": results})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Fallback lexicon scoring time versus text length and lexicon size.
+
+    automaton  LexiconScorer: one Aho-Corasick pass per text
+    substring  the previous fallback: one `term in text` scan per lexicon term
+
+The automaton's time per character should stay flat across text lengths and
+lexicon sizes; the substring scan grows with the number of terms.
+
+    python benchmarks/lexicon_benchmark.py
+    python benchmarks/lexicon_benchmark.py --words 10,100,1000,10000 --terms 100,10000 --json lexicon.json
+    python benchmarks/lexicon_benchmark.py --lexicon vader_lexicon.txt
+"""
+import argparse
+import random
+
+from common import LengthDistribution, percentile, synthetic_texts, vocabulary, write_json
+from stage_benchmark import measure
+
+
+def synthetic_lexicon(size: int, seed: int = 0):
+    """`size` weighted terms: the vocabulary's words plus two-word phrases once it runs out."""
+    rng = random.Random(seed)
+    words = vocabulary()
+    terms = {}
+    while len(terms) < size:
+        term = rng.choice(words) if len(terms) < len(words) else f"{rng.choice(words)} {rng.choice(words)}"
+        terms[term] = round(rng.uniform(-4, 4), 1)
+    return terms
+
+
+def substring_scan(terms, text: str):
+    text_lower = text.lower()
+    return sum(weight for term, weight in terms.items() if term in text_lower)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", default="10,100,1000,10000", help="Comma-separated words per text")
+    parser.add_argument("--terms", default="100,1000,10000", help="Comma-separated synthetic lexicon sizes")
+    parser.add_argument("--lexicon", help="Lexicon file to benchmark instead of synthetic ones")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    from app.services.lexicon import LexiconScorer
+
+    if args.lexicon:
+        scorers = [(args.lexicon, LexiconScorer.load(args.lexicon))]
+    else:
+        scorers = [(f"synthetic:{size}", LexiconScorer(synthetic_lexicon(int(size), args.seed))) for size in args.terms.split(",")]
+
+    results = []
+    print(f"{'lexicon':<20} {'terms':>7} {'words':>7} {'chars':>8} {'automaton ms':>13} {'ns/char':>8} {'substring ms':>13} {'speedup':>8}")
+    for name, scorer in scorers:
+        for words in (int(value) for value in args.words.split(",")):
+            # Synthetic texts are capped at 1000 words; longer ones are several joined together
+            text = " ".join(synthetic_texts(-(-words // 1000), LengthDistribution(f"fixed:{min(words, 1000)}"), seed=args.seed))
+            automaton = percentile(measure(lambda: scorer.total(text), args.repeat), 50)
+            substring = percentile(measure(lambda: substring_scan(scorer.terms, text), args.repeat), 50)
+            results.append({
+                "lexicon": name, "terms": len(scorer.terms), "words": words, "chars": len(text),
+                "automaton_ms": automaton * 1000, "automaton_ns_per_char": automaton * 1e9 / len(text),
+                "substring_ms": substring * 1000, "speedup": substring / automaton,
+            })
+            print(f"{name:<20} {len(scorer.terms):>7} {words:>7} {len(text):>8} {automaton * 1000:>13.3f} "
+                  f"{automaton * 1e9 / len(text):>8.0f} {substring * 1000:>13.3f} {substring / automaton:>7.1f}x")
+
+    if args.json:
+        config = {key: value for key, value in vars(args).items() if key != "json"}
+        write_json(args.json, {"config": config, "results": results})
+
+
+if __name__ == "__main__":
+    main()
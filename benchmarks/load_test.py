@@ -0,0 +1,197 @@
+"""
+Load test for the prediction and feedback APIs.
+
+Starts the app under uvicorn against a fresh SQLite database (or targets a
+running server with --url), drives a weighted mix of endpoints from
+--concurrency concurrent clients and reports throughput and p50/p95/p99
+latency per endpoint.
+
+    python benchmarks/load_test.py                                        # 16 clients, 20 s, synthetic model
+    python benchmarks/load_test.py --concurrency 64 --mix predict=1 --lengths uniform:5-200
+    python benchmarks/load_test.py --model none                           # keyword fallback (no model cost)
+    python benchmarks/load_test.py --url http://localhost:8000 --duration 60 --json results.json
+
+Endpoints in --mix: predict (POST /api/predict), feedbacks (GET /api/feedbacks/),
+stats (GET /api/stats/), batch (POST /api/predict/batch with --batch-size texts).
+Runs are reproducible for a given --seed (payloads and endpoint choice).
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT, LengthDistribution, build_synthetic_model, summarize, synthetic_texts, write_json
+
+import httpx  # noqa: E402
+
+ENDPOINTS = ("predict", "feedbacks", "stats", "batch")
+
+
+def parse_mix(spec: str):
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r}; expected one of {', '.join(ENDPOINTS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args, workdir: str):
+    """Run uvicorn on a fresh SQLite database; returns (process, base_url)."""
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}", MODEL_LOAD_MODE="eager")
+    if args.model == "synthetic":
+        from app.services.model_registry import ModelRegistry
+
+        model_dir, vocab_path = build_synthetic_model(workdir, seed=args.seed)
+        registry_dir = os.path.join(workdir, "registry")
+        ModelRegistry(registry_dir).register("synthetic", model_dir, vocab_path, description="load test")
+        ModelRegistry(registry_dir).set_active("synthetic")
+        env.update(MODEL_REGISTRY_DIR=registry_dir, INFERENCE_BACKEND="numpy")
+    else:
+        env.update(MODEL_REGISTRY_DIR=os.path.join(workdir, "empty-registry"), TOKENIZER_VOCAB_PATH=os.path.join(workdir, "none.json"))
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+
+def wait_ready(base_url: str, timeout: float = 120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/api/health/ready", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} not ready after {timeout}s")
+
+
+class Workload:
+    def __init__(self, args):
+        self.rng = random.Random(args.seed)
+        self.texts = synthetic_texts(2000, LengthDistribution(args.lengths), seed=args.seed)
+        self.batch_size = args.batch_size
+        self.names = list(args.mix)
+        self.weights = [args.mix[name] for name in self.names]
+
+    def next_request(self):
+        name = self.rng.choices(self.names, self.weights)[0]
+        if name == "predict":
+            return name, "POST", "/api/predict", {"json": {"text": self.rng.choice(self.texts)}}
+        if name == "batch":
+            return name, "POST", "/api/predict/batch", {"json": {"texts": self.rng.sample(self.texts, self.batch_size)}}
+        if name == "feedbacks":
+            return name, "GET", "/api/feedbacks/", {"params": {"limit": 100}}
+        return name, "GET", "/api/stats/", {}
+
+
+async def run_clients(base_url: str, workload: Workload, concurrency: int, duration: float, record: bool):
+    latencies = {name: [] for name in workload.names}
+    errors = {name: 0 for name in workload.names}
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def client_loop():
+            while time.perf_counter() < deadline:
+                name, method, path, options = workload.next_request()
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **options)
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                elapsed = time.perf_counter() - started
+                if record:
+                    if ok:
+                        latencies[name].append(elapsed)
+                    else:
+                        errors[name] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+    return latencies, errors, wall
+
+
+def report(latencies, errors, wall: float):
+    print(f"{'endpoint':<10} {'requests':>9} {'errors':>7} {'req/s':>9} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    groups = dict(latencies)
+    groups["total"] = [value for values in latencies.values() for value in values]
+    failures = dict(errors, total=sum(errors.values()))
+    rows = {}
+    for name, values in groups.items():
+        summary = summarize(values)
+        summary.update(errors=failures[name], throughput_rps=len(values) / wall if wall else 0.0)
+        rows[name] = summary
+        if summary["count"]:
+            print(f"{name:<10} {summary['count']:>9} {summary['errors']:>7} {summary['throughput_rps']:>9.1f} {summary['mean_ms']:>9.2f} "
+                  f"{summary['p50_ms']:>9.2f} {summary['p95_ms']:>9.2f} {summary['p99_ms']:>9.2f} {summary['max_ms']:>9.2f}")
+        else:
+            print(f"{name:<10} {0:>9} {summary['errors']:>7}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Benchmark a running server instead of starting one")
+    parser.add_argument("--model", choices=("synthetic", "none"), default="synthetic",
+                        help="Model served by the started server: random weights with the notebook's shapes, or none (keyword fallback)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes for the started server")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=20, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3, help="Unmeasured seconds before the run")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("predict=8,feedbacks=1,stats=1"),
+                        help="Weighted endpoint mix, e.g. predict=8,feedbacks=1,stats=1")
+    parser.add_argument("--lengths", default="lognormal:40,0.8", help="Words per text: fixed:N, uniform:A-B or lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--batch-size", type=int, default=32, help="Texts per request for the batch endpoint")
+    parser.add_argument("--seed-rows", type=int, default=1000, help="Feedback rows stored before the run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    process = None
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            base_url = args.url
+            if base_url is None:
+                process, base_url = start_server(args, workdir)
+            wait_ready(base_url)
+            workload = Workload(args)
+            for start in range(0, args.seed_rows, 500):
+                texts = workload.texts[:min(500, args.seed_rows - start)]
+                httpx.post(f"{base_url}/api/predict/batch", json={"texts": texts}, timeout=120).raise_for_status()
+
+            if args.warmup:
+                asyncio.run(run_clients(base_url, workload, args.concurrency, args.warmup, record=False))
+            latencies, errors, wall = asyncio.run(run_clients(base_url, workload, args.concurrency, args.duration, record=True))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+
+    print(f"\n{args.concurrency} clients, {wall:.1f} s, lengths {args.lengths}, model {args.model if not args.url else 'server'}")
+    rows = report(latencies, errors, wall)
+    if args.json:
+        config = {key: value for key, value in vars(args).items() if key != "json"}
+        write_json(args.json, {"config": config, "results": rows})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Accuracy versus latency of the float32, float16 and int8 variants of an
+exported NumPy model (see `python -m app.services.numpy_lstm quantize`).
+
+With --dataset, texts are preprocessed and split exactly like
+ml_models/ml_models/model.ipynb (deduplicate, lowercase, strip non-alphanumeric
+characters and URLs, 80/20 split with random_state=42) and accuracy is
+measured on the test split. Without it, synthetic texts are used and only
+agreement with the float32 model is reported.
+
+    python benchmarks/quantization_report.py --model-dir ml_models/ml_models/numpy_model \\
+        --vocab ml_models/ml_models/tokenizer_vocab.json --dataset "IMDB Dataset.csv"
+    python benchmarks/quantization_report.py                  # synthetic model and texts
+    python benchmarks/quantization_report.py --limit 2000 --json quantization.json
+"""
+import argparse
+import csv
+import os
+import re
+import tempfile
+
+import numpy as np
+
+from common import MAX_LEN, LengthDistribution, build_synthetic_model, percentile, synthetic_texts, write_json
+from stage_benchmark import measure
+
+
+def notebook_test_split(path: str):
+    """(texts, labels) of the notebook's test split."""
+    from sklearn.model_selection import train_test_split
+
+    rows, seen = [], set()
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            key = (row["review"], row["sentiment"])
+            if key not in seen:  # data.drop_duplicates()
+                seen.add(key)
+                rows.append(key)
+    texts = [re.sub(r"[^a-zA-Z0-9\s]", "", review.lower()) for review, _ in rows]
+    texts = [re.sub(r"http\S+|www.\S+", "", text, flags=re.IGNORECASE) for text in texts]
+    labels = [1 if sentiment == "positive" else 0 for _, sentiment in rows]
+    _, test_texts, _, test_labels = train_test_split(texts, labels, test_size=0.2, random_state=42)
+    return test_texts, np.asarray(test_labels)
+
+
+def directory_bytes(path: str):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path) if name.endswith(".npy"))
+
+
+def resident_bytes(model):
+    """Weight bytes held per process: the stored embedding (+ scales) and the widened kernels."""
+    arrays = [model.embedding, model.lstm_kernel, model.lstm_recurrent_kernel, model.lstm_bias, model.dense_kernel, model.dense_bias]
+    if model.embedding_scale is not None:
+        arrays.append(model.embedding_scale)
+    return sum(array.nbytes for array in arrays)
+
+
+def score_all(model, padded, chunk_size: int = 256):
+    return np.concatenate([model.predict(padded[start:start + chunk_size])[:, 0] for start in range(0, len(padded), chunk_size)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-dir", help="Exported float32 NumPy model directory (default: synthetic)")
+    parser.add_argument("--vocab", help="Exported tokenizer vocabulary (default: synthetic)")
+    parser.add_argument("--dataset", help="IMDB Dataset.csv used by the notebook")
+    parser.add_argument("--limit", type=int, default=5000, help="Evaluate at most this many test texts (0: all)")
+    parser.add_argument("--batches", default="1,32", help="Comma-separated batch sizes for the latency columns")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    from app.services.fast_tokenizer import FastTokenizer
+    from app.services.numpy_lstm import PRECISIONS, NumpyLSTMModel, pad_sequences, quantize_model
+
+    if args.dataset:
+        texts, labels = notebook_test_split(args.dataset)
+    else:
+        texts, labels = synthetic_texts(args.limit or 5000, LengthDistribution("lognormal:120,0.7"), seed=args.seed), None
+    if args.limit:
+        texts = texts[:args.limit]
+        labels = labels[:args.limit] if labels is not None else None
+    batches = [int(batch) for batch in args.batches.split(",")]
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        model_dir, vocab_path = args.model_dir, args.vocab
+        if model_dir is None or vocab_path is None:
+            synthetic_dir, synthetic_vocab = build_synthetic_model(workdir, seed=args.seed)
+            model_dir, vocab_path = model_dir or synthetic_dir, vocab_path or synthetic_vocab
+        padded = pad_sequences(FastTokenizer.load(vocab_path).texts_to_sequences(texts), maxlen=MAX_LEN)
+
+        reference = None
+        print(f"{len(texts)} texts{' (notebook test split)' if labels is not None else ' (synthetic)'}")
+        print(f"{'precision':<10} {'disk MB':>8} {'weights MB':>11} {'accuracy':>9} {'agreement':>10} {'max |diff|':>11} "
+              + " ".join(f"{f'b={batch} ms':>10}" for batch in batches) + f" {'texts/s':>9}")
+        for precision in PRECISIONS:
+            variant_dir = model_dir
+            if precision != "float32":
+                variant_dir = os.path.join(workdir, precision)
+                quantize_model(model_dir, variant_dir, precision)
+            model = NumpyLSTMModel.load(variant_dir)
+
+            timings = measure(lambda: score_all(model, padded), 1)
+            scores = score_all(model, padded)
+            if reference is None:
+                reference = scores
+            predicted = scores > 0.5
+            row = {
+                "precision": precision,
+                "disk_bytes": directory_bytes(variant_dir),
+                "weight_bytes": resident_bytes(model),
+                "accuracy": float((predicted == labels.astype(bool)).mean()) if labels is not None else None,
+                "agreement": float((predicted == (reference > 0.5)).mean()),
+                "max_abs_difference": float(np.abs(scores - reference).max()),
+                "throughput_texts_per_second": len(texts) / timings[0],
+            }
+            for batch in batches:
+                sample = padded[:batch]
+                row[f"batch_{batch}_median_ms"] = percentile(measure(lambda: model.predict(sample), args.repeat), 50) * 1000
+            results.append(row)
+            accuracy = f"{row['accuracy']:.4f}" if row["accuracy"] is not None else "-"
+            print(f"{precision:<10} {row['disk_bytes'] / 1e6:>8.2f} {row['weight_bytes'] / 1e6:>11.2f} {accuracy:>9} "
+                  f"{row['agreement']:>10.4f} {row['max_abs_difference']:>11.2e} "
+                  + " ".join(f"{row[f'batch_{batch}_median_ms']:>10.3f}" for batch in batches)
+                  + f" {row['throughput_texts_per_second']:>9.0f}")
+
+    if args.json:
+        config = {key: value for key, value in vars(args).items() if key != "json"}
+        write_json(args.json, {"config": config, "results": results})
+
+
+if __name__ == "__main__":
+    main()
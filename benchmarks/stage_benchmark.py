@@ -0,0 +1,126 @@
+"""
+Microbenchmarks of each stage of a prediction, so a latency regression seen in
+load_test.py can be pinned to one of them:
+
+    tokenize   FastTokenizer.texts_to_sequences
+    pad        pad_sequences to MAX_LEN
+    forward    NumpyLSTMModel.predict on padded ids
+    db_insert  save_feedback per row vs one save_feedbacks bulk insert (fresh SQLite file)
+
+    python benchmarks/stage_benchmark.py
+    python benchmarks/stage_benchmark.py --batches 1,32,256 --lengths fixed:200 --stages forward
+    python benchmarks/stage_benchmark.py --model-dir ml_models/ml_models/numpy_model --vocab ml_models/ml_models/tokenizer_vocab.json
+    python benchmarks/stage_benchmark.py --json stages.json
+
+Without --model-dir a random-weight model with the notebook's shapes is used.
+Each measurement is repeated --repeat times; median and p95 are reported.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from common import MAX_LEN, LengthDistribution, build_synthetic_model, percentile, synthetic_texts, write_json
+
+STAGES = ("tokenize", "pad", "forward", "db_insert")
+
+
+def measure(function, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)
+
+
+def db_stage(workdir: str):
+    """Point the app at a fresh SQLite file before db_service is imported."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'stages.db')}"
+    from app.services import db_service
+
+    db_service.init_db()
+    return db_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated subset of " + ", ".join(STAGES))
+    parser.add_argument("--batches", default="1,32,256", help="Comma-separated batch sizes")
+    parser.add_argument("--lengths", default="lognormal:40,0.8", help="Words per text: fixed:N, uniform:A-B or lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--model-dir", help="Exported NumPy model directory (default: synthetic)")
+    parser.add_argument("--vocab", help="Exported tokenizer vocabulary (default: synthetic)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    stages = [stage for stage in args.stages.split(",") if stage]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+    batches = [int(batch) for batch in args.batches.split(",")]
+
+    from app.services.fast_tokenizer import FastTokenizer
+    from app.services.numpy_lstm import NumpyLSTMModel, pad_sequences
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        model_dir, vocab_path = args.model_dir, args.vocab
+        if model_dir is None or vocab_path is None:
+            synthetic_dir, synthetic_vocab = build_synthetic_model(workdir, seed=args.seed)
+            model_dir, vocab_path = model_dir or synthetic_dir, vocab_path or synthetic_vocab
+        tokenizer = FastTokenizer.load(vocab_path)
+        model = NumpyLSTMModel.load(model_dir)
+        db_service = db_stage(workdir) if "db_insert" in stages else None
+        texts = synthetic_texts(max(batches), LengthDistribution(args.lengths), seed=args.seed)
+
+        print(f"{'stage':<16} {'batch':>6} {'median ms':>10} {'p95 ms':>10} {'us/text':>10}")
+        for batch in batches:
+            sample = texts[:batch]
+            sequences = tokenizer.texts_to_sequences(sample)
+            padded = pad_sequences(sequences, maxlen=MAX_LEN)
+            rows = [{"text": text[:1000], "sentiment": "Positive", "score": 0.9} for text in sample]
+            runs = {
+                "tokenize": lambda: tokenizer.texts_to_sequences(sample),
+                "pad": lambda: pad_sequences(sequences, maxlen=MAX_LEN),
+                "forward": lambda: model.predict(padded),
+            }
+            if db_service is not None:
+                def insert_each():
+                    db = db_service.SessionLocal()
+                    try:
+                        for row in rows:
+                            db_service.save_feedback(db, row["text"], row["sentiment"], row["score"])
+                    finally:
+                        db.close()
+
+                def insert_bulk():
+                    db = db_service.SessionLocal()
+                    try:
+                        db_service.save_feedbacks(db, rows)
+                    finally:
+                        db.close()
+
+                runs["db_insert"] = insert_each
+                runs["db_insert_bulk"] = insert_bulk
+
+            for stage, function in runs.items():
+                if stage.split("_bulk")[0] not in stages:
+                    continue
+                function()  # warm-up
+                timings = measure(function, args.repeat)
+                median, p95 = percentile(timings, 50), percentile(timings, 95)
+                results.append({
+                    "stage": stage, "batch": batch, "median_ms": median * 1000, "p95_ms": p95 * 1000,
+                    "us_per_text": median * 1e6 / batch,
+                })
+                print(f"{stage:<16} {batch:>6} {median * 1000:>10.3f} {p95 * 1000:>10.3f} {median * 1e6 / batch:>10.1f}")
+
+    if args.json:
+        config = {key: value for key, value in vars(args).items() if key != "json"}
+        write_json(args.json, {"config": config, "results": results})
+
+
+if __name__ == "__main__":
+    main()
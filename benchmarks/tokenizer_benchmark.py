@@ -0,0 +1,74 @@
+"""
+Microbenchmark: pickled Keras Tokenizer vs FastTokenizer (tokenize + left-pad to MAX_LEN).
+
+    python benchmarks/tokenizer_benchmark.py                       # synthetic vocabulary
+    python benchmarks/tokenizer_benchmark.py --tokenizer ml_models/ml_models/tokenizer.pkl
+"""
+import argparse
+import os
+import pickle
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.fast_tokenizer import FastTokenizer  # noqa: E402
+from app.services.numpy_lstm import pad_sequences  # noqa: E402
+
+MAX_LEN = 200
+
+
+def synthetic_texts(count: int, words_per_text: int, seed: int = 0):
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(20000)]
+    return [
+        " ".join(rng.choice(vocabulary) + rng.choice(["", "", ",", "!", "."]) for _ in range(rng.randint(1, 2 * words_per_text)))
+        for _ in range(count)
+    ]
+
+
+def keras_tokenizer(path, texts):
+    if path:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    try:
+        from tensorflow.keras.preprocessing.text import Tokenizer
+    except ImportError:
+        from keras.src.legacy.preprocessing.text import Tokenizer
+    tokenizer = Tokenizer(num_words=5000)
+    tokenizer.fit_on_texts(texts)
+    return tokenizer
+
+
+def timed(function, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokenizer", help="Pickled Keras tokenizer (default: fit one on synthetic text)")
+    parser.add_argument("--words", type=int, default=60, help="Mean words per text")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = synthetic_texts(5000, args.words)
+    keras = keras_tokenizer(args.tokenizer, texts)
+    fast = FastTokenizer.from_keras(keras)
+
+    print(f"{'batch':>6} {'keras ms':>10} {'fast ms':>10} {'speedup':>8}")
+    for batch in (1, 32, 256, 2048):
+        sample = texts[:batch]
+        assert fast.texts_to_sequences(sample) == keras.texts_to_sequences(sample)
+        keras_time = timed(lambda: pad_sequences(keras.texts_to_sequences(sample), maxlen=MAX_LEN), args.repeat)
+        fast_time = timed(lambda: fast.texts_to_padded(sample, maxlen=MAX_LEN), args.repeat)
+        print(f"{batch:>6} {keras_time * 1000:>10.3f} {fast_time * 1000:>10.3f} {keras_time / fast_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,19 +19,20 @@ const FeedbackPage = () => {
   const [loading, setLoading] = useState(false);
   const [filter, setFilter] = useState<FilterType>("all");
   const [deletingId, setDeletingId] = useState<number | null>(null);
+  const [nextCursor, setNextCursor] = useState<number | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
+  const fetchPage = (filterType: FilterType, cursor: number | null) =>
+    filterType === "all" ? getAllFeedbacks(cursor) : filterFeedbacks(filterType, cursor);
+
+  // Loads the first page (the API returns feedbacks page by page, see loadMore)
   const fetchFeedbacks = async (filterType: FilterType = filter) => {
     setError("");
     setLoading(true);
     try {
-      let res;
-      if (filterType === "all") {
-        res = await getAllFeedbacks();
-        setFeedbacks(res.feedbacks);
-      } else {
-        res = await filterFeedbacks(filterType);
-        setFeedbacks(res.feedbacks);
-      }
+      const res = await fetchPage(filterType, null);
+      setFeedbacks(res.feedbacks);
+      setNextCursor(res.next_cursor);
     } catch (err: any) {
       setError(err.message || "Failed to load feedbacks");
     } finally {
@@ -39,6 +40,23 @@ const FeedbackPage = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (nextCursor === null) {
+      return;
+    }
+    setError("");
+    setLoadingMore(true);
+    try {
+      const res = await fetchPage(filter, nextCursor);
+      setFeedbacks((current) => [...current, ...res.feedbacks]);
+      setNextCursor(res.next_cursor);
+    } catch (err: any) {
+      setError(err.message || "Failed to load more feedbacks");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleDelete = async (id: number) => {
     const feedback = feedbacks.find(f => f.id === id);
     const feedbackText = feedback?.text 
@@ -95,7 +113,7 @@ const FeedbackPage = () => {
     const result = await Swal.fire({
       title: "Delete All Feedbacks?",
       html: `
-        <p>Are you sure you want to delete <strong>ALL ${feedbacks.length} feedbacks</strong>?</p>
+        <p>Are you sure you want to delete <strong>ALL feedbacks</strong>${nextCursor !== null ? "" : ` (${feedbacks.length})`}?</p>
         <p style="color: #f44336; font-weight: bold; margin-top: 15px;">⚠️ This action cannot be undone!</p>
       `,
       icon: "warning",
@@ -118,7 +136,7 @@ const FeedbackPage = () => {
       Swal.fire({
         icon: "success",
         title: "All Deleted!",
-        text: `All ${feedbacks.length} feedbacks have been deleted successfully.`,
+        text: "All feedbacks have been deleted successfully.",
         confirmButtonColor: "#4CAF50",
         timer: 3000,
         timerProgressBar: true,
@@ -159,7 +177,7 @@ const FeedbackPage = () => {
             className={filter === "all" ? "active" : ""}
             onClick={() => handleFilterChange("all")}
           >
-            All ({feedbacks.length})
+            All ({feedbacks.length}{nextCursor !== null ? "+" : ""})
           </button>
           <button 
             className={filter === "positive" ? "active" : ""}
@@ -223,6 +241,16 @@ const FeedbackPage = () => {
           ))}
         </ul>
       )}
+
+      {!loading && nextCursor !== null && (
+        <button
+          className="load-more-btn"
+          onClick={loadMore}
+          disabled={loadingMore}
+        >
+          {loadingMore ? "Loading..." : "Load more"}
+        </button>
+      )}
     </div>
   );
 };
@@ -5,17 +5,24 @@ import {
 } from "../../types/feedback";
 import { API_BASE_URL } from "./config";
 
-export const getAllFeedbacks = async (): Promise<FeedbackListResponse> => {
-  const res = await fetch(`${API_BASE_URL}/api/feedbacks/`);
+// Listings are paginated: pass the previous page's next_cursor to get the next one
+const cursorQuery = (cursor?: number | null) =>
+  cursor != null ? `?cursor=${cursor}` : "";
+
+export const getAllFeedbacks = async (
+  cursor?: number | null
+): Promise<FeedbackListResponse> => {
+  const res = await fetch(`${API_BASE_URL}/api/feedbacks/${cursorQuery(cursor)}`);
   if (!res.ok) throw new Error("Failed to fetch feedbacks");
   return res.json();
 };
 
 export const filterFeedbacks = async (
-  sentiment: "positive" | "negative"
+  sentiment: "positive" | "negative",
+  cursor?: number | null
 ): Promise<FilteredFeedbackResponse> => {
   const res = await fetch(
-    `${API_BASE_URL}/api/feedbacks/filter/${sentiment}`
+    `${API_BASE_URL}/api/feedbacks/filter/${sentiment}${cursorQuery(cursor)}`
   );
   if (!res.ok) throw new Error("Failed to filter feedbacks");
   return res.json();
@@ -6,6 +6,9 @@ export interface Feedback {
   sentiment: Sentiment;
   score: number;
   created_at: string;
+  model_version?: string | null;
+  occurrences?: number;
+  last_seen_at?: string | null;
 }
 
 export interface FeedbackResponse {
@@ -15,12 +18,14 @@ export interface FeedbackResponse {
 
 export interface FeedbackListResponse {
   feedbacks: Feedback[];
+  next_cursor: number | null;
 }
 
 export interface FilteredFeedbackResponse {
   sentiment: string;
   count: number;
   feedbacks: Feedback[];
+  next_cursor: number | null;
 }
 
 export interface DeleteResponse {
@@ -1,11 +1,6 @@
-from sqlalchemy import create_engine
-from app.models.db_models import Base
-from app.config import DATABASE_URL
+from app.services.db_service import init_db
 
-# Create a database engine
-engine = create_engine(DATABASE_URL, echo=True)
+# Apply pending schema migrations (app.services.migrations) and backfill the stats counters
+init_db()
 
-# Create all tables defined in SQLAlchemy models
-Base.metadata.create_all(bind=engine)
-
-print("Database tables created successfully.")
+print("Database schema is up to date.")
@@ -3,3 +3,11 @@ from pathlib import Path
 
 # Add the project root to sys.path
 sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """Create the schema once; in the app this runs in the lifespan hook."""
+    from app.services.db_service import init_db
+    init_db()
@@ -1,3 +1,4 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
@@ -38,3 +39,291 @@ def test_delete_all_feedbacks():
     response = client.delete("/api/feedbacks/")
     assert response.status_code == 200
     assert "All feedbacks deleted successfully" in response.json()["message"]
+
+def test_metrics():
+    response = client.get("/api/metrics/")
+    assert response.status_code == 200
+    data = response.json()
+    assert "inference_batch_size" in data
+    assert "inference_queue_wait_seconds" in data
+
+def test_predict_batch():
+    texts = ["I love this product!", "This is terrible.", "Great value"]
+    response = client.post("/api/predict/batch?persist=false", json={"texts": texts})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == len(texts)
+    assert data["persisted"] is False
+    assert len(data["results"]) == len(texts)
+
+def test_predict_batch_upload():
+    ndjson = b'{"text": "I love this product!"}\n\n"Awful support"\n'
+    response = client.post(
+        "/api/predict/batch/upload",
+        files={"file": ("reviews.ndjson", ndjson, "application/x-ndjson")},
+    )
+    assert response.status_code == 200
+    assert response.json()["count"] == 2
+
+def test_predict_batch_upload_rejects_bad_lines():
+    response = client.post(
+        "/api/predict/batch/upload",
+        files={"file": ("reviews.ndjson", b'{"text": "ok"}\n{"review": 1}\n', "application/x-ndjson")},
+    )
+    assert response.status_code == 400
+
+def test_predict_stream_ndjson():
+    body = b'{"text": "I love this product!"}\n"Terrible"\n{"nope": 1}\n'
+    response = client.post(
+        "/api/predict/stream?persist=false",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["line"] for line in lines] == [3, 1, 2]
+    assert "error" in lines[0]
+    assert all("sentiment" in line for line in lines[1:])
+
+def test_predict_stream_csv():
+    body = b'id,text\n1,"Great, really great"\n2,awful\n'
+    response = client.post(
+        "/api/predict/stream?persist=false",
+        content=body,
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["line"] for line in lines] == [2, 3]
+
+def test_feedbacks_pagination_and_projection():
+    client.delete("/api/feedbacks/")
+    client.post("/api/predict/batch", json={"texts": ["one", "two", "three"]})
+
+    first = client.get("/api/feedbacks/?limit=2&fields=id,sentiment").json()
+    assert len(first["feedbacks"]) == 2
+    assert set(first["feedbacks"][0]) == {"id", "sentiment"}
+    assert first["next_cursor"] is not None
+
+    second = client.get(f"/api/feedbacks/?limit=2&cursor={first['next_cursor']}").json()
+    assert len(second["feedbacks"]) == 1
+    assert second["next_cursor"] is None
+    assert "text" in second["feedbacks"][0]
+
+def test_feedbacks_rejects_unknown_fields():
+    response = client.get("/api/feedbacks/?fields=id,password")
+    assert response.status_code == 400
+
+def test_filter_count_is_total_not_page_size():
+    client.delete("/api/feedbacks/")
+    client.post("/api/predict/batch", json={"texts": ["x", "y", "z"]})
+    positive = client.get("/api/feedbacks/filter/positive?limit=1").json()
+    negative = client.get("/api/feedbacks/filter/negative?limit=1").json()
+    assert positive["count"] + negative["count"] == 3
+    assert len(positive["feedbacks"]) <= 1
+
+def test_search_feedbacks():
+    client.delete("/api/feedbacks/")
+    texts = ["Battery life is great", "The battery died, awful", "Great screen", "battery battery battery life"]
+    client.post("/api/predict/batch", json={"texts": texts})
+
+    data = client.get("/api/feedbacks/search", params={"q": "Battery"}).json()
+    assert {row["text"] for row in data["feedbacks"]} == {texts[0], texts[1], texts[3]}
+    assert data["feedbacks"][0]["text"] == texts[3]  # most occurrences ranks first
+
+    both = client.get("/api/feedbacks/search", params={"q": "battery, LIFE!"}).json()
+    assert {row["text"] for row in both["feedbacks"]} == {texts[0], texts[3]}
+
+    page = client.get("/api/feedbacks/search", params={"q": "battery", "limit": 2}).json()
+    assert len(page["feedbacks"]) == 2 and page["next_offset"] == 2
+    rest = client.get("/api/feedbacks/search", params={"q": "battery", "limit": 2, "offset": 2}).json()
+    assert len(rest["feedbacks"]) == 1 and rest["next_offset"] is None
+
+    sentiment = data["feedbacks"][0]["sentiment"].lower()
+    filtered = client.get("/api/feedbacks/search", params={"q": "battery", "sentiment": sentiment}).json()
+    assert all(row["sentiment"].lower() == sentiment for row in filtered["feedbacks"])
+
+    client.delete(f"/api/feedbacks/{data['feedbacks'][0]['id']}")
+    after = client.get("/api/feedbacks/search", params={"q": "battery"}).json()
+    assert len(after["feedbacks"]) == 2
+    assert client.get("/api/feedbacks/search", params={"q": "!!!"}).status_code == 400
+
+def test_export_feedbacks():
+    client.delete("/api/feedbacks/")
+    client.post("/api/predict/batch", json={"texts": ["great", "awful", "fine"]})
+
+    ndjson = client.get("/api/feedbacks/export")
+    assert ndjson.status_code == 200
+    rows = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [row["text"] for row in rows] == ["great", "awful", "fine"]
+
+    csv_export = client.get("/api/feedbacks/export?format=csv&sentiment=positive")
+    assert csv_export.status_code == 200
+    assert csv_export.text.splitlines()[0] == "id,text,sentiment,score,created_at,model_version,occurrences,last_seen_at"
+
+def test_export_feedbacks_parquet():
+    pq = pytest.importorskip("pyarrow.parquet")
+    import pyarrow as pa
+    client.delete("/api/feedbacks/")
+    client.post("/api/predict/batch", json={"texts": ["great", "awful"]})
+    response = client.get("/api/feedbacks/export?format=parquet")
+    assert response.status_code == 200
+    table = pq.read_table(pa.BufferReader(response.content))
+    assert table.num_rows == 2
+    assert table.column_names == ["id", "text", "sentiment", "score", "created_at", "model_version", "occurrences", "last_seen_at"]
+
+def test_stats_follow_inserts_and_deletes():
+    client.delete("/api/feedbacks/")
+    client.post("/api/predict/batch", json={"texts": ["great", "awful", "fine"]})
+    stats = client.get("/api/stats/").json()
+    assert stats["total_feedbacks"] == 3
+    assert stats["positive"] + stats["negative"] == 3
+
+    feedback_id = client.get("/api/feedbacks/").json()["feedbacks"][0]["id"]
+    client.delete(f"/api/feedbacks/{feedback_id}")
+    assert client.get("/api/stats/").json()["total_feedbacks"] == 2
+
+def test_dedup_mode_counts_occurrences(monkeypatch):
+    from app.services import db_service
+    monkeypatch.setattr(db_service, "DEDUP_MODE", True)
+    client.delete("/api/feedbacks/")
+    client.post("/api/predict", json={"text": "Great phone"})
+    client.post("/api/predict", json={"text": "great   PHONE"})
+    client.post("/api/predict/batch", json={"texts": ["Great phone", "meh", "meh"]})
+
+    rows = client.get("/api/feedbacks/").json()["feedbacks"]
+    assert sorted((row["text"], row["occurrences"]) for row in rows) == [("Great phone", 3), ("meh", 2)]
+    stats = client.get("/api/stats/").json()
+    assert stats["total_feedbacks"] == 5
+    phone = next(row for row in rows if row["text"] == "Great phone")
+    sentiment = phone["sentiment"].lower()
+    assert client.get(f"/api/feedbacks/filter/{sentiment}").json()["count"] >= 3
+    scores = client.get("/api/stats/scores").json()
+    assert sum(s["count"] for s in scores["sentiments"].values()) == 5
+    timeline = client.get("/api/stats/timeline?bucket=hour").json()
+    assert sum(b["total"] for b in timeline["buckets"]) == 5
+
+    client.delete(f"/api/feedbacks/{phone['id']}")
+    assert client.get("/api/stats/").json()["total_feedbacks"] == 2
+
+def test_score_stats_and_timeline():
+    client.delete("/api/feedbacks/")
+    client.post("/api/predict/batch", json={"texts": ["great", "awful", "fine"]})
+
+    scores = client.get("/api/stats/scores").json()
+    assert sum(s["count"] for s in scores["sentiments"].values()) == 3
+    assert set(scores["sentiments"]["Positive"]["percentiles"]) == {"50", "90", "95", "99"}
+
+    timeline = client.get("/api/stats/timeline?bucket=hour").json()
+    assert sum(b["total"] for b in timeline["buckets"]) == 3
+
+def test_score_percentiles_are_cached(monkeypatch):
+    from app.routes import stats
+
+    calls = []
+    percentiles = stats.get_score_percentiles
+    monkeypatch.setattr(stats, "get_score_percentiles", lambda *args, **kwargs: calls.append(args[1]) or percentiles(*args, **kwargs))
+    monkeypatch.setattr(stats, "_percentile_cache", {})
+    client.delete("/api/feedbacks/")
+    client.post("/api/predict/batch", json={"texts": ["great", "awful", "fine"]})
+    sentiments = [s for s, row in client.get("/api/stats/scores").json()["sentiments"].items() if row["count"]]
+    first = client.get("/api/stats/scores").json()
+    assert sorted(calls) == sorted(sentiments)
+
+    # A time range is never served from the cache
+    client.get("/api/stats/scores", params={"since": "2000-01-01T00:00:00"})
+    assert len(calls) == 2 * len(sentiments)
+
+    monkeypatch.setattr(stats, "STATS_PERCENTILE_TTL_SECONDS", 0)
+    assert client.get("/api/stats/scores").json() == first
+    assert len(calls) == 3 * len(sentiments)
+
+def test_health_probes_after_startup():
+    from app.services import ml_service
+
+    assert client.get("/api/health/live").json() == {"status": "alive"}
+    with TestClient(app) as started:
+        assert ml_service.model_loaded.wait(timeout=60)
+        response = started.get("/api/health/ready")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ready"
+    assert data["database"] is True
+    assert data["model"]["state"] in ("ready", "fallback")
+
+def test_prometheus_metrics():
+    client.post("/api/predict", json=sample_feedback)
+    client.get("/api/feedbacks/404404")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert '# TYPE http_requests counter' in body
+    assert 'http_requests{method="POST",route="/api/predict",status="200"}' in body
+    assert "404404" not in body
+    assert 'stage_duration_seconds_bucket{stage="predict",le="+Inf"}' in body
+    assert 'stage_duration_seconds_count{stage="db_commit"}' in body
+    assert 'db_pool_checked_out{engine="sync"}' in body
+    assert "http_requests_in_flight" in body
+
+def test_list_responses_encode_like_the_response_models(monkeypatch):
+    from app import instrumentation
+    from app.schemas.feedback import FeedbackListResponse
+    from app.services.db_service import SessionLocal, get_feedbacks_page
+
+    client.delete("/api/feedbacks/")
+    client.post("/api/predict/batch", json={"texts": ["Très bien, great", "awful \"quoted\"\nline", "fine"]})
+    db = SessionLocal()
+    try:
+        feedbacks, next_cursor = get_feedbacks_page(db, 2)
+        projected, _ = get_feedbacks_page(db, 2, fields=["id", "score"])
+    finally:
+        db.close()
+
+    for content in ({"feedbacks": feedbacks, "next_cursor": next_cursor}, {"feedbacks": projected, "next_cursor": next_cursor}):
+        expected = FeedbackListResponse.model_validate(content).model_dump_json(exclude_unset=True).encode()
+        assert instrumentation.dumps(content) == expected
+        monkeypatch.setattr(instrumentation, "orjson", None)
+        assert instrumentation.dumps(content) == expected
+        monkeypatch.undo()
+
+    response = client.get("/api/feedbacks/?limit=2")
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == json.loads(instrumentation.dumps({"feedbacks": feedbacks, "next_cursor": next_cursor}))
+    assert list(client.get("/api/feedbacks/?limit=2&fields=id,score").json()["feedbacks"][0]) == ["id", "score"]
+
+def test_predict_stream_overlong_line_across_chunks(monkeypatch):
+    from app.routes import sentiment
+    monkeypatch.setattr(sentiment, "STREAM_MAX_LINE_BYTES", 10)
+
+    def body():
+        yield b"id,text\n1,ok\n2,aaaa"
+        for _ in range(5):
+            yield b"aaaaaaaa"  # the oversized line keeps arriving in pieces
+        yield b"aa,tail fragment\n3,fine\n"
+
+    response = client.post("/api/predict/stream?persist=false", content=body(), headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["line"] for line in lines) == [2, 3, 4]
+    assert [line for line in lines if "error" in line] == [{"line": 3, "error": "Line too long"}]
+    assert all("sentiment" in line for line in lines if line["line"] != 3)
+
+def test_body_streaming_response_runs_background_tasks():
+    from fastapi import FastAPI, Request
+    from starlette.background import BackgroundTask
+    from app.routes.sentiment import _BodyStreamingResponse, _iter_lines
+
+    ran = []
+    echo = FastAPI()
+
+    @echo.post("/echo")
+    async def echo_lines(request: Request):
+        async def body():
+            async for line in _iter_lines(request):
+                yield line + b"\n"
+        return _BodyStreamingResponse(body(), background=BackgroundTask(ran.append, "done"))
+
+    response = TestClient(echo).post("/echo", content=b"a\nb\n")
+    assert response.text == "a\nb\n"
+    assert ran == ["done"]
@@ -0,0 +1,52 @@
+import threading
+import pytest
+from app.services.batching import MicroBatcher
+
+def test_concurrent_calls_share_one_batch():
+    batch_sizes = []
+
+    def predict_batch(texts):
+        batch_sizes.append(len(texts))
+        return [("Positive", float(len(text))) for text in texts]
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=8, max_wait_ms=200)
+    texts = [f"text {'x' * i}" for i in range(8)]
+    results = [None] * len(texts)
+
+    def call(i):
+        results[i] = batcher.predict(texts[i])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(texts))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.stop()
+
+    assert sum(batch_sizes) == len(texts)
+    assert len(batch_sizes) < len(texts)
+    # Each caller gets the result for its own text
+    assert results == [("Positive", float(len(text))) for text in texts]
+
+def test_batch_size_is_bounded():
+    batch_sizes = []
+
+    def predict_batch(texts):
+        batch_sizes.append(len(texts))
+        return [("Negative", 0.1)] * len(texts)
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=2, max_wait_ms=50)
+    futures = [batcher.submit("bad") for _ in range(5)]
+    assert [f.result() for f in futures] == [("Negative", 0.1)] * 5
+    batcher.stop()
+    assert max(batch_sizes) <= 2
+
+def test_errors_are_propagated_to_callers():
+    def predict_batch(texts):
+        raise RuntimeError("model failure")
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=4, max_wait_ms=1)
+    future = batcher.submit("anything")
+    with pytest.raises(RuntimeError, match="model failure"):
+        future.result()
+    batcher.stop()
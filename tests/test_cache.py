@@ -0,0 +1,56 @@
+import time
+from app.services.cache import PredictionCache, SQLiteCacheTier
+
+def test_hit_on_normalized_text():
+    cache = PredictionCache(max_size=10, ttl_seconds=60)
+    cache.set("Love it", "v1", ("Positive", 0.9))
+    assert cache.get("  love   IT ", "v1") == ("Positive", 0.9)
+    assert cache.get("hate it", "v1") is None
+
+def test_normalization_keeps_whitespace_the_tokenizer_keeps():
+    from app.text_utils import normalize_text
+    from app.services.fast_tokenizer import FastTokenizer
+
+    tokenizer = FastTokenizer(["love", "it", "love\u00a0it"])
+    texts = ["love it", "love\u00a0it", "love\u2003it", " Love\t\nIT "]
+    for a in texts:
+        for b in texts:
+            if normalize_text(a) == normalize_text(b):
+                assert tokenizer.texts_to_sequences([a]) == tokenizer.texts_to_sequences([b])
+    assert normalize_text(" Love\t\nIT ") == "love it"
+    assert normalize_text("love\u00a0it") != normalize_text("love it")
+
+def test_lru_eviction():
+    cache = PredictionCache(max_size=2, ttl_seconds=60)
+    cache.set("a", "v1", ("Positive", 0.9))
+    cache.set("b", "v1", ("Negative", 0.1))
+    cache.get("a", "v1")  # "b" is now least recently used
+    cache.set("c", "v1", ("Positive", 0.8))
+    assert len(cache) == 2
+    assert cache.get("b", "v1") is None
+    assert cache.get("a", "v1") == ("Positive", 0.9)
+
+def test_ttl_expiry():
+    cache = PredictionCache(max_size=10, ttl_seconds=0.01)
+    cache.set("great", "v1", ("Positive", 0.9))
+    time.sleep(0.02)
+    assert cache.get("great", "v1") is None
+
+def test_model_versions_are_cached_side_by_side(tmp_path):
+    # During a reload both versions serve requests: alternating between them must not clear anything
+    shared = SQLiteCacheTier(str(tmp_path / "cache.db"), 60)
+    cache = PredictionCache(max_size=10, ttl_seconds=60, shared_tier=shared)
+    cache.set("great", "v1", ("Positive", 0.9))
+    assert cache.get("great", "v2") is None
+    cache.set("great", "v2", ("Positive", 0.7))
+    assert cache.get("great", "v1") == ("Positive", 0.9)
+    assert cache.get("great", "v2") == ("Positive", 0.7)
+    assert len(cache) == 2
+    assert PredictionCache(shared_tier=shared).get("great", "v1") == ("Positive", 0.9)
+
+def test_shared_tier_between_caches(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = PredictionCache(max_size=10, ttl_seconds=60, shared_tier=SQLiteCacheTier(path, 60))
+    second = PredictionCache(max_size=10, ttl_seconds=60, shared_tier=SQLiteCacheTier(path, 60))
+    first.set("templated answer", "v1", ("Negative", 0.2))
+    assert second.get("templated answer", "v1") == ("Negative", 0.2)
@@ -0,0 +1,62 @@
+import importlib
+import random
+import numpy as np
+import pytest
+from app.services.fast_tokenizer import FastTokenizer
+
+MAX_LEN = 200
+
+def _keras_tokenizer_class():
+    for module in ("tensorflow.keras.preprocessing.text", "keras.src.legacy.preprocessing.text"):
+        try:
+            return importlib.import_module(module).Tokenizer
+        except (ImportError, AttributeError):
+            continue
+    pytest.skip("Keras Tokenizer not available")
+
+def _corpus(seed=0, size=300):
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(400)] + ["Great", "LOVE", "don't", "it's", "café"]
+    noise = ["!", ",", "...", "\t", "\n", "\r", "  ", "?!", "<br />", "\x1e"]
+    texts = []
+    for _ in range(size):
+        words = [rng.choice(vocabulary) + (rng.choice(noise) if rng.random() < 0.3 else "") for _ in range(rng.randint(0, 300))]
+        texts.append(" ".join(words))
+    return texts
+
+def test_expected_ids():
+    tokenizer = FastTokenizer(["the", "movie", "great", "was"])
+    assert tokenizer.texts_to_sequences(["The movie WAS great!!", "unknown words only", "the\tmovie,was\rgreat"]) == [
+        [1, 2, 4, 3],
+        [],
+        [1, 2],  # "\r" is not a filter, so "was\rgreat" is one unknown word
+    ]
+
+def test_oov_token():
+    tokenizer = FastTokenizer(["<OOV>", "good"], oov_token="<OOV>")
+    assert tokenizer.texts_to_sequences(["good and bad"]) == [[2, 1, 1]]
+
+def test_left_padding_and_truncation():
+    tokenizer = FastTokenizer(["a", "b", "c"])
+    padded = tokenizer.texts_to_padded(["a b c", "", " ".join(["c"] * 5 + ["a"])], maxlen=4)
+    assert padded.dtype == np.int32
+    assert padded.tolist() == [[0, 1, 2, 3], [0, 0, 0, 0], [3, 3, 3, 1]]
+
+@pytest.mark.parametrize("oov_token", [None, "<OOV>"])
+def test_matches_keras_tokenizer(tmp_path, oov_token):
+    Tokenizer = _keras_tokenizer_class()
+    corpus = _corpus()
+    keras_tokenizer = Tokenizer(num_words=300, oov_token=oov_token)
+    keras_tokenizer.fit_on_texts(corpus[:200])
+
+    path = str(tmp_path / "vocab.json")
+    FastTokenizer.from_keras(keras_tokenizer).save(path)
+    tokenizer = FastTokenizer.load(path)
+
+    texts = corpus[200:] + ["", "Great great GREAT!", "café\x1eLOVE"]
+    assert tokenizer.texts_to_sequences(texts) == keras_tokenizer.texts_to_sequences(texts)
+    # Single-text path (no batch join)
+    assert tokenizer.texts_to_sequences(texts[:1]) == keras_tokenizer.texts_to_sequences(texts[:1])
+
+    keras_padded = importlib.import_module("keras").utils.pad_sequences(keras_tokenizer.texts_to_sequences(texts), maxlen=MAX_LEN)
+    np.testing.assert_array_equal(tokenizer.texts_to_padded(texts, maxlen=MAX_LEN), keras_padded)
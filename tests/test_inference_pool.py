@@ -0,0 +1,50 @@
+import json
+import os
+import numpy as np
+import pytest
+from app.services.inference_pool import InferencePool
+from app.services.numpy_lstm import NumpyLSTMModel
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    path = tmp_path_factory.mktemp("numpy_model")
+    rng = np.random.default_rng(0)
+    vocab, dim, units = 50, 8, 4
+    weights = {
+        "embedding": rng.normal(size=(vocab, dim)),
+        "lstm_kernel": rng.normal(size=(dim, 4 * units)),
+        "lstm_recurrent_kernel": rng.normal(size=(units, 4 * units)),
+        "lstm_bias": rng.normal(size=(4 * units,)),
+        "dense_kernel": rng.normal(size=(units, 1)),
+        "dense_bias": rng.normal(size=(1,)),
+    }
+    for name, array in weights.items():
+        np.save(os.path.join(path, f"{name}.npy"), array.astype(np.float32))
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"max_len": 10}, f)
+    return str(path)
+
+def test_pool_matches_in_process_model(model_dir):
+    padded = np.random.default_rng(1).integers(0, 50, size=(6, 10)).astype(np.int32)
+    pool = InferencePool(model_dir, workers=2, pin_cpus=False, timeout=60)
+    try:
+        np.testing.assert_allclose(pool.predict(padded), NumpyLSTMModel.load(model_dir).predict(padded), rtol=1e-6)
+        assert all(worker["alive"] and worker["responsive"] for worker in pool.health())
+    finally:
+        pool.stop()
+
+def test_crashed_worker_is_restarted(model_dir):
+    padded = np.zeros((1, 10), dtype=np.int32)
+    pool = InferencePool(model_dir, workers=1, pin_cpus=False, timeout=60)
+    try:
+        pool.predict(padded)
+        first_pid = pool.health()[0]["pid"]
+        os.kill(first_pid, 9)
+        pool._workers[0].process.join(5)
+
+        assert pool.predict(padded).shape == (1, 1)
+        worker = pool.health()[0]
+        assert worker["restarts"] == 1
+        assert worker["pid"] != first_pid
+    finally:
+        pool.stop()
@@ -0,0 +1,61 @@
+import random
+import re
+import pytest
+from app.services import ml_service
+from app.services.lexicon import LexiconScorer
+
+def test_matches_whole_words_only():
+    scorer = LexiconScorer({"good": 2.0, "bad": -3.0, "so so": 0.5}, negations=())
+    assert scorer.total("Good, GOOD!\tbad") == 1.0
+    assert scorer.total("goodness badge notgood") == 0
+    assert scorer.total("it was so\n  so") == 0.5
+    assert scorer.total("") == 0
+
+def test_longest_term_wins_and_replaces_covered_matches():
+    scorer = LexiconScorer({"waste": -1.0, "waste of money": -3.0, "money": 1.0, "not bad": 2.0, "bad": -2.0})
+    assert scorer.total("a waste of money") == -3.0
+    assert scorer.total("a waste of time, money") == 0.0
+    assert scorer.total("not bad") == 2.0
+
+def test_negation_scope():
+    scorer = LexiconScorer({"good": 2.0}, negations=["not", "don't"], negation_scope=2, negation_weight=-0.5)
+    assert scorer.total("not good") == -1.0
+    assert scorer.total("don't think good") == -1.0
+    assert scorer.total("not at all good") == 2.0  # three words later: out of scope
+    assert scorer.total("not. good") == 2.0  # clause punctuation ends the scope
+    assert scorer.total("good not") == 2.0
+
+def test_matches_regex_reference_on_a_large_lexicon():
+    rng = random.Random(0)
+    words = [f"w{i}" for i in range(5000)]
+    terms = {word: rng.uniform(-4, 4) for word in words[:3000]}
+    scorer = LexiconScorer(terms, negations=())
+    for _ in range(50):
+        text = " ".join(rng.choice(words) + rng.choice(["", ",", "!"]) for _ in range(rng.randint(0, 80)))
+        expected = sum(terms.get(word, 0.0) for word in re.findall(r"\w+", text))
+        assert scorer.total(text) == pytest.approx(expected)
+
+def test_scores_are_deterministic_and_batched(tmp_path):
+    scorer = LexiconScorer.default()
+    texts = ["I love this product!", "This is terrible.", "not good", "nothing to see here"]
+    scores = scorer.predict_proba(texts)
+    assert scores == [scorer.predict_proba([text])[0] for text in texts] == scorer.predict_proba(texts)
+    assert scores[0] > 0.5 > scores[1] and scores[2] < 0.5 and scores[3] == 0.5
+    assert all(0 <= score <= 1 for score in scores)
+
+    path = str(tmp_path / "lexicon.json")
+    scorer.save(path)
+    assert LexiconScorer.load(path).predict_proba(texts) == scores
+
+    tsv = tmp_path / "vader_lexicon.txt"
+    tsv.write_text("great\t3.1\t0.9\t[3, 3]\n:)\t2.0\t0.5\t[2]\nwaste of  money\t-2.8\n", encoding="utf-8")
+    loaded = LexiconScorer.load(str(tsv))
+    assert loaded.terms == {"great": 3.1, "waste of money": -2.8}
+
+def test_fallback_predictions_use_the_lexicon(monkeypatch):
+    monkeypatch.setattr(ml_service, "_lexicon", LexiconScorer({"great": 3.0, "awful": -3.0}))
+    assert ml_service._fallback_predict(["great", "awful", "hmm"]) == [
+        ("Positive", pytest.approx(0.5 + 0.5 * 3 / 24 ** 0.5)),
+        ("Negative", pytest.approx(0.5 - 0.5 * 3 / 24 ** 0.5)),
+        ("Negative", 0.5),
+    ]
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from app.services.linear_model import SparseLinearModel
+
+TEXTS = [
+    "I love this great product", "terrible, awful waste of money", "the best movie ever, loved it",
+    "worst acting and I hated it", "not bad at all", "really good good good fun", "boring and bad", "great great fun",
+]
+LABELS = ["positive", "negative", "positive", "negative", "positive", "positive", "negative", "positive"]
+QUERIES = ["great fun movie", "awful awful product", "unknown words only", "", "Not BAD, loved the acting!"]
+
+@pytest.mark.parametrize("options", [
+    {"max_features": 5000, "stop_words": "english"},
+    {"ngram_range": (1, 2), "sublinear_tf": True},
+    {"binary": True, "norm": None},
+])
+def test_matches_sklearn(options):
+    vectorizer = TfidfVectorizer(**options)
+    classifier = LogisticRegression(max_iter=500).fit(vectorizer.fit_transform(TEXTS), LABELS)
+    model = SparseLinearModel.from_sklearn(vectorizer, classifier)
+    expected = classifier.predict_proba(vectorizer.transform(QUERIES))[:, 1]
+    np.testing.assert_allclose(model.predict_proba(QUERIES), expected, rtol=0, atol=1e-12)
+
+def test_matches_sklearn_with_integer_labels():
+    # The notebook fits on 0/1 labels, so classes_ is [0, 1]
+    vectorizer = TfidfVectorizer()
+    labels = [int(label == "positive") for label in LABELS]
+    classifier = LogisticRegression(max_iter=500).fit(vectorizer.fit_transform(TEXTS), labels)
+    model = SparseLinearModel.from_sklearn(vectorizer, classifier)
+    expected = classifier.predict_proba(vectorizer.transform(QUERIES))[:, 1]
+    np.testing.assert_allclose(model.predict_proba(QUERIES), expected, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(SparseLinearModel.from_sklearn(vectorizer, classifier, positive_label=0).predict_proba(QUERIES),
+                               1 - expected, atol=1e-12)
+
+def test_positive_label_orientation_and_round_trip(tmp_path):
+    vectorizer = TfidfVectorizer()
+    labels = ["pos" if label == "positive" else "neg" for label in LABELS]
+    classifier = LogisticRegression(max_iter=500).fit(vectorizer.fit_transform(TEXTS), labels)
+    # classes_ is ["neg", "pos"]; asking for "neg" as positive flips the probabilities
+    with pytest.raises(ValueError):
+        SparseLinearModel.from_sklearn(vectorizer, classifier)
+    flipped = SparseLinearModel.from_sklearn(vectorizer, classifier, positive_label="neg")
+    np.testing.assert_allclose(flipped.predict_proba(QUERIES), classifier.predict_proba(vectorizer.transform(QUERIES))[:, 0], atol=1e-12)
+
+    path = str(tmp_path / "linear_model.json")
+    flipped.save(path)
+    assert SparseLinearModel.load(path).predict_proba(QUERIES) == flipped.predict_proba(QUERIES)
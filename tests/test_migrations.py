@@ -0,0 +1,81 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+from app.models.db_models import Feedback
+from app.text_utils import content_hash
+from app.services.migrations import MIGRATIONS, applied_versions, migrate
+
+def legacy_database(path):
+    """A database as the old create_all setup left it: VARCHAR sentiment, no model_version/content_hash."""
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE feedbacks (id INTEGER PRIMARY KEY, text VARCHAR(1000), sentiment VARCHAR(10), score FLOAT, created_at DATETIME)"
+        ))
+        connection.execute(text("CREATE INDEX ix_feedbacks_id ON feedbacks (id)"))
+        connection.execute(text("CREATE TABLE feedback_counters (sentiment VARCHAR(10) PRIMARY KEY, count INTEGER NOT NULL, score_sum FLOAT NOT NULL)"))
+        connection.execute(
+            text("INSERT INTO feedbacks (text, sentiment, score, created_at) VALUES (:text, :sentiment, :score, :created_at)"),
+            [
+                {"text": "Great  product", "sentiment": "Positive", "score": 0.9, "created_at": datetime(2024, 1, 1)},
+                {"text": "awful", "sentiment": "Negative", "score": 0.1, "created_at": datetime(2024, 1, 2)},
+            ],
+        )
+    return engine
+
+def test_upgrades_legacy_database(tmp_path):
+    engine = legacy_database(tmp_path / "legacy.db")
+
+    assert migrate(engine) == [step.version for step in MIGRATIONS]
+
+    columns = {column["name"]: column for column in inspect(engine).get_columns("feedbacks")}
+    assert {"model_version", "content_hash"} <= set(columns)
+    assert "INT" in str(columns["sentiment"]["type"]).upper()
+    indexes = {index["name"] for index in inspect(engine).get_indexes("feedbacks")}
+    assert {"ix_feedbacks_sentiment_created_at", "ix_feedbacks_created_at", "ix_feedbacks_content_hash"} <= indexes
+
+    with Session(engine) as db:
+        rows = db.query(Feedback).order_by(Feedback.id).all()
+        assert [(row.sentiment, row.score) for row in rows] == [("Positive", 0.9), ("Negative", 0.1)]
+        assert rows[0].content_hash == content_hash("great product")
+        assert db.query(Feedback).filter(Feedback.sentiment == "Negative").count() == 1
+
+@pytest.mark.parametrize("interrupted_after", [
+    ["ALTER TABLE feedbacks ADD COLUMN sentiment_code SMALLINT"],
+    ["ALTER TABLE feedbacks ADD COLUMN sentiment_code SMALLINT",
+     "UPDATE feedbacks SET sentiment_code = CASE sentiment WHEN 'Positive' THEN 1 WHEN 'Negative' THEN 0 END",
+     "ALTER TABLE feedbacks DROP COLUMN sentiment"],
+])
+def test_resumes_interrupted_sentiment_migration(tmp_path, interrupted_after):
+    # On MySQL each ALTER commits by itself, so a crash can leave migration 3 half done
+    engine = legacy_database(tmp_path / "interrupted.db")
+    assert migrate(engine, target=2) == [1, 2]
+    with engine.begin() as connection:
+        for statement in interrupted_after:
+            connection.execute(text(statement))
+
+    assert migrate(engine) == [step.version for step in MIGRATIONS if step.version > 2]
+    columns = {column["name"]: column for column in inspect(engine).get_columns("feedbacks")}
+    assert "sentiment_code" not in columns and "INT" in str(columns["sentiment"]["type"]).upper()
+    with Session(engine) as db:
+        assert [row.sentiment for row in db.query(Feedback).order_by(Feedback.id)] == ["Positive", "Negative"]
+
+def test_migrate_is_idempotent_and_matches_models(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    migrate(engine)
+    assert migrate(engine) == []
+    assert applied_versions(engine) == {step.version for step in MIGRATIONS}
+
+    reflected = {column["name"] for column in inspect(engine).get_columns("feedbacks")}
+    assert reflected == {column.name for column in Feedback.__table__.columns}
+    with Session(engine) as db:
+        db.add(Feedback(text="Nice", sentiment="Positive", score=0.8))
+        db.commit()
+        assert db.query(Feedback.content_hash).scalar() == content_hash("nice")
+
+def test_target_stops_early(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'partial.db'}")
+    assert migrate(engine, target=2) == [1, 2]
+    assert "content_hash" not in {column["name"] for column in inspect(engine).get_columns("feedbacks")}
+    assert migrate(engine) == [step.version for step in MIGRATIONS if step.version > 2]
@@ -0,0 +1,113 @@
+import json
+import os
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.db_models import Feedback
+from app.services import ml_service
+from app.services.db_service import SessionLocal
+from app.services.fast_tokenizer import FastTokenizer
+from app.services.linear_model import SparseLinearModel
+from app.services.model_registry import ModelRegistry
+
+client = TestClient(app)
+WORDS = ["good", "bad", "great", "awful", "product"]
+
+def make_model(path, seed):
+    rng = np.random.default_rng(seed)
+    vocab, dim, units = len(WORDS) + 1, 4, 3
+    weights = {
+        "embedding": rng.normal(size=(vocab, dim)),
+        "lstm_kernel": rng.normal(size=(dim, 4 * units)),
+        "lstm_recurrent_kernel": rng.normal(size=(units, 4 * units)),
+        "lstm_bias": rng.normal(size=(4 * units,)),
+        "dense_kernel": rng.normal(size=(units, 1)),
+        "dense_bias": rng.normal(size=(1,)),
+    }
+    os.makedirs(path)
+    for name, array in weights.items():
+        np.save(os.path.join(path, f"{name}.npy"), array.astype(np.float32))
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"max_len": ml_service.MAX_LEN}, f)
+    return path
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    tokenizer_path = str(tmp_path / "tokenizer_vocab.json")
+    FastTokenizer(WORDS).save(tokenizer_path)
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    linear_path = str(tmp_path / "linear_model.json")
+    SparseLinearModel(["good", "great", "awful", "bad"], [1.0] * 4, [3.0, 3.0, -3.0, -3.0], 0.0).save(linear_path)
+    registry.register("v1", make_model(str(tmp_path / "m1"), 1), tokenizer_path, description="first", linear_path=linear_path)
+    registry.register("v2", make_model(str(tmp_path / "m2"), 2), tokenizer_path, description="second")
+
+    previous = ml_service.current_model()
+    monkeypatch.setattr(ml_service, "registry", registry)
+    ml_service.load_model()
+    yield registry
+    ml_service._swap(previous)
+
+def test_register_and_list(registry):
+    assert [metadata["version"] for metadata in registry.versions()] == ["v1", "v2"]
+    assert registry.artifacts("v1").backend == "numpy"
+    with pytest.raises(FileExistsError):
+        registry.register("v1", "unused", "unused.json")
+    with pytest.raises(ValueError):
+        registry.artifacts("../outside")
+
+def test_reload_swaps_version_and_retires_old_handle(registry):
+    ml_service.reload_model("v1")
+    first = ml_service.current_model()
+    predictions, versions = ml_service.predict_versioned(["good product", "awful"], model="lstm")
+    assert versions == ["v1", "v1"] and len(predictions) == 2
+
+    ml_service.reload_model("v2")
+    assert ml_service.current_model().version == "v2"
+    assert registry.active_version() == "v2"
+    assert first.batcher._thread is None
+    assert ml_service.predict_versioned(["good product"], model="lstm")[1] == ["v2"]
+
+def test_cascade_only_escalates_uncertain_texts(registry):
+    ml_service.reload_model("v1")
+    texts = ["good product", "a product"]
+    short_circuits = ml_service.CASCADE_SHORT_CIRCUITS.value
+
+    assert ml_service.predict_versioned(texts, model="linear")[1] == ["v1:linear", "v1:linear"]
+    predictions, versions = ml_service.predict_versioned(texts, model="cascade")
+    assert versions == ["v1:linear", "v1"]
+    assert predictions[0][0] == "Positive" and predictions[0][1] > 0.9
+    assert predictions[1] == ml_service.predict_versioned(["a product"], model="lstm")[0][0]
+    assert ml_service.CASCADE_SHORT_CIRCUITS.value == short_circuits + 1
+    assert ml_service.get_model_status()["cascade"]["texts"] >= 2
+
+    # v2 has no linear model: every mode falls back to the LSTM
+    ml_service.reload_model("v2")
+    assert ml_service.predict_versioned(texts, model="cascade")[1] == ["v2", "v2"]
+
+def test_stored_feedback_records_model_version(registry):
+    ml_service.reload_model("v1")
+    assert client.post("/api/predict", json={"text": "great product"}, params={"model": "cascade"}).status_code == 200
+    db = SessionLocal()
+    try:
+        assert db.query(Feedback).order_by(Feedback.id.desc()).first().model_version == "v1:linear"
+    finally:
+        db.close()
+
+def test_load_endpoint(registry, monkeypatch):
+    from app.routes import models
+    monkeypatch.setattr(models, "ADMIN_TOKEN", "")
+    assert client.post("/api/models/v2/load").status_code == 403
+    monkeypatch.setattr(models, "ADMIN_TOKEN", "secret")
+    assert client.post("/api/models/v2/load", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    headers = {"X-Admin-Token": "secret"}
+    assert client.post("/api/models/missing/load", headers=headers).status_code == 404
+    response = client.post("/api/models/v2/load", headers=headers)
+    assert response.status_code == 202
+    ml_service._reload_lock.acquire(timeout=60)
+    ml_service._reload_lock.release()
+    status = client.get("/api/models/status").json()
+    assert status["model_version"] == "v2"
+    assert status["reload"]["state"] == "done"
+    assert client.get("/api/models/").json()["serving"] == "v2"
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+import json
+import os
+from app.services.numpy_lstm import NumpyLSTMModel, export_model, length_buckets, pad_sequences, quantize_model
+
+MAX_LEN = 200
+
+# Fixed corpus of token id sequences: empty, short, long and over-length inputs
+CORPUS = [
+    [],
+    [12],
+    [4, 87, 1023, 9],
+    list(range(1, 60)),
+    [4999, 1, 4999, 2, 3] * 30,
+    list(range(5, 260)),
+]
+
+def test_pad_sequences_matches_keras_defaults():
+    padded = pad_sequences([[1, 2, 3], [], list(range(1, 8))], maxlen=5)
+    assert padded.tolist() == [
+        [0, 0, 1, 2, 3],
+        [0, 0, 0, 0, 0],
+        [3, 4, 5, 6, 7],
+    ]
+
+def test_parity_with_keras(tmp_path):
+    keras = pytest.importorskip("tensorflow").keras
+    keras.utils.set_random_seed(0)
+    model = keras.Sequential([
+        keras.Input(shape=(MAX_LEN,)),
+        keras.layers.Embedding(input_dim=5000, output_dim=128),
+        keras.layers.LSTM(128, dropout=0.2, recurrent_dropout=0.2),
+        keras.layers.Dense(1, activation="sigmoid"),
+    ])
+    padded = pad_sequences(CORPUS, maxlen=MAX_LEN)
+    np.testing.assert_array_equal(padded, keras.utils.pad_sequences(CORPUS, maxlen=MAX_LEN))
+
+    export_model(model, str(tmp_path), max_len=MAX_LEN)
+    numpy_model = NumpyLSTMModel.load(str(tmp_path))
+
+    expected = model.predict(padded, verbose=0)
+    actual = numpy_model.predict(padded)
+    assert actual.shape == expected.shape == (len(CORPUS), 1)
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+
+def random_model(vocab_size=5000, dim=16, units=8, seed=0):
+    rng = np.random.default_rng(seed)
+    weights = {
+        "embedding": rng.normal(size=(vocab_size, dim)),
+        "lstm_kernel": rng.normal(size=(dim, 4 * units)) * 0.3,
+        "lstm_recurrent_kernel": rng.normal(size=(units, 4 * units)) * 0.3,
+        "lstm_bias": rng.normal(size=(4 * units,)),
+        "dense_kernel": rng.normal(size=(units, 1)),
+        "dense_bias": rng.normal(size=(1,)),
+    }
+    weights = {name: array.astype(np.float32) for name, array in weights.items()}
+    return NumpyLSTMModel(weights, {"max_len": MAX_LEN})
+
+def write_model(model, path):
+    os.makedirs(path)
+    for name in ("embedding", "lstm_kernel", "lstm_recurrent_kernel", "lstm_bias", "dense_kernel", "dense_bias"):
+        np.save(os.path.join(path, f"{name}.npy"), getattr(model, name))
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(model.meta, f)
+    return path
+
+def test_skipped_padding_matches_full_padding():
+    model = random_model()
+    expected = model.predict(pad_sequences(CORPUS, maxlen=MAX_LEN))
+    for sequence, score in zip(CORPUS, expected):
+        width = min(len(sequence), MAX_LEN)
+        actual = model.predict(pad_sequences([sequence], maxlen=width), skipped_padding=MAX_LEN - width)
+        np.testing.assert_allclose(actual[0], score, atol=1e-6)
+
+def test_length_buckets_cover_every_row_once():
+    lengths = [3, 150, 0, 9, 7, 200, 64, 65, 1]
+    chunks = list(length_buckets(lengths, [8, 16, 32, 64, 128], chunk_size=2))
+    indices = np.concatenate([chunk for chunk, _ in chunks])
+    assert sorted(indices.tolist()) == list(range(len(lengths)))
+    for chunk, width in chunks:
+        assert width == max(lengths[index] for index in chunk)
+    # Sorted by length, split at bucket boundaries, then cut into chunks of 2
+    assert [(sorted(chunk.tolist()), width) for chunk, width in chunks] == [
+        ([2, 8], 1), ([0, 4], 7), ([3], 9), ([6], 64), ([7], 65), ([1, 5], 200)
+    ]
+
+def test_length_aware_handle_matches_padded(monkeypatch):
+    from app.services import ml_service
+    from app.services.fast_tokenizer import FastTokenizer
+
+    words = [f"w{i}" for i in range(1, 400)]
+    rng = np.random.default_rng(1)
+    texts = [" ".join(rng.choice(words, size=length)) for length in (0, 1, 5, 17, 40, 130, 199, 250)]
+    handle = ml_service.ModelHandle("test", "numpy", FastTokenizer(words), random_model(vocab_size=400))
+    try:
+        monkeypatch.setattr(ml_service, "LENGTH_AWARE_INFERENCE", False)
+        padded = handle.predict(texts)
+        monkeypatch.setattr(ml_service, "LENGTH_AWARE_INFERENCE", True)
+        length_aware = handle.predict(texts)
+    finally:
+        handle.stop()
+    assert [sentiment for sentiment, _ in length_aware] == [sentiment for sentiment, _ in padded]
+    np.testing.assert_allclose([score for _, score in length_aware], [score for _, score in padded], atol=1e-6)
+
+@pytest.mark.parametrize("precision, tolerance, size_ratio", [("float16", 2e-3, 0.5), ("int8", 3e-2, 0.27)])
+def test_quantized_variants(tmp_path, precision, tolerance, size_ratio):
+    model = random_model()
+    source = write_model(model, str(tmp_path / "float32"))
+    quantize_model(source, str(tmp_path / precision), precision)
+    quantized = NumpyLSTMModel.load(str(tmp_path / precision))
+
+    assert quantized.precision == precision
+    stored = np.load(str(tmp_path / precision / "embedding.npy"), mmap_mode="r")
+    assert stored.dtype == np.dtype(precision)
+    assert stored.nbytes <= size_ratio * model.embedding.nbytes
+
+    padded = pad_sequences(CORPUS, maxlen=MAX_LEN)
+    np.testing.assert_allclose(quantized.predict(padded), model.predict(padded), atol=tolerance)
+    # Length-aware inference works on the quantized weights too
+    width = len(CORPUS[2])
+    np.testing.assert_allclose(
+        quantized.predict(pad_sequences([CORPUS[2]], maxlen=width), skipped_padding=MAX_LEN - width),
+        quantized.predict(padded[2:3]),
+        atol=1e-6,
+    )
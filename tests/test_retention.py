@@ -0,0 +1,115 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select
+from app.models.db_models import Feedback
+from app.services import retention
+from app.services.db_service import SessionLocal, delete_all_feedbacks, get_sentiment_counters, rebuild_counters, save_feedbacks
+
+def seed(rows):
+    """Empty the table, then insert (text, sentiment, created_at) rows in order."""
+    db = SessionLocal()
+    try:
+        delete_all_feedbacks(db)
+        db.execute(insert(Feedback), [
+            {"text": text, "sentiment": sentiment, "score": 0.9 if sentiment == "Positive" else 0.1, "created_at": created_at}
+            for text, sentiment, created_at in rows
+        ])
+        db.commit()
+        rebuild_counters(db)
+    finally:
+        db.close()
+
+def remaining():
+    db = SessionLocal()
+    try:
+        return db.execute(select(Feedback.text).order_by(Feedback.id)).scalars().all()
+    finally:
+        db.close()
+
+def counters():
+    db = SessionLocal()
+    try:
+        return {sentiment: count for sentiment, (count, _) in get_sentiment_counters(db).items()}
+    finally:
+        db.close()
+
+def test_purges_by_age_and_row_limit_in_batches(tmp_path):
+    now = datetime(2024, 6, 1)
+    old, recent = now - timedelta(days=40), now - timedelta(days=1)
+    seed([(f"old {i}", "Positive" if i % 2 else "Negative", old) for i in range(5)]
+         + [("recent 0", "Positive", recent), ("late old", "Negative", old), ("recent 1", "Positive", recent)])
+
+    db = SessionLocal()
+    try:
+        plan = retention.plan_purge(db, max_age_days=30, max_rows=0, now=now)
+    finally:
+        db.close()
+    assert retention.purge(plan, batch_size=2, pause_ms=0, archive_dir=str(tmp_path)) == 6
+    assert remaining() == ["recent 0", "recent 1"]
+    assert counters() == {"Positive": 2, "Negative": 0}
+
+    archives = list(tmp_path.glob("feedbacks-*.ndjson.gz"))
+    assert len(archives) == 1
+    with gzip.open(archives[0], "rt") as f:
+        archived = [json.loads(line) for line in f]
+    assert [row["text"] for row in archived] == [f"old {i}" for i in range(5)] + ["late old"]
+    assert set(archived[0]) == {"id", "text", "sentiment", "score", "created_at", "model_version", "occurrences", "last_seen_at"}
+
+    db = SessionLocal()
+    try:
+        save_feedbacks(db, [{"text": f"new {i}", "sentiment": "Negative", "score": 0.2} for i in range(3)])
+        plan = retention.plan_purge(db, max_age_days=0, max_rows=3)
+    finally:
+        db.close()
+    assert retention.purge(plan, batch_size=1, pause_ms=0, archive_dir="") == 2
+    assert remaining() == ["new 0", "new 1", "new 2"]
+    assert counters() == {"Positive": 0, "Negative": 3}
+
+def test_nothing_to_purge():
+    seed([("fresh", "Positive", datetime.utcnow())])
+    db = SessionLocal()
+    try:
+        plan = retention.plan_purge(db, max_age_days=30, max_rows=10)
+    finally:
+        db.close()
+    assert plan.max_id is None
+    assert retention.purge(plan, pause_ms=0, archive_dir="") == 0
+    assert remaining() == ["fresh"]
+
+def test_delete_all_keeps_the_search_index_in_sync():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    seed([("purple elephant", "Positive", datetime.utcnow())])
+    assert client.get("/api/feedbacks/search?q=elephant").json()["feedbacks"]
+    assert client.delete("/api/feedbacks/").status_code == 200
+    assert client.get("/api/feedbacks/search?q=elephant").json()["feedbacks"] == []
+    assert client.get("/api/stats/").json()["total_feedbacks"] == 0
+
+    client.post("/api/predict", json={"text": "another purple elephant"})
+    assert [row["text"] for row in client.get("/api/feedbacks/search?q=elephant").json()["feedbacks"]] == ["another purple elephant"]
+
+def test_failed_delete_all_keeps_the_search_triggers(monkeypatch):
+    import pytest
+    from sqlalchemy import text
+    from app.services import db_service
+
+    if db_service.fulltext_backend() != "fts5":
+        pytest.skip("needs the SQLite FTS5 index")
+    seed([("purple elephant", "Positive", datetime.utcnow())])
+    statements = db_service.truncate_statements()
+    # Fail after the triggers were dropped and the rows deleted
+    monkeypatch.setattr(db_service, "truncate_statements", lambda: statements[:-1] + [text("SELECT * FROM no_such_table")])
+    db = SessionLocal()
+    try:
+        with pytest.raises(Exception):
+            delete_all_feedbacks(db)
+        db.rollback()
+        triggers = db.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'feedbacks_fts_%'")).scalars().all()
+    finally:
+        db.close()
+    assert sorted(triggers) == ["feedbacks_fts_delete", "feedbacks_fts_insert", "feedbacks_fts_update"]
+    assert remaining() == ["purple elephant"]
+    assert counters() == {"Positive": 1, "Negative": 0}
@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Cold-start budget for `import app.main` (no model load, no schema setup, no TensorFlow)
+IMPORT_TIME_BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "3.0"))
+
+IMPORT_PROBE = """
+import sys, time
+started = time.perf_counter()
+import app.main
+print(time.perf_counter() - started)
+print("tensorflow" in sys.modules)
+"""
+
+def test_import_is_fast_and_does_not_load_the_model():
+    env = dict(os.environ, INFERENCE_BACKEND="keras")
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    seconds, tensorflow_imported = result.stdout.split()[-2:]
+    assert tensorflow_imported == "False"
+    assert float(seconds) < IMPORT_TIME_BUDGET_SECONDS
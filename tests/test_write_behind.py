@@ -0,0 +1,30 @@
+import time
+from app.services.write_behind import WriteBehindQueue
+
+def test_rows_are_flushed_in_batches():
+    flushed = []
+    queue = WriteBehindQueue(flushed.append, max_size=100, batch_size=3, flush_interval_ms=1000)
+    for i in range(7):
+        assert queue.put({"text": str(i)})
+    queue.stop()
+    assert [len(batch) for batch in flushed][:2] == [3, 3]
+    assert [row["text"] for batch in flushed for row in batch] == [str(i) for i in range(7)]
+
+def test_interval_flushes_partial_batch():
+    flushed = []
+    queue = WriteBehindQueue(flushed.append, max_size=100, batch_size=100, flush_interval_ms=10)
+    queue.put({"text": "only one"})
+    deadline = time.time() + 2
+    while not flushed and time.time() < deadline:
+        time.sleep(0.01)
+    assert flushed == [[{"text": "only one"}]]
+    queue.stop()
+
+def test_full_queue_is_reported():
+    def slow_flush(rows):
+        time.sleep(0.2)
+
+    queue = WriteBehindQueue(slow_flush, max_size=1, batch_size=1, flush_interval_ms=0)
+    results = [queue.put({"text": str(i)}) for i in range(5)]
+    assert False in results
+    queue.stop()